@@ -51,6 +51,8 @@ def register():
     node_trees.register()
     from . import operators
     operators.register()
+    from . import engine
+    engine.register()
 
     bpy.utils.register_class(WFGlobalProps)
     bpy.types.Scene.wf_global_props = bpy.props.PointerProperty(type=WFGlobalProps)
@@ -73,6 +75,8 @@ def unregister():
     nodes.unregister()
     from . import operators
     operators.unregister()
+    from . import engine
+    engine.unregister()
 
     bpy.utils.unregister_class(WFGlobalProps)
     del bpy.types.Scene.wf_global_props
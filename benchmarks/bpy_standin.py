@@ -0,0 +1,1069 @@
+"""Minimal in-process stand-in for the parts of ``bpy`` the workflow engine touches.
+
+It is only meant to drive the evaluator outside Blender: node trees, sockets, links,
+objects, collections and view layers are plain Python objects and operators are no-ops.
+"""
+import importlib.util
+import itertools
+import os
+import sys
+import types
+
+ADDON_NAME = "blender_io_workflows"
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_session_uids = itertools.count(1)
+# Number of renames so far, invalidates the name lookups of every collection
+_renames = [0]
+
+
+class Collection(list):
+    ''' RNA collection: ordered, indexable by position or name.
+    Name lookups go through an index rebuilt after the collection changes or anything is renamed.'''
+
+    _index = None
+    _index_renames = 0
+
+    def find_name(self, key):
+        index = self._index
+        if index is None or self._index_renames != _renames[0]:
+            index = self._index = {}
+            self._index_renames = _renames[0]
+            for item in self:
+                index.setdefault(item.name, item)
+        return index.get(key)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.find_name(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return list.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        item = self.find_name(key)
+        return default if item is None else item
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.find_name(key) is not None
+        return list.__contains__(self, key)
+
+    def append(self, item):
+        if self._index is not None and self._index_renames == _renames[0]:
+            self._index.setdefault(item.name, item)
+        else:
+            self._index = None
+        list.append(self, item)
+
+    def insert(self, index, item):
+        self._index = None
+        list.insert(self, index, item)
+
+    def pop(self, index=-1):
+        self._index = None
+        return list.pop(self, index)
+
+    def remove(self, item):
+        self._index = None
+        list.remove(self, item)
+
+    def clear(self):
+        self._index = None
+        list.clear(self)
+
+    def values(self):
+        return list(self)
+
+    def foreach_get(self, attr, seq):
+        values = []
+        for item in self:
+            value = getattr(item, attr)
+            if isinstance(value, (list, tuple)):
+                values.extend(value)
+            else:
+                values.append(value)
+        seq[:] = values
+
+    def foreach_set(self, attr, seq):
+        items = list(self)
+        if not items:
+            return
+        width = len(seq) // len(items)
+        for index, item in enumerate(items):
+            if width == 1:
+                setattr(item, attr, seq[index])
+            else:
+                setattr(item, attr, Vector(seq[index * width:(index + 1) * width]))
+
+
+class PropertyCollection(Collection):
+    def __init__(self, item_type):
+        super().__init__()
+        self.item_type = item_type
+
+    def add(self):
+        item = self.item_type()
+        self.append(item)
+        return item
+
+
+class Vector(list):
+    ''' Just enough of mathutils.Vector for the add-on '''
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __truediv__(self, value):
+        return Vector(a / value for a in self)
+
+    def copy(self):
+        return Vector(self)
+
+    @property
+    def x(self):
+        return self[0]
+
+
+class Matrix(list):
+    ''' Just enough of mathutils.Matrix for the add-on, rows of a 4x4 matrix '''
+
+    def __init__(self, rows=None):
+        super().__init__(Vector(row) for row in (rows or [[float(i == j) for j in range(4)] for i in range(4)]))
+
+    def inverted(self):
+        import numpy as np
+        return Matrix(np.linalg.inv(np.array(self, dtype=np.float64)).tolist())
+
+    @property
+    def translation(self):
+        return Vector(row[3] for row in self[:3])
+
+
+def _unique_name(collection, name):
+    if name not in collection:
+        return name
+    for index in itertools.count(1):
+        candidate = f"{name}.{index:03d}"
+        if candidate not in collection:
+            return candidate
+
+
+# Properties ------------------------------------------------------------------------------------------------------
+
+
+class _Property():
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        self.kwargs = kwargs
+
+    def default(self):
+        if self.kind == "CollectionProperty":
+            return PropertyCollection(self.kwargs.get("type"))
+        if self.kind == "PointerProperty":
+            return None
+        if "default" in self.kwargs:
+            return self.kwargs["default"]
+        return {"BoolProperty": False, "IntProperty": 0, "FloatProperty": 0.0,
+                "StringProperty": "", "EnumProperty": ""}.get(self.kind)
+
+
+def _property(kind):
+    def factory(*args, **kwargs):
+        return _Property(kind, **kwargs)
+    return factory
+
+
+props = types.ModuleType("bpy.props")
+for _kind in ("BoolProperty", "IntProperty", "FloatProperty", "StringProperty", "EnumProperty", "PointerProperty",
+              "CollectionProperty", "FloatVectorProperty", "IntVectorProperty", "BoolVectorProperty"):
+    setattr(props, _kind, _property(_kind))
+
+
+_annotations_cache = {}
+
+
+def _annotations(cls):
+    if cls in _annotations_cache:
+        return _annotations_cache[cls]
+    result = _annotations_cache[cls] = {}
+    for base in reversed(cls.__mro__):
+        for name, value in vars(base).get("__annotations__", {}).items():
+            if isinstance(value, _Property):
+                result[name] = value
+    return result
+
+
+_rna_types = {
+    "BoolProperty": 'BOOLEAN', "IntProperty": 'INT', "FloatProperty": 'FLOAT', "StringProperty": 'STRING',
+    "EnumProperty": 'ENUM', "PointerProperty": 'POINTER', "CollectionProperty": 'COLLECTION',
+    "FloatVectorProperty": 'FLOAT', "IntVectorProperty": 'INT', "BoolVectorProperty": 'BOOLEAN',
+}
+_rna_cache = {}
+
+
+def _rna(cls):
+    ''' bl_rna stand-in listing the properties declared by the add-on '''
+    rna = _rna_cache.get(cls)
+    if rna is None:
+        rna = _rna_cache[cls] = types.SimpleNamespace(properties=[
+            types.SimpleNamespace(identifier=name, is_runtime=True, type=_rna_types[prop.kind])
+            for name, prop in _annotations(cls).items()])
+    return rna
+
+
+class _RNAMeta(type):
+    ''' Turns properties registered at runtime with getter/setter functions into Python properties '''
+
+    def __setattr__(cls, name, value):
+        if isinstance(value, _Property) and value.kwargs.get("get"):
+            getter = value.kwargs["get"]
+            setter = value.kwargs.get("set")
+            value = property(getter, (lambda self, data: setter(self, data)) if setter else None)
+        super().__setattr__(name, value)
+
+
+class bpy_struct(metaclass=_RNAMeta):
+    def __init__(self):
+        for name, prop in _annotations(type(self)).items():
+            object.__setattr__(self, name, prop.default())
+        # Class level RNA properties registered at runtime (e.g. NodeSocket.wf_has_cache)
+        for base in type(self).__mro__:
+            for name, value in list(vars(base).items()):
+                if isinstance(value, _Property) and name not in self.__dict__:
+                    object.__setattr__(self, name, value.default())
+
+    @property
+    def bl_rna(self):
+        return _rna(type(self))
+
+    def __setattr__(self, name, value):
+        # Naming a new struct doesn't rename anything
+        if name == "name" and "name" in self.__dict__:
+            _renames[0] += 1
+        prop = _annotations(type(self)).get(name)
+        object.__setattr__(self, name, value)
+        if prop is not None and "update" in prop.kwargs and prop.kwargs["update"]:
+            prop.kwargs["update"](self, context)
+
+
+class ID(bpy_struct):
+    def __init__(self, name=""):
+        super().__init__()
+        self.name = name
+        self.session_uid = next(_session_uids)
+        self.users = 1
+
+    @property
+    def name_full(self):
+        return self.name
+
+    @property
+    def original(self):
+        return self
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+
+# Scene data ------------------------------------------------------------------------------------------------------
+
+
+class Object(ID):
+    id_type = 'OBJECT'
+
+    def __init__(self, name="", data=None, type=None):
+        super().__init__(name)
+        self.type = type or (data.id_type if data else 'EMPTY')
+        self.data = data
+        self.children = Collection()
+        self.parent = None
+        self.modifiers = Collection()
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.matrix_world = Matrix()
+        self.vertex_groups = Collection()
+        self.material_slots = []
+        self.selected = False
+
+    def __setattr__(self, name, value):
+        if name == "data":
+            # Meshes count their users like ID user counts do
+            old = self.__dict__.get("data")
+            if isinstance(old, Mesh):
+                old.user_count -= 1
+            if isinstance(value, Mesh):
+                value.user_count += 1
+        super().__setattr__(name, value)
+
+    def select_set(self, state):
+        self.selected = state
+
+    def select_get(self):
+        return self.selected
+
+    def copy(self):
+        result = _copy_id(self, data.objects)
+        if isinstance(result.data, Mesh):
+            result.data.user_count += 1
+        return result
+
+    @property
+    def users_collection(self):
+        return [col for col in _all_collections() if list.__contains__(col.objects, self)]
+
+
+def _copy_id(id, collection):
+    import copy
+    result = copy.copy(id)
+    object.__setattr__(result, "session_uid", next(_session_uids))
+    for name, value in list(vars(result).items()):
+        if isinstance(value, list):
+            object.__setattr__(result, name, type(value)(value) if type(value) is not PropertyCollection
+                               else value)
+    result.name = _unique_name(collection, id.name)
+    collection.append(result)
+    return result
+
+
+def _all_collections():
+    for scene in data.scenes:
+        yield scene.collection
+        yield from _child_collections(scene.collection)
+    yield from data.collections
+
+
+def _child_collections(col):
+    for child in col.children:
+        yield child
+        yield from _child_collections(child)
+
+
+class MeshElements():
+    ''' Vertices, edges, loops, polygons or attribute values of a mesh, a NumPy array per field so foreach_get and
+    foreach_set copy whole arrays like they do in Blender '''
+
+    def __init__(self, fields, count=0):
+        import numpy as np
+        # field -> (values per element, dtype)
+        self.fields = fields
+        self.count = count
+        self.arrays = {name: np.zeros(count * size, dtype=dtype) for name, (size, dtype) in fields.items()}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, count):
+        import numpy as np
+        self.count += count
+        for name, (size, dtype) in self.fields.items():
+            self.arrays[name] = np.concatenate([self.arrays[name], np.zeros(count * size, dtype=dtype)])
+
+    def clear(self):
+        self.count = 0
+        self.add(0)
+        for name in self.arrays:
+            self.arrays[name] = self.arrays[name][:0]
+
+    def foreach_get(self, attr, seq):
+        seq[:] = self.arrays[attr]
+
+    def foreach_set(self, attr, seq):
+        import numpy as np
+        size, dtype = self.fields[attr]
+        if len(seq) != self.count * size:
+            raise RuntimeError(f"internal error setting the array of {attr}")
+        self.arrays[attr] = np.array(seq, dtype=dtype)
+
+
+# Attribute data type -> (field, values per element, dtype) of the attributes the stand-in meshes can hold
+ATTRIBUTE_FIELDS = {
+    'FLOAT': ("value", 1, "float32"),
+    'INT': ("value", 1, "int32"),
+    'FLOAT2': ("vector", 2, "float32"),
+    'FLOAT_VECTOR': ("vector", 3, "float32"),
+    'FLOAT_COLOR': ("color", 4, "float32"),
+}
+
+
+class Attribute():
+    def __init__(self, name, data_type, domain, count):
+        field, size, dtype = ATTRIBUTE_FIELDS[data_type]
+        self.name = name
+        self.data_type = data_type
+        self.domain = domain
+        self.data = MeshElements({field: (size, dtype)}, count)
+
+
+class Attributes(Collection):
+    def __init__(self, items=(), mesh=None):
+        super().__init__(items)
+        self.mesh = mesh
+
+    def new(self, name, type, domain):
+        attribute = Attribute(name, type, domain, len(self.mesh.get_domain(domain)))
+        self.append(attribute)
+        return attribute
+
+
+class UVLayer():
+    def __init__(self, name):
+        self.name = name
+        self.active_render = False
+
+
+class UVLayers(Collection):
+    def __init__(self, items=(), mesh=None):
+        super().__init__(items)
+        self.mesh = mesh
+        self.active = None
+
+    def new(self, name="UVMap", do_init=True):
+        # UV maps are stored as 2D float corner attributes
+        self.mesh.attributes.new(name, 'FLOAT2', 'CORNER')
+        layer = UVLayer(name)
+        self.append(layer)
+        if self.active is None:
+            self.active = layer
+            layer.active_render = True
+        return layer
+
+
+class Mesh(ID):
+    id_type = 'MESH'
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.user_count = 0
+        self.vertices = MeshElements({"co": (3, "float32")})
+        self.edges = MeshElements({"vertices": (2, "int32"), "use_seam": (1, "bool")})
+        self.loops = MeshElements({"vertex_index": (1, "int32"), "edge_index": (1, "int32")})
+        self.polygons = MeshElements({"loop_start": (1, "int32"), "material_index": (1, "int32")})
+        self.attributes = Attributes(mesh=self)
+        self.uv_layers = UVLayers(mesh=self)
+        self.materials = Collection()
+        self.shape_keys = None
+
+    def get_domain(self, domain):
+        return {'POINT': self.vertices, 'EDGE': self.edges, 'CORNER': self.loops, 'FACE': self.polygons}[domain]
+
+    def clear_geometry(self):
+        for elements in (self.vertices, self.edges, self.loops, self.polygons):
+            elements.clear()
+        Collection.clear(self.attributes)
+        Collection.clear(self.uv_layers)
+        self.uv_layers.active = None
+
+    def update(self):
+        pass
+
+    def copy(self):
+        import copy
+        result = _copy_id(self, data.meshes)
+        object.__setattr__(result, "user_count", 0)
+        for name in ("vertices", "edges", "loops", "polygons"):
+            object.__setattr__(result, name, copy.deepcopy(getattr(self, name)))
+        object.__setattr__(result, "attributes", Attributes(copy.deepcopy(list(self.attributes)), result))
+        uv_layers = UVLayers(copy.deepcopy(list(self.uv_layers)), result)
+        if self.uv_layers.active:
+            uv_layers.active = uv_layers[self.uv_layers.active.name]
+        object.__setattr__(result, "uv_layers", uv_layers)
+        return result
+
+    @property
+    def users(self):
+        return self.user_count
+
+    @users.setter
+    def users(self, value):
+        pass
+
+
+class Material(ID):
+    id_type = 'MATERIAL'
+
+
+class ObjectLinks(Collection):
+    def link(self, ob):
+        if list.__contains__(self, ob):
+            raise RuntimeError(f"Object '{ob.name}' already in collection")
+        self.append(ob)
+
+    def unlink(self, ob):
+        Collection.remove(self, ob)
+
+
+class BlendCollection(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.objects = ObjectLinks()
+        self.children = ObjectLinks()
+
+    @property
+    def all_objects(self):
+        seen = {}
+        stack = [self]
+        while stack:
+            col = stack.pop()
+            for ob in col.objects:
+                seen.setdefault(ob.session_uid, ob)
+            stack.extend(reversed(col.children))
+        return Collection(seen.values())
+
+    @property
+    def children_recursive(self):
+        result = []
+        stack = list(reversed(self.children))
+        while stack:
+            col = stack.pop()
+            result.append(col)
+            stack.extend(reversed(col.children))
+        return Collection(result)
+
+
+class LayerCollection(bpy_struct):
+    def __init__(self, collection):
+        super().__init__()
+        self.collection = collection
+        self.name = collection.name
+        self.exclude = False
+        self.children = Collection(LayerCollection(child) for child in collection.children)
+
+
+class ViewLayerObjects(Collection):
+    active = None
+
+
+class ViewLayer(bpy_struct):
+    def __init__(self, scene):
+        super().__init__()
+        self.scene = scene
+        self.name = "ViewLayer"
+        self.objects = ViewLayerObjects()
+        self.layer_collection = LayerCollection(scene.collection)
+
+    def update(self):
+        self.layer_collection = LayerCollection(self.scene.collection)
+        self.objects = ViewLayerObjects(self.scene.collection.all_objects)
+
+
+class Scene(ID):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.collection = BlendCollection("Scene Collection")
+        self.view_layers = Collection([ViewLayer(self)])
+        self.unit_settings = types.SimpleNamespace(system='METRIC', scale_length=1.0, length_unit='METERS')
+        self.render = types.SimpleNamespace(fps=24, fps_base=1.0)
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.world = None
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+
+class NodeGroups(Collection):
+    def new(self, name, type):
+        tree = _tree_classes[type](_unique_name(self, name))
+        self.append(tree)
+        return tree
+
+    def remove(self, tree):
+        Collection.remove(self, tree)
+
+
+_removed_classes = {}
+
+
+def _mark_removed(id):
+    ''' Makes any further access to the ID raise like accessing a removed data block does '''
+    cls = type(id)
+    removed_cls = _removed_classes.get(cls)
+    if not removed_cls:
+        def __getattribute__(self, name):
+            if name == "__class__":
+                return object.__getattribute__(self, name)
+            raise ReferenceError(f"StructRNA of type {cls.__name__} has been removed")
+        removed_cls = _removed_classes[cls] = type(cls.__name__, (cls,), {"__getattribute__": __getattribute__})
+    id.__class__ = removed_cls
+
+
+class DataCollection(Collection):
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def new(self, name, *args, **kwargs):
+        item = self.factory(_unique_name(self, name), *args, **kwargs)
+        self.append(item)
+        return item
+
+    def remove(self, item, do_unlink=True, **kwargs):
+        Collection.remove(self, item)
+        if isinstance(item, Object) and isinstance(item.data, Mesh):
+            item.data.user_count -= 1
+        if isinstance(item, Object):
+            for col in _all_collections():
+                if list.__contains__(col.objects, item):
+                    Collection.remove(col.objects, item)
+        _mark_removed(item)
+
+
+# Node trees ------------------------------------------------------------------------------------------------------
+
+
+class NodeSocket(bpy_struct):
+    bl_idname = "NodeSocket"
+
+    def __init__(self, node, name, identifier, is_output):
+        super().__init__()
+        self.node = node
+        self.name = name
+        self.identifier = identifier
+        self.is_output = is_output
+        self.link_limit = 1
+        self.links = Collection()
+        if "default_value" not in self.__dict__:
+            self.default_value = None
+
+    @property
+    def is_linked(self):
+        return bool(self.links)
+
+    @property
+    def id_data(self):
+        return self.node.id_data
+
+
+class NodeSocketStandard(NodeSocket):
+    pass
+
+
+class NodeSocketString(NodeSocketStandard):
+    bl_idname = "NodeSocketString"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.default_value = ""
+
+
+class NodeSocketVirtual(NodeSocketStandard):
+    bl_idname = "NodeSocketVirtual"
+
+
+class NodeSockets(Collection):
+    def __init__(self, node, is_output):
+        super().__init__()
+        self.node = node
+        self.is_output = is_output
+
+    def new(self, bl_idname, name, identifier=None):
+        cls = _socket_classes[bl_idname]
+        if identifier is None:
+            identifier = name
+            index = 0
+            while any(socket.identifier == identifier for socket in self):
+                index += 1
+                identifier = f"{name}_{index:03d}"
+        socket = cls(self.node, name, identifier, self.is_output)
+        self.append(socket)
+        return socket
+
+    def remove(self, socket):
+        Collection.remove(self, socket)
+
+    def move(self, from_index, to_index):
+        self.insert(to_index, self.pop(from_index))
+
+
+class Node(bpy_struct):
+    bl_idname = "Node"
+    bl_width_default = 140
+
+    def __init__(self):
+        super().__init__()
+        self.inputs = NodeSockets(self, False)
+        self.outputs = NodeSockets(self, True)
+        self.name = ""
+        self.label = ""
+        self.mute = False
+        self.select = False
+        self.color = (0.0, 0.0, 0.0)
+        self.use_custom_color = False
+        self.location = Vector((0.0, 0.0))
+        self.width = 140
+        self.id_data = None
+
+
+class NodeReroute(Node):
+    bl_idname = "NodeReroute"
+
+    def init(self, context):
+        self.inputs.new("NodeSocketVirtual", "Input")
+        self.outputs.new("NodeSocketVirtual", "Output")
+
+
+class NodeGroupInput(Node):
+    bl_idname = "NodeGroupInput"
+
+    def init(self, context):
+        tree = self.id_data
+        for item in tree.interface.items_tree:
+            if item.in_out == 'INPUT':
+                self.outputs.new(item.socket_type, item.name, identifier=item.identifier)
+        self.outputs.new("NodeSocketVirtual", "", identifier="__extend__")
+
+
+class NodeGroupOutput(Node):
+    bl_idname = "NodeGroupOutput"
+    is_active_output = True
+
+    def init(self, context):
+        tree = self.id_data
+        for item in tree.interface.items_tree:
+            if item.in_out == 'OUTPUT':
+                self.inputs.new(item.socket_type, item.name, identifier=item.identifier)
+        self.inputs.new("NodeSocketVirtual", "", identifier="__extend__")
+
+
+class NodeCustomGroup(Node):
+    bl_idname = "NodeCustomGroup"
+
+    def __init__(self):
+        super().__init__()
+        self.node_tree = None
+
+
+class NodeLink():
+    def __init__(self, from_socket, to_socket):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_socket.node
+        self.to_node = to_socket.node
+        self.is_valid = True
+        self.is_muted = False
+
+
+class Nodes(Collection):
+    def __init__(self, tree):
+        super().__init__()
+        self.tree = tree
+        self.active = None
+
+    def new(self, bl_idname):
+        node = _node_classes[bl_idname]()
+        node.id_data = self.tree
+        node.name = _unique_name(self, getattr(node, "bl_label", bl_idname))
+        self.append(node)
+        if hasattr(node, "init"):
+            node.init(context)
+        return node
+
+    def remove(self, node):
+        for socket in list(node.inputs) + list(node.outputs):
+            for link in list(socket.links):
+                self.tree.links.remove(link)
+        Collection.remove(self, node)
+
+
+class Links(Collection):
+    def new(self, from_socket, to_socket):
+        if to_socket.link_limit == 1:
+            for link in list(to_socket.links):
+                self.remove(link)
+        link = NodeLink(from_socket, to_socket)
+        from_socket.links.append(link)
+        to_socket.links.append(link)
+        self.append(link)
+        return link
+
+    def remove(self, link):
+        Collection.remove(link.from_socket.links, link)
+        Collection.remove(link.to_socket.links, link)
+        Collection.remove(self, link)
+
+
+class InterfaceSocket():
+    def __init__(self, name, in_out, socket_type, identifier):
+        self.name = name
+        self.in_out = in_out
+        self.socket_type = socket_type
+        self.identifier = identifier
+
+
+class Interface():
+    def __init__(self):
+        self.items_tree = Collection()
+
+    def new_socket(self, name, in_out='INPUT', socket_type="NodeSocketString"):
+        item = InterfaceSocket(name, in_out, socket_type, f"Socket_{len(self.items_tree)}")
+        self.items_tree.append(item)
+        return item
+
+
+class NodeTree(ID):
+    bl_idname = "NodeTree"
+
+    def __init__(self, name=""):
+        super().__init__(name)
+        self.nodes = Nodes(self)
+        self.links = Links()
+        self.interface = Interface()
+
+
+class Operator(bpy_struct):
+    def report(self, level, message):
+        pass
+
+
+class _Registrable():
+    pass
+
+
+_node_classes = {
+    "NodeReroute": NodeReroute,
+    "NodeGroupInput": NodeGroupInput,
+    "NodeGroupOutput": NodeGroupOutput,
+}
+_socket_classes = {
+    "NodeSocketString": NodeSocketString,
+    "NodeSocketVirtual": NodeSocketVirtual,
+}
+_tree_classes = {}
+
+
+def register_class(cls):
+    if issubclass(cls, NodeSocket):
+        _socket_classes[cls.bl_idname] = cls
+    elif issubclass(cls, Node):
+        if "bl_idname" not in vars(cls):
+            cls.bl_idname = cls.__name__
+        _node_classes[cls.bl_idname] = cls
+    elif issubclass(cls, NodeTree):
+        _tree_classes[cls.bl_idname] = cls
+
+
+def unregister_class(cls):
+    pass
+
+
+# Module assembly -------------------------------------------------------------------------------------------------
+
+
+class _OpsNamespace():
+    ''' bpy.ops stand-in: every operator is a no-op returning FINISHED '''
+
+    def __init__(self, path=""):
+        self._path = path
+
+    def __getattr__(self, name):
+        return _OpsNamespace(f"{self._path}.{name}" if self._path else name)
+
+    def __call__(self, *args, **kwargs):
+        return {'FINISHED'}
+
+
+class _Handlers(list):
+    pass
+
+
+class _Keymaps():
+    def new(self, *args, **kwargs):
+        return self
+
+    @property
+    def keymap_items(self):
+        return self
+
+    def remove(self, item):
+        pass
+
+
+class _Context():
+    def __init__(self):
+        self.scene = None
+        self.view_layer = None
+        self.mode = 'OBJECT'
+        self.space_data = None
+        self.window = None
+        self.preferences = types.SimpleNamespace(edit=types.SimpleNamespace(undo_steps=32, use_global_undo=True),
+                                                 addons={})
+        self.window_manager = types.SimpleNamespace(
+            keyconfigs=types.SimpleNamespace(addon=types.SimpleNamespace(keymaps=_Keymaps())),
+            operator_properties_last=lambda idname: {})
+
+    @property
+    def selected_objects(self):
+        return [ob for ob in self.view_layer.objects if ob.selected] if self.view_layer else []
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active if self.view_layer else None
+
+    def evaluated_depsgraph_get(self):
+        return None
+
+    def temp_override(self, **overrides):
+        return _Override(self, overrides)
+
+
+class _Override():
+    def __init__(self, context, overrides):
+        self.context = context
+        self.overrides = overrides
+        self.previous = {}
+
+    def __enter__(self):
+        for name, value in self.overrides.items():
+            self.previous[name] = getattr(self.context, name)
+            setattr(self.context, name, value)
+        return self.context
+
+    def __exit__(self, *args):
+        for name, value in self.previous.items():
+            setattr(self.context, name, value)
+
+
+context = _Context()
+
+
+def new_scene(name="Scene"):
+    ''' Creates a scene and makes it the active one '''
+    scene = data.scenes.new(name)
+    context.scene = scene
+    context.view_layer = scene.view_layers[0]
+    return scene
+
+
+def new_tree(name="Workflow"):
+    return data.node_groups.new(name, "WFNodeTree")
+
+
+def reset():
+    ''' Clears all data blocks '''
+    for collection in (data.objects, data.meshes, data.materials, data.collections, data.scenes, data.node_groups):
+        Collection.clear(collection)
+    new_scene()
+
+
+data = types.SimpleNamespace(
+    objects=DataCollection(Object),
+    meshes=DataCollection(Mesh),
+    materials=DataCollection(Material),
+    collections=DataCollection(BlendCollection),
+    scenes=DataCollection(Scene),
+    node_groups=NodeGroups(),
+    filepath="",
+)
+
+
+def persistent(func):
+    return func
+
+
+def install():
+    ''' Registers the stand-in modules in sys.modules so ``import bpy`` resolves to them '''
+    if "bpy" in sys.modules and getattr(sys.modules["bpy"], "__standin__", False):
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    bpy.__standin__ = True
+
+    bpy_types = types.ModuleType("bpy.types")
+    for name, value in {
+        "bpy_struct": bpy_struct, "ID": ID, "Object": Object, "Mesh": Mesh, "Material": Material, "Collection": BlendCollection,
+        "Scene": Scene, "LayerCollection": LayerCollection, "ViewLayer": ViewLayer,
+        "NodeTree": NodeTree, "Node": Node, "NodeSocket": NodeSocket, "NodeSocketStandard": NodeSocketStandard,
+        "NodeReroute": NodeReroute, "NodeGroupInput": NodeGroupInput, "NodeGroupOutput": NodeGroupOutput,
+        "NodeCustomGroup": NodeCustomGroup, "Operator": Operator, "Panel": bpy_struct, "Menu": bpy_struct,
+        "PropertyGroup": bpy_struct, "AddonPreferences": bpy_struct,
+    }.items():
+        setattr(bpy_types, name, value)
+    for name in ("VIEW3D_MT_object", "NODE_MT_node", "NODE_MT_context_menu", "NODE_MT_add", "TOPBAR_MT_file_export"):
+        setattr(bpy_types, name, types.SimpleNamespace(append=lambda func: None, remove=lambda func: None))
+    bpy_types.Modifier = types.SimpleNamespace(bl_rna=types.SimpleNamespace(
+        properties={"type": types.SimpleNamespace(enum_items=[])}))
+
+    handlers = types.ModuleType("bpy.app.handlers")
+    for name in ("load_post", "save_post", "depsgraph_update_post", "undo_post", "redo_post"):
+        setattr(handlers, name, _Handlers())
+    handlers.persistent = persistent
+
+    app = types.ModuleType("bpy.app")
+    app.version = (4, 2, 0)
+    app.version_string = "4.2.0"
+    app.background = True
+    app.binary_path = ""
+    app.handlers = handlers
+    app.timers = types.SimpleNamespace(register=lambda *args, **kwargs: None,
+                                       is_registered=lambda func: False,
+                                       unregister=lambda func: None)
+
+    utils = types.ModuleType("bpy.utils")
+    utils.register_class = register_class
+    utils.unregister_class = unregister_class
+    utils.preset_find = lambda name, path: None
+    utils.preset_paths = lambda subdir: []
+
+    path = types.ModuleType("bpy.path")
+    path.abspath = lambda value: value
+
+    bpy.types = bpy_types
+    bpy.props = props
+    bpy.app = app
+    bpy.utils = utils
+    bpy.path = path
+    bpy.ops = _OpsNamespace()
+    bpy.data = data
+    bpy.context = context
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+    mathutils.Matrix = Matrix
+
+    nodeitems_utils = types.ModuleType("nodeitems_utils")
+
+    class NodeCategory():
+        def __init__(self, identifier, name, items=None):
+            self.identifier = identifier
+            self.name = name
+            self.items = items
+
+    class NodeItem():
+        def __init__(self, nodetype, **kwargs):
+            self.nodetype = nodetype
+
+    nodeitems_utils.NodeCategory = NodeCategory
+    nodeitems_utils.NodeItem = NodeItem
+    nodeitems_utils.register_node_categories = lambda identifier, categories: None
+    nodeitems_utils.unregister_node_categories = lambda identifier: None
+
+    bmesh = types.ModuleType("bmesh")
+
+    sys.modules.update({
+        "bpy": bpy, "bpy.types": bpy_types, "bpy.props": props, "bpy.app": app, "bpy.app.handlers": handlers,
+        "bpy.utils": utils, "bpy.path": path, "mathutils": mathutils, "nodeitems_utils": nodeitems_utils,
+        "bmesh": bmesh,
+    })
+    new_scene()
+    return bpy
+
+
+def load_addon():
+    ''' Imports and registers the add-on package against the stand-in '''
+    install()
+    if ADDON_NAME in sys.modules:
+        return sys.modules[ADDON_NAME]
+
+    spec = importlib.util.spec_from_file_location(ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"),
+                                                  submodule_search_locations=[ADDON_DIR])
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
@@ -0,0 +1,181 @@
+''' Synthetic scenes and workflow trees for the benchmarks.
+Import after bpy_standin.load_addon() so bpy resolves to the stand-in.'''
+
+import random
+
+import bpy
+import numpy as np
+
+# Name filters used along the generated trees, they let every generated object through so sets keep their size
+FILTERS = [
+    ("WFNodeFilterStartsWith", "OB_"),
+    ("WFNodeFilterRegex", "_[A-C]"),
+    ("WFNodeFilterRegex", r"^OB_\d+_[A-C]\d$"),
+]
+
+# Filter selecting the objects removed by the Remove From Set nodes
+EXCLUDE_FILTER = ("WFNodeFilterEndsWith", "C0")
+
+TAGS = ["A", "B", "C"]
+
+# Corners of the faces of the cube meshes generated for the join benchmarks
+CUBE_FACES = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+
+
+def generate_scene(scene, object_count, collection_count=8):
+    ''' Fills the scene with meshes spread over nested collections, named OB_<index>_<tag><index % 10> '''
+    collections = []
+    parent = scene.collection
+    for index in range(collection_count):
+        collection = bpy.data.collections.new(f"COL_{index:03d}")
+        parent.children.link(collection)
+        collections.append(collection)
+        # Every other collection is nested into the previous one
+        parent = collection if index % 2 == 0 else scene.collection
+
+    for index in range(object_count):
+        mesh = bpy.data.meshes.new(f"ME_{index:06d}")
+        ob = bpy.data.objects.new(f"OB_{index:06d}_{TAGS[index % len(TAGS)]}{index % 10}", mesh)
+        target = collections[index % len(collections)] if collections else scene.collection
+        target.objects.link(ob)
+
+    scene.view_layers[0].update()
+
+
+def get_cube_arrays():
+    ''' Positions, edges, loop vertices, loop edges and UVs of a unit cube '''
+    positions = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float32)
+    loop_vertices = np.array(CUBE_FACES, dtype=np.int32).ravel()
+    face_edges = np.stack([loop_vertices, np.roll(np.array(CUBE_FACES), -1, axis=1).ravel()], axis=1)
+    edges, loop_edges = np.unique(np.sort(face_edges, axis=1), axis=0, return_inverse=True)
+    return (positions.ravel(), edges.astype(np.int32).ravel(), loop_vertices, loop_edges.astype(np.int32).ravel(),
+            positions[loop_vertices, :2].ravel())
+
+
+def fill_cube(mesh, cube):
+    ''' Gives the mesh the geometry of the cube arrays, with a UV map '''
+    positions, edges, loop_vertices, loop_edges, uvs = cube
+    mesh.vertices.add(len(positions) // 3)
+    mesh.vertices.foreach_set("co", positions)
+    mesh.edges.add(len(edges) // 2)
+    mesh.edges.foreach_set("vertices", edges)
+    mesh.loops.add(len(loop_vertices))
+    mesh.loops.foreach_set("vertex_index", loop_vertices)
+    mesh.loops.foreach_set("edge_index", loop_edges)
+    mesh.polygons.add(len(CUBE_FACES))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, len(loop_vertices), 4, dtype=np.int32))
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    mesh.attributes[uv_layer.name].data.foreach_set("vector", uvs)
+
+
+def generate_meshes(scene, object_count, material_count=4):
+    ''' Fills the scene with cubes placed along a line, each with a UV map and one of a few materials '''
+    materials = [bpy.data.materials.new(f"MA_{index}") for index in range(material_count)]
+    cube = get_cube_arrays()
+    for index in range(object_count):
+        mesh = bpy.data.meshes.new(f"ME_{index:06d}")
+        fill_cube(mesh, cube)
+        mesh.materials.append(materials[index % material_count])
+        ob = bpy.data.objects.new(f"OB_{index:06d}", mesh)
+        ob.matrix_world[0][3] = float(index)
+        scene.collection.objects.link(ob)
+
+    scene.view_layers[0].update()
+
+
+def generate_join_tree(scene, backend):
+    ''' Workflow tree joining all the objects of the scene. Returns the tree and the names of the runnable nodes.'''
+    tree = bpy.data.node_groups.new("Join", "WFNodeTree")
+    input_node = tree.nodes.new("WFNodeSceneInput")
+    input_node.target = scene
+    join = tree.nodes.new("WFNodeJoinObjects")
+    join.backend = backend
+    tree.links.new(input_node.outputs[0], join.inputs["objects"])
+    sink = tree.nodes.new("WFNodeDryRun")
+    tree.links.new(join.outputs[0], sink.inputs["objects"])
+    return tree, [sink.name]
+
+
+def add_filter(tree, rng=None, filter=None):
+    bl_idname, value = filter or rng.choice(FILTERS)
+    node = tree.nodes.new(bl_idname)
+    node.inputs["filter"].default_value = value
+    return node
+
+
+def generate_group(depth, length, rng):
+    ''' Group tree with a chain of filters, nesting another generated group while depth > 1 '''
+    tree = bpy.data.node_groups.new(f"Group_{depth}", "WFNodeTree")
+    tree.interface.new_socket("objects", in_out='INPUT', socket_type="WFObjectsSocket")
+    tree.interface.new_socket("objects", in_out='OUTPUT', socket_type="WFObjectsSocket")
+    group_input = tree.nodes.new("NodeGroupInput")
+    group_output = tree.nodes.new("NodeGroupOutput")
+
+    socket = group_input.outputs[0]
+    for _ in range(length):
+        node = add_filter(tree, rng)
+        tree.links.new(socket, node.inputs["objects"])
+        socket = node.outputs["objects"]
+
+    if depth > 1:
+        node = tree.nodes.new("WFNodeGroup")
+        node.node_tree = generate_group(depth - 1, length, rng)
+        node.update()
+        tree.links.new(socket, node.inputs[0])
+        socket = node.outputs[0]
+
+    tree.links.new(socket, group_output.inputs[0])
+    return tree
+
+
+def generate_tree(scene, node_count, depth, fan_out, group_depth=0, group_every=0, seed=0):
+    ''' Layered workflow tree reading the whole scene.
+    node_count nodes are spread over depth layers, every node feeds fan_out nodes of the next layer and nodes taking
+    several inputs combine them or remove a few objects of one from the other. Every group_every-th node is an instance of a group nested group_depth levels deep.
+    Each node of the last layer ends in a Dry Run node. Returns the tree and the names of the runnable nodes.'''
+    rng = random.Random(seed)
+    tree = bpy.data.node_groups.new("Benchmark", "WFNodeTree")
+
+    group = generate_group(group_depth, 2, rng) if group_depth and group_every else None
+
+    input_node = tree.nodes.new("WFNodeSceneInput")
+    input_node.target = scene
+    layer = [input_node]
+
+    per_layer = max(node_count // max(depth, 1), 1)
+    created = 0
+    for _ in range(depth):
+        # Each node of the previous layer feeds fan_out nodes, so a layer can only grow by that much
+        width = min(per_layer, len(layer) * fan_out)
+        next_layer = []
+        for index in range(width):
+            sources = [layer[(index // fan_out + offset) % len(layer)] for offset in range(min(fan_out, len(layer)))]
+            created += 1
+            if group and created % group_every == 0:
+                node = tree.nodes.new("WFNodeGroup")
+                node.node_tree = group
+                node.update()
+                tree.links.new(sources[0].outputs[0], node.inputs[0])
+            elif len(sources) > 1 and index % 3 == 0:
+                node = tree.nodes.new("WFNodeCombineSets")
+                for source in sources:
+                    tree.links.new(source.outputs[0], node.inputs["objects"])
+            elif len(sources) > 1 and index % 3 == 1:
+                exclude = add_filter(tree, filter=EXCLUDE_FILTER)
+                tree.links.new(sources[-1].outputs[0], exclude.inputs["objects"])
+                node = tree.nodes.new("WFNodeRemoveFromSet")
+                tree.links.new(sources[0].outputs[0], node.inputs["objects"])
+                tree.links.new(exclude.outputs[0], node.inputs["exclude"])
+            else:
+                node = add_filter(tree, rng)
+                tree.links.new(sources[0].outputs[0], node.inputs["objects"])
+            next_layer.append(node)
+        layer = next_layer
+
+    sinks = []
+    for node in layer:
+        sink = tree.nodes.new("WFNodeDryRun")
+        tree.links.new(node.outputs[0], sink.inputs["objects"])
+        sinks.append(sink.name)
+
+    return tree, sinks
@@ -0,0 +1,203 @@
+''' Evaluator benchmarks running the add-on against the bpy stand-in, no Blender needed:
+
+    python benchmarks/run.py                       # run and compare against baselines.json
+    python benchmarks/run.py --case wide --repeat 10
+    python benchmarks/run.py --update-baselines    # store the results as the new baselines
+
+Throughput is reported in node executions and objects received by nodes per second for the plan executor and plan
+runs reusing the results of the previous run. Join cases report the objects and vertices per second of the Join
+Objects Geometry node with the Arrays backend, whose operators are no-ops in the stand-in. Exits with a non-zero code if a result is slower than its
+baseline by more than the tolerance. Baselines depend on the machine, update them when moving to a new one.'''
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from time import perf_counter
+
+import bpy_standin
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# name -> scene and tree generation parameters
+CASES = {
+    "chain": dict(objects=1000, nodes=200, depth=200, fan_out=1),
+    "wide": dict(objects=1000, nodes=400, depth=4, fan_out=8),
+    "layered": dict(objects=2000, nodes=400, depth=20, fan_out=3),
+    "groups": dict(objects=1000, nodes=200, depth=10, fan_out=2, group_depth=3, group_every=4),
+    "many_objects": dict(objects=20000, nodes=40, depth=8, fan_out=2),
+}
+
+# name -> cube count of the scenes joined into one mesh
+JOIN_CASES = {
+    "join_10k": dict(objects=10000),
+}
+
+
+def setup_case(params):
+    import graphs
+    import bpy
+    bpy_standin.reset()
+    scene = bpy.context.scene
+    graphs.generate_scene(scene, params["objects"])
+    # Group nodes log every socket they add
+    with contextlib.redirect_stdout(io.StringIO()):
+        return graphs.generate_tree(scene, params["nodes"], params["depth"], params["fan_out"],
+                                    params.get("group_depth", 0), params.get("group_every", 0))
+
+
+def measure(func, repeat):
+    ''' Best of repeat timings '''
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        duration = perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def run_case(name, params, repeat):
+    import bpy
+    from blender_io_workflows.engine.plan import get_plan, clear_plans, compile_plan
+    from blender_io_workflows.engine.executor import execute_plan
+    from blender_io_workflows.engine.profiler import Profile
+
+    tree, sinks = setup_case(params)
+    tree.reuse_results = False
+    clear_plans()
+    start = perf_counter()
+    plan = get_plan(tree, sinks)
+    compile_time = perf_counter() - start
+
+    # Node executions and objects received, counted once with the profiler so the timed runs don't pay for it.
+    # Counted without fusing filter chains so every node counts as one execution.
+    profile = Profile()
+    execute_plan(compile_plan(tree, sinks, fuse=False), bpy.context, profile=profile)
+    executions = len(profile.spans)
+    objects = sum(span.inputs for span in profile.spans)
+
+    plan_time = measure(lambda: execute_plan(plan, bpy.context), repeat)
+
+    # Runs where nothing changed and every node that can reuse its last result does
+    tree.reuse_results = True
+    execute_plan(plan, bpy.context)
+    reuse_time = measure(lambda: execute_plan(plan, bpy.context), repeat)
+
+    return {
+        "nodes": executions,
+        "objects": objects,
+        "compile_ms": compile_time * 1000,
+        "plan_nodes_per_second": executions / plan_time,
+        "plan_objects_per_second": objects / plan_time,
+        "reuse_nodes_per_second": executions / reuse_time,
+        "reuse_objects_per_second": objects / reuse_time,
+    }
+
+
+def run_join_case(name, params, repeat):
+    import bpy
+    import graphs
+    from blender_io_workflows.engine.plan import compile_plan
+    from blender_io_workflows.engine.executor import execute_plan
+
+    best = None
+    for _ in range(repeat):
+        # Joining removes the objects, every run gets a new scene
+        bpy_standin.reset()
+        scene = bpy.context.scene
+        graphs.generate_meshes(scene, params["objects"])
+        vertices = sum(len(ob.data.vertices) for ob in scene.objects)
+        tree, sinks = graphs.generate_join_tree(scene, 'NUMPY')
+        plan = compile_plan(tree, sinks)
+
+        start = perf_counter()
+        execute_plan(plan, bpy.context)
+        duration = perf_counter() - start
+        best = duration if best is None else min(best, duration)
+
+        # The operator fallback is a no-op here, make sure the arrays did the join
+        joined = list(scene.objects)
+        if len(joined) != 1 or len(joined[0].data.vertices) != vertices:
+            raise RuntimeError(f'{name}: the meshes weren\'t joined by the Arrays backend')
+
+    return {
+        "objects": params["objects"],
+        "vertices": vertices,
+        "join_ms": best * 1000,
+        "join_objects_per_second": params["objects"] / best,
+        "join_vertices_per_second": vertices / best,
+    }
+
+
+METRICS = ["plan_nodes_per_second", "plan_objects_per_second", "reuse_nodes_per_second", "reuse_objects_per_second"]
+
+JOIN_METRICS = ["join_objects_per_second", "join_vertices_per_second"]
+
+
+def compare(name, result, baselines, tolerance):
+    ''' Returns the metrics of the result slower than their baseline by more than the tolerance '''
+    baseline = baselines.get(name)
+    if not baseline:
+        return []
+    return [metric for metric in METRICS + JOIN_METRICS
+            if metric in baseline and result[metric] < baseline[metric] * (1.0 - tolerance)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the workflow evaluator against the bpy stand-in")
+    parser.add_argument("--case", action="append", choices=sorted(CASES) + sorted(JOIN_CASES), help="Cases to run, all by default")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case, the best one is kept")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Accepted slowdown against the baselines, as a fraction")
+    parser.add_argument("--update-baselines", action="store_true", help="Store the results as the new baselines")
+    args = parser.parse_args()
+
+    bpy_standin.load_addon()
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as file:
+            baselines = json.load(file)
+
+    regressions = []
+    results = {}
+    for name in args.case or CASES:
+        if name in JOIN_CASES:
+            continue
+        result = results[name] = run_case(name, CASES[name], args.repeat)
+        slower = compare(name, result, baselines, args.tolerance)
+        regressions += [(name, metric) for metric in slower]
+        print(f'{name:>14}: {result["nodes"]:6d} nodes {result["objects"]:9d} objects '
+              f'compile {result["compile_ms"]:7.2f} ms | '
+              f'plan {result["plan_nodes_per_second"]:10.0f} nodes/s {result["plan_objects_per_second"]:12.0f} obs/s | '
+              f'reuse {result["reuse_nodes_per_second"]:10.0f} nodes/s {result["reuse_objects_per_second"]:12.0f} obs/s'
+              f'{"  REGRESSION: " + ", ".join(slower) if slower else ""}')
+
+    for name in args.case or JOIN_CASES:
+        if name not in JOIN_CASES:
+            continue
+        result = results[name] = run_join_case(name, JOIN_CASES[name], args.repeat)
+        slower = compare(name, result, baselines, args.tolerance)
+        regressions += [(name, metric) for metric in slower]
+        print(f'{name:>14}: {result["objects"]:6d} objects {result["vertices"]:8d} vertices '
+              f'join {result["join_ms"]:9.2f} ms | '
+              f'{result["join_objects_per_second"]:10.0f} obs/s {result["join_vertices_per_second"]:12.0f} verts/s'
+              f'{"  REGRESSION: " + ", ".join(slower) if slower else ""}')
+
+    if args.update_baselines:
+        baselines.update({name: {metric: round(result[metric]) for metric in METRICS + JOIN_METRICS if metric in result}
+                          for name, result in results.items()})
+        with open(BASELINES_PATH, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f'Baselines written to "{BASELINES_PATH}"')
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
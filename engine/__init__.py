@@ -0,0 +1,49 @@
+from . import objectset, plan, executor, incremental, membership
+import bpy
+from bpy.app.handlers import persistent
+
+
+@persistent
+def load_post(dummy):
+    plan.clear_plans()
+    incremental.clear_results()
+    membership.clear_membership()
+
+
+@persistent
+def depsgraph_update_post(scene, depsgraph):
+    incremental.on_depsgraph_update(scene, depsgraph)
+    membership.on_depsgraph_update(scene, depsgraph)
+
+
+@persistent
+def undo_post(scene):
+    incremental.on_undo(scene)
+    membership.clear_membership()
+
+
+HANDLERS = [
+    (bpy.app.handlers.load_post, load_post),
+    (bpy.app.handlers.depsgraph_update_post, depsgraph_update_post),
+    (bpy.app.handlers.undo_post, undo_post),
+    (bpy.app.handlers.redo_post, undo_post),
+]
+
+
+def register():
+    for handlers, handler in HANDLERS:
+        if handler not in handlers:
+            handlers.append(handler)
+
+    # Reports the invalid exporter presets when the add-on is enabled
+    from .presets import get_presets
+    get_presets().scan()
+
+
+def unregister():
+    from .parallel import cancel_parallel_run
+    cancel_parallel_run()
+
+    for handlers, handler in HANDLERS:
+        if handler in handlers:
+            handlers.remove(handler)
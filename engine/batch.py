@@ -0,0 +1,157 @@
+import bpy
+import json
+import traceback
+from fnmatch import fnmatchcase
+from time import perf_counter
+from .objectset import ObjectSet
+from .plan import SLOT
+
+
+def match_any(name, patterns):
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def get_group_tree_names():
+    ''' Names of the trees used by group nodes, they are only run through their group instances '''
+    return {node.node_tree.name for tree in bpy.data.node_groups if tree.bl_idname == "WFNodeTree"
+            for node in tree.nodes if node.bl_idname == "WFNodeGroup" and node.node_tree}
+
+
+def find_workflows(tree_patterns=("*",), node_patterns=("*",)):
+    ''' Returns (tree, [runnable node names]) pairs for the trees and runnable nodes matching any of the patterns '''
+    from ..nodes.mixins import WFRunnableNode
+    group_trees = get_group_tree_names()
+    workflows = []
+    for tree in bpy.data.node_groups:
+        if tree.bl_idname != "WFNodeTree" or tree.name in group_trees or not match_any(tree.name, tree_patterns):
+            continue
+
+        node_names = [node.name for node in tree.nodes
+                      if isinstance(node, WFRunnableNode) and match_any(node.name, node_patterns)]
+        if node_names:
+            workflows.append((tree, node_names))
+
+    return workflows
+
+
+def count_step_objects(plan, run, node_name):
+    ''' Number of distinct objects a top level step received through its links '''
+    step = next((step for step in plan.steps if step.node_name == node_name), None)
+    if not step:
+        return 0
+
+    scope = (plan.tree_name,)
+    obs = ObjectSet().union(*(run.values.get(scope + source[1:]) or ()
+                              for sources in step.inputs.values() for source in sources
+                              if source[0] == SLOT))
+    return len(obs)
+
+
+def run_pass(context, tree, node_names):
+    ''' Runs some of the runnable nodes of a tree in one isolated pass, returns the report entries for its sinks '''
+    from .plan import get_plan
+    from .executor import execute_plan
+    from .staging import Staging
+
+    plan = get_plan(tree, node_names)
+    start = perf_counter()
+    with Staging(context) as staging:
+        run = execute_plan(plan, bpy.context, staging)
+        counts = {node_name: count_step_objects(plan, run, node_name) for node_name in node_names}
+    duration = perf_counter() - start
+
+    # The part of the pass not spent in the sinks themselves is shared between them
+    shared = max(duration - sum(run.durations.get(node_name, 0.0) for node_name in node_names), 0.0)
+    shared /= len(node_names)
+
+    return [{
+        "node": node_name,
+        "status": "success",
+        "duration": run.durations.get(node_name, 0.0),
+        "pass_duration": duration,
+        "cost": run.durations.get(node_name, 0.0) + shared,
+        "objects": counts[node_name],
+        "output_files": run.output_files.get(node_name, []),
+        "export_cache": run.export_cache.get(node_name, {}),
+    } for node_name in node_names]
+
+
+def run_tree(context, tree, node_names):
+    ''' Runs the given runnable nodes of a tree in as few passes as possible.
+    A failing pass is run again one node at a time so the failure is reported for the nodes causing it.'''
+    from .plan import get_plan, split_sinks
+
+    if tree.run_all_mode != 'SEPARATE':
+        batches = split_sinks(get_plan(tree, node_names), node_names)
+    else:
+        batches = [[node_name] for node_name in node_names]
+
+    sinks = []
+    for batch in batches:
+        try:
+            sinks += run_pass(context, tree, batch)
+            continue
+        except Exception as err:
+            if len(batch) == 1:
+                sinks.append({"node": batch[0], "status": "error", "error": str(err),
+                              "traceback": traceback.format_exc()})
+                continue
+
+        for node_name in batch:
+            try:
+                sinks += run_pass(context, tree, [node_name])
+            except Exception as err:
+                sinks.append({"node": node_name, "status": "error", "error": str(err),
+                              "traceback": traceback.format_exc()})
+
+    return sinks
+
+
+def run_batch(tree_patterns=("*",), node_patterns=("*",), report_path=None, context=None, base_dir=None):
+    ''' Runs the workflows of the trees and runnable nodes matching the name or glob patterns without UI.
+    Every pass runs isolated in a staging scene, so the open file is left as it was.
+    Relative output paths resolve against base_dir if given, e.g. the directory of the file a snapshot was saved from.
+    Returns the run report and writes it as JSON to report_path if given.'''
+    context = context or bpy.context
+    if context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    from ..utils import set_base_dir
+    start = perf_counter()
+    trees = []
+    set_base_dir(base_dir)
+    try:
+        for tree, node_names in find_workflows(tree_patterns, node_patterns):
+            tree_start = perf_counter()
+            sinks = run_tree(context, tree, node_names)
+            trees.append({
+                "name": tree.name,
+                "status": "success" if all(sink["status"] == "success" for sink in sinks) else "error",
+                "duration": perf_counter() - tree_start,
+                "sinks": sinks,
+            })
+    finally:
+        set_base_dir(None)
+
+    if not trees:
+        status = "error"
+        error = f'No runnable nodes match trees {list(tree_patterns)} and nodes {list(node_patterns)}'
+    else:
+        status = "success" if all(tree["status"] == "success" for tree in trees) else "error"
+        error = None
+
+    report = {
+        "blend_file": bpy.data.filepath,
+        "blender_version": bpy.app.version_string,
+        "status": status,
+        "duration": perf_counter() - start,
+        "trees": trees,
+    }
+    if error:
+        report["error"] = error
+
+    if report_path:
+        with open(bpy.path.abspath(report_path), "w") as file:
+            json.dump(report, file, indent=2)
+
+    return report
@@ -0,0 +1,300 @@
+import bpy
+from time import perf_counter
+from .objectset import ObjectSet, as_object_set
+from .plan import SLOT, GROUP_INPUT
+
+_active_run = None
+
+
+def get_active_run():
+    return _active_run
+
+
+def get_socket_key(socket):
+    return (socket.id_data.name, socket.node.name, socket.identifier)
+
+
+# Socket values only exist for the duration of a plan run, see Run.values
+def store_socket_value(socket, data):
+    if _active_run:
+        _active_run.set_output(socket, data)
+
+
+def load_socket_value(socket):
+    if _active_run:
+        return _active_run.values.get(_active_run.get_socket_key(socket))
+    return None
+
+
+def has_socket_value(socket):
+    return bool(_active_run) and _active_run.get_socket_key(socket) in _active_run.values
+
+
+def clear_socket_value(socket):
+    if _active_run:
+        _active_run.values.pop(_active_run.get_socket_key(socket), None)
+
+
+def record_output_file(filepath):
+    ''' Attributes a file written by a node to the top level step running when it was written '''
+    if _active_run:
+        _active_run.output_files.setdefault(_active_run.root_step, []).append(filepath)
+
+
+def get_chunk_filepath(filepath):
+    ''' Adds the index of the chunks being run to the file name, e.g. Rock_chunk002.gltf, so the files written for a
+    chunk don't overwrite the ones of the previous chunks. Other paths are left as they are.'''
+    if not _active_run or not _active_run.chunks:
+        return filepath
+    import os
+    stem, extension = os.path.splitext(filepath)
+    return f"{stem}_chunk{'_'.join(f'{index:03d}' for index in _active_run.chunks)}{extension}"
+
+
+def record_export_cache(result):
+    ''' Counts the export cache hits, misses and bypassed exports of the top level step running '''
+    if _active_run:
+        counts = _active_run.export_cache.setdefault(_active_run.root_step, {})
+        counts[result] = counts.get(result, 0) + 1
+
+
+def get_object_count(value):
+    return len(value) if isinstance(value, ObjectSet) else 0
+
+
+class Frame():
+    ''' Execution state of a plan for one node tree instance '''
+
+    __slots__ = ("tree", "plan", "scope", "group_inputs", "step", "streamed")
+
+    def __init__(self, tree, plan, scope, group_inputs=None):
+        self.tree = tree
+        self.plan = plan
+        # Path of tree and group node names identifying this tree instance
+        self.scope = scope
+        self.group_inputs = group_inputs or {}
+        self.step = None
+        # Names of the steps already run by a streaming step
+        self.streamed = set()
+
+
+class Run():
+    ''' Executes a plan step by step keeping the socket values produced during the run '''
+
+    def __init__(self, context, staging=None, profile=None):
+        self.context = context
+        self.staging = staging
+        self.profile = profile
+        self.values = {}
+        self.frame = None
+        # Top level step name -> seconds it took, including the group instances it runs
+        self.durations = {}
+        # Top level step name -> files written while running it
+        self.output_files = {}
+        # Top level step name -> export cache result -> count
+        self.export_cache = {}
+        self.root_step = None
+        # Index of the chunk running for every streaming node running, outermost first
+        self.chunks = []
+        # Results of previous runs to reuse, when the tree allows it
+        self.results = None
+        # Step key (scope + node name) -> version of the step outputs, see ResultCache
+        self.versions = {}
+        self.objects_by_handle = None
+        # Object handles -> object set rebuilt from them for the reused results
+        self.resolved = {}
+        # Layer collections of the objects of the view layer the run works in, see layers.LayerIndex
+        self.layer_index = None
+        self.index_names = False
+        # id of an object set -> (set, names.NameIndex), dropped whenever a step changes the scene
+        self.name_indexes = {}
+
+    def get_source_value(self, frame, source):
+        if source[0] == SLOT:
+            return self.values.get(frame.scope + source[1:])
+        elif source[0] == GROUP_INPUT:
+            return frame.group_inputs.get(source[1])
+        return None
+
+    def get_staged_value(self, value):
+        ''' Swaps staged objects in, copying them first when the current step is about to change them '''
+        if self.staging and isinstance(value, ObjectSet):
+            step = self.frame.step
+            return self.staging.get_objects(value, step.mutates and not step.group)
+        return value
+
+    def get_input(self, socket):
+        frame = self.frame
+        sources = frame.step.inputs.get(socket.identifier)
+        if sources:
+            return self.get_staged_value(self.get_source_value(frame, sources[0]))
+
+        from ..nodes.mixins import get_socket_value
+        return get_socket_value(socket)
+
+    def get_all_inputs(self, socket):
+        frame = self.frame
+        sources = frame.step.inputs.get(socket.identifier)
+        if not sources:
+            return ObjectSet()
+        elif len(sources) == 1:
+            return self.get_staged_value(as_object_set(self.get_source_value(frame, sources[0])))
+
+        return self.get_staged_value(
+            ObjectSet().union(*(self.get_source_value(frame, source) or () for source in sources)))
+
+    def get_socket_key(self, socket):
+        frame = self.frame
+        if frame and socket.id_data == frame.tree:
+            return frame.scope + (socket.node.name, socket.identifier)
+        return get_socket_key(socket)
+
+    def set_output(self, socket, data):
+        frame = self.frame
+        self.values[frame.scope + (frame.step.node_name, socket.identifier)] = data
+
+    def get_objects_by_handle(self):
+        if self.objects_by_handle is None:
+            self.objects_by_handle = {ob.session_uid: ob for ob in bpy.data.objects}
+        return self.objects_by_handle
+
+    def execute(self, plan):
+        tree = bpy.data.node_groups[plan.tree_name]
+        self.index_names = tree.index_names
+        if tree.reuse_results:
+            from .incremental import get_results
+            self.results = get_results()
+        self.execute_frame(Frame(tree, plan, (tree.name,)))
+
+    def execute_frame(self, frame):
+        parent = self.frame
+        self.frame = frame
+        try:
+            nodes = frame.tree.nodes
+            for step in frame.plan.steps:
+                if step.node_name not in frame.streamed:
+                    self.run_step(frame, step, nodes[step.node_name], not parent)
+        finally:
+            self.frame = parent
+
+    def run_step(self, frame, step, node, root):
+        frame.step = step
+        if not root:
+            self.execute_step(frame, step, node)
+            return
+
+        self.root_step = step.node_name
+        start = perf_counter()
+        try:
+            self.execute_step(frame, step, node)
+        finally:
+            # Streamed steps run once per chunk
+            self.durations[step.node_name] = self.durations.get(step.node_name, 0.0) + perf_counter() - start
+
+    def execute_step(self, frame, step, node):
+        results = self.results
+        if results and results.reuse(self, frame, step, node):
+            return
+
+        if self.profile:
+            self.execute_profiled_step(frame, step, node)
+        elif step.group:
+            self.execute_group(frame, step, node)
+        else:
+            self.execute_node(frame, step, node)
+
+        if step.mutates and self.name_indexes:
+            self.name_indexes.clear()
+        if results:
+            results.record(self, frame, step, node)
+
+    def execute_profiled_step(self, frame, step, node):
+        span = self.profile.begin(frame.tree.name, step.node_name, frame.scope)
+        try:
+            if step.group:
+                self.execute_group(frame, step, node)
+            else:
+                self.execute_node(frame, step, node)
+        finally:
+            inputs = sum(get_object_count(self.get_source_value(frame, source))
+                         for sources in step.inputs.values() for source in sources)
+            outputs = sum(get_object_count(self.values.get(frame.scope + (step.node_name, socket.identifier)))
+                          for socket in node.outputs)
+            self.profile.end(span, inputs, outputs)
+
+    def execute_node(self, frame, step, node):
+        if step.fused:
+            nodes = frame.tree.nodes
+            node.execute_chain(self.context, [nodes[name] for name in step.fused])
+        elif getattr(node, "wf_streams", False) and node.stream:
+            self.execute_stream(frame, step, node)
+        else:
+            node.execute(self.context)
+
+    def execute_stream(self, frame, step, node):
+        ''' Runs a streaming node, and the steps depending on it once for every chunk it outputs.
+        The steps they also depend on run before the first chunk. When there is nothing to stream, the steps depending
+        on it run once on the output the node leaves.'''
+        if len(frame.scope) > 1:
+            # The group outputs would hold the objects of the last chunk, which are deleted by then
+            raise RuntimeError(f'"{node.name}" can\'t stream inside the node group "{frame.tree.name}", turn off '
+                               f'Stream or move it to the workflow tree')
+
+        from .plan import split_stream
+        prerequisites, downstream = split_stream(frame.plan, step)
+        nodes = frame.tree.nodes
+        for other in prerequisites:
+            self.run_step(frame, other, nodes[other.node_name], True)
+        frame.step = step
+
+        self.chunks.append(0)
+        try:
+            for chunk in node.execute_chunks(self.context):
+                self.chunks[-1] += 1
+                self.run_downstream(frame, step, node, downstream)
+                # The copies the steps worked on go before the next chunk, along with the chunk
+                if self.staging:
+                    self.staging.release(chunk)
+        finally:
+            streamed_chunks = self.chunks.pop()
+        if not streamed_chunks:
+            self.run_downstream(frame, step, node, downstream)
+
+        streamed = prerequisites + downstream
+        frame.streamed.update(other.node_name for other in streamed)
+        # The steps run from here have durations of their own
+        self.durations[step.node_name] = self.durations.get(step.node_name, 0.0) - sum(
+            self.durations.get(other.node_name, 0.0) for other in streamed)
+
+    def run_downstream(self, frame, step, node, downstream):
+        ''' Runs the steps depending on a streaming node on its current output '''
+        # Every chunk is a new version of the node outputs for the steps it feeds
+        if self.results:
+            self.results.record(self, frame, step, node)
+        nodes = frame.tree.nodes
+        for other in downstream:
+            self.run_step(frame, other, nodes[other.node_name], True)
+        frame.step = step
+        self.root_step = step.node_name
+
+    def execute_group(self, frame, step, node):
+        group_inputs = {socket.identifier: self.get_input(socket) for socket in node.inputs}
+        inner = Frame(node.node_tree, step.group, frame.scope + (node.name,), group_inputs)
+        if self.results:
+            self.results.enter_group(self, frame, step, inner)
+        self.execute_frame(inner)
+
+        for identifier, sources in step.group.outputs.items():
+            self.values[frame.scope + (step.node_name, identifier)] = self.get_source_value(inner, sources[0])
+
+
+def execute_plan(plan, context, staging=None, profile=None):
+    global _active_run
+    run = Run(context, staging, profile)
+    _active_run = run
+    try:
+        run.execute(plan)
+    finally:
+        _active_run = None
+
+    return run
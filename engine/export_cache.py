@@ -0,0 +1,515 @@
+import bpy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from time import monotonic, sleep, time
+from urllib.parse import unquote
+
+import numpy as np
+
+# Bumped when the key or the layout of the cache directory change, so old entries are never matched
+CACHE_FORMAT = 2
+
+INDEX_FILENAME = "index.json"
+# Held while the index and the entry directories are read and changed, the directory is shared between processes
+LOCK_FILENAME = "index.lock"
+
+# Seconds to wait for the lock of the index before giving up, on Windows
+LOCK_TIMEOUT = 60.0
+
+# Exporter operator -> keyword argument limiting the export to the selected objects
+SELECTION_KWARGS = {
+    "export_scene.gltf": "use_selection",
+    "export_scene.fbx": "use_selection",
+    "wm.obj_export": "export_selected_objects",
+}
+
+# Exporter operator -> module of the add-on implementing it, the exporter version is part of the key
+EXPORTER_MODULES = {
+    "export_scene.gltf": "io_scene_gltf2",
+    "export_scene.fbx": "io_scene_fbx",
+}
+
+# Attribute data type -> (foreach_get field, values per item, array type)
+ATTRIBUTE_ARRAYS = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, np.bool_),
+    'FLOAT2': ("vector", 2, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'QUATERNION': ("value", 4, np.float32),
+    'FLOAT4X4': ("value", 16, np.float32),
+}
+
+# Node properties that only change how the node looks in the editor
+NODE_SKIP = {"location", "width", "height", "dimensions", "select", "show_options", "show_preview",
+             "show_texture", "hide"}
+
+# Object types turned into meshes by the exporters
+GEOMETRY_TYPES = {'MESH', 'CURVE', 'SURFACE', 'FONT', 'META'}
+
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "evicted": 0}
+
+# Cache directory -> ExportCache
+_caches = {}
+
+
+class Uncacheable(Exception):
+    ''' The export depends on something the key can't describe '''
+    pass
+
+
+def get_stats():
+    return _stats
+
+
+def count_result(result):
+    ''' Counts an export cache hit, miss or bypassed export, also for the top level step running '''
+    from .executor import record_export_cache
+    _stats[result] += 1
+    record_export_cache(result)
+
+
+def get_key(value):
+    ''' Plain comparable form of a property value '''
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    elif isinstance(value, bpy.types.ID):
+        return (type(value).__name__, value.name, value.library.filepath if value.library else None)
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(get_key(item) for item in value))
+    try:
+        return tuple(get_key(item) for item in value)
+    except TypeError:
+        return str(value)
+
+
+def hash_value(h, value):
+    h.update(repr(value).encode())
+    h.update(b"\0")
+
+
+def hash_array(h, collection, field, size, dtype):
+    array = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(field, array)
+    hash_value(h, (field, len(array)))
+    h.update(array.tobytes())
+
+
+def hash_rna(h, struct, skip=()):
+    ''' Hashes the plain properties and the data-block pointers of a struct '''
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.identifier in skip or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+            continue
+        hash_value(h, (prop.identifier, get_key(value)))
+
+
+def hash_id_properties(h, owner):
+    hash_value(h, sorted((key, get_key(value)) for key, value in owner.items()))
+
+
+def hash_animation(h, owner):
+    animation_data = getattr(owner, "animation_data", None)
+    if not animation_data:
+        return
+    actions = [animation_data.action] + [strip.action for track in animation_data.nla_tracks for strip in track.strips]
+    for action in actions:
+        if not action:
+            continue
+        hash_value(h, action.name)
+        for fcurve in action.fcurves:
+            hash_value(h, (fcurve.data_path, fcurve.array_index, fcurve.extrapolation,
+                           [point.interpolation for point in fcurve.keyframe_points]))
+            for field in ("co", "handle_left", "handle_right"):
+                hash_array(h, fcurve.keyframe_points, field, 2, np.float32)
+
+
+def hash_mesh(h, mesh):
+    hash_value(h, (len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons),
+                   [get_key(material) for material in mesh.materials]))
+    hash_array(h, mesh.polygons, "loop_start", 1, np.int32)
+    for attribute in sorted(mesh.attributes, key=lambda attribute: attribute.name):
+        if attribute.name.startswith(".select"):
+            continue
+        spec = ATTRIBUTE_ARRAYS.get(attribute.data_type)
+        if not spec:
+            raise Uncacheable(f'Unsupported attribute type {attribute.data_type}')
+        field, size, dtype = spec
+        hash_value(h, (attribute.name, attribute.domain, attribute.data_type))
+        hash_array(h, attribute.data, field, size, dtype)
+
+    if mesh.shape_keys:
+        hash_animation(h, mesh.shape_keys)
+        for key_block in mesh.shape_keys.key_blocks:
+            hash_value(h, (key_block.name, key_block.value, key_block.mute, get_key(key_block.relative_key)))
+            hash_array(h, key_block.data, "co", 3, np.float32)
+
+
+def hash_image(h, image):
+    if image.is_dirty:
+        raise Uncacheable(f'Image "{image.name}" has unsaved changes')
+    hash_value(h, (image.name, image.source, image.filepath, image.colorspace_settings.name, image.alpha_mode,
+                   tuple(image.size)))
+    if image.packed_file:
+        hash_value(h, ("packed", image.packed_file.size))
+    elif image.source in {'FILE', 'SEQUENCE', 'TILED'}:
+        path = bpy.path.abspath(image.filepath, library=image.library)
+        try:
+            stat = os.stat(path)
+            hash_value(h, (stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            hash_value(h, "missing")
+
+
+def hash_node_tree(h, tree, seen):
+    # Material node trees are embedded and share their name
+    if tree.as_pointer() in seen:
+        return
+    seen.add(tree.as_pointer())
+    hash_value(h, tree.name)
+    for node in sorted(tree.nodes, key=lambda node: node.name):
+        hash_rna(h, node, NODE_SKIP)
+        for socket in node.inputs:
+            if hasattr(socket, "default_value"):
+                hash_value(h, (socket.identifier, get_key(socket.default_value)))
+        image = getattr(node, "image", None)
+        if image:
+            hash_image(h, image)
+        group = getattr(node, "node_tree", None)
+        if group:
+            hash_node_tree(h, group, seen)
+    hash_value(h, sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name,
+                          link.to_socket.identifier, link.is_muted) for link in tree.links))
+
+
+def hash_material(h, material, seen):
+    if material.as_pointer() in seen:
+        return
+    seen.add(material.as_pointer())
+    hash_rna(h, material, {"preview"})
+    hash_id_properties(h, material)
+    if material.node_tree:
+        hash_node_tree(h, material.node_tree, seen)
+
+
+def hash_object(h, ob, depsgraph, seen):
+    hash_value(h, (ob.name, ob.type, get_key(ob.data), get_key(ob.parent), ob.parent_type, ob.parent_bone,
+                   [tuple(row) for row in ob.matrix_world], ob.hide_render, ob.hide_viewport, ob.hide_get()))
+    hash_id_properties(h, ob)
+    hash_animation(h, ob)
+
+    for slot in ob.material_slots:
+        hash_value(h, (slot.link, get_key(slot.material)))
+        if slot.material:
+            hash_material(h, slot.material, seen)
+
+    for modifier in ob.modifiers:
+        hash_rna(h, modifier)
+        if modifier.type == 'NODES':
+            hash_id_properties(h, modifier)
+            if modifier.node_group:
+                hash_node_tree(h, modifier.node_group, seen)
+    for constraint in ob.constraints:
+        hash_rna(h, constraint)
+    hash_value(h, [group.name for group in ob.vertex_groups])
+
+    if ob.type == 'MESH':
+        hash_mesh(h, ob.data)
+        if ob.vertex_groups:
+            from .meshes import read_vertex_weights
+            for array in read_vertex_weights(ob.data):
+                hash_value(h, len(array))
+                h.update(array.tobytes())
+    elif ob.type == 'ARMATURE':
+        hash_value(h, [(bone.name, bone.parent.name if bone.parent else None,
+                        [tuple(row) for row in bone.matrix_local], tuple(bone.tail_local)) for bone in ob.data.bones])
+        hash_value(h, [(bone.name, [tuple(row) for row in bone.matrix_basis]) for bone in ob.pose.bones])
+    elif ob.data:
+        hash_rna(h, ob.data)
+
+    # Modifiers may read other objects, the evaluated geometry covers what the stack makes of them
+    if ob.type in GEOMETRY_TYPES and (ob.modifiers or ob.type != 'MESH'):
+        evaluated = ob.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        if mesh:
+            hash_mesh(h, mesh)
+        evaluated.to_mesh_clear()
+
+
+def get_exported_objects(context, operator, kwargs):
+    if kwargs.get(SELECTION_KWARGS.get(operator)):
+        return context.selected_objects
+    return context.scene.objects
+
+
+def get_exporter_version(operator):
+    import sys
+    module = sys.modules.get(EXPORTER_MODULES.get(operator, ""))
+    bl_info = getattr(module, "bl_info", None)
+    return tuple(bl_info["version"]) if bl_info else None
+
+
+def get_cache_key(context, operator, kwargs):
+    ''' Hash of everything the exported files depend on, None if the export can't be cached '''
+    from .. import bl_info
+    if kwargs.get("path_mode") == 'COPY' and not kwargs.get("embed_textures"):
+        # The exporter copies textures next to the file, they aren't tracked
+        return None
+
+    h = hashlib.sha256()
+    hash_value(h, (CACHE_FORMAT, bpy.app.version_string, tuple(bl_info["version"]), operator,
+                   get_exporter_version(operator)))
+    hash_value(h, sorted((key, get_key(value)) for key, value in kwargs.items() if key != "filepath"))
+    # The file name can end up in the files, the directory is where the cached files are copied to
+    hash_value(h, os.path.basename(kwargs["filepath"]))
+
+    scene = context.scene
+    hash_value(h, (scene.unit_settings.system, scene.unit_settings.scale_length, scene.frame_start,
+                   scene.frame_end, scene.frame_current, scene.render.fps, scene.render.fps_base))
+
+    depsgraph = context.evaluated_depsgraph_get()
+    seen = set()
+    try:
+        for ob in sorted(get_exported_objects(context, operator, kwargs), key=lambda ob: ob.name):
+            hash_object(h, ob, depsgraph, seen)
+    except Uncacheable:
+        return None
+    return h.hexdigest()
+
+
+def get_output_files(filepath):
+    ''' Files written by an export to filepath, relative to its directory '''
+    files = [os.path.basename(filepath)]
+    stem, ext = os.path.splitext(filepath)
+    ext = ext.lower()
+    if ext == ".gltf":
+        with open(filepath) as file:
+            gltf = json.load(file)
+        for item in gltf.get("buffers", []) + gltf.get("images", []):
+            uri = item.get("uri")
+            if uri and not uri.startswith("data:"):
+                files.append(os.path.normpath(unquote(uri)))
+    elif ext == ".obj" and os.path.exists(stem + ".mtl"):
+        files.append(os.path.basename(stem) + ".mtl")
+    return files
+
+
+def lock_file(file, timeout=LOCK_TIMEOUT):
+    ''' Blocks until the process holds the exclusive lock of the open file.
+    On Windows, raises TimeoutError if the lock is still held by another process after timeout seconds.'''
+    if os.name == 'nt':
+        import msvcrt
+        deadline = monotonic() + timeout
+        file.seek(0)
+        while True:
+            try:
+                # Retries once a second for 10 seconds before raising
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                if monotonic() >= deadline:
+                    raise TimeoutError(f'Timed out waiting for the export cache lock "{file.name}", another '
+                                       f'Blender process may be stuck exporting')
+                sleep(0.1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+
+def unlock_file(file):
+    if os.name == 'nt':
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class ExportCache():
+    ''' Exported files stored under the key of what they were exported from.
+    The least recently used entries are deleted when the cache grows over its size limit. Background workers
+    share the directory, every change to the index or to the entries is made holding the lock of the index and
+    the index is read again and written back within it.'''
+
+    def __init__(self, directory, limit):
+        self.directory = directory
+        self.limit = limit
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.lock_path = os.path.join(directory, LOCK_FILENAME)
+        self.index_mtime = None
+        # key -> {"files": relative file paths, "size": bytes, "used": last use time}
+        self.entries = {}
+        # Bytes of the entries when the index was last read or written, None until then
+        self.size = None
+
+    @contextmanager
+    def locked(self):
+        ''' Holds the lock of the index, not reentrant '''
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a+b") as file:
+            lock_file(file)
+            try:
+                yield
+            finally:
+                unlock_file(file)
+
+    def load(self, force=False):
+        ''' Reads the index if it changed since it was last read. Two writes can share a modification time,
+        changes made holding the lock read it in any case.'''
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            self.entries = {}
+            self.index_mtime = None
+            self.update_size()
+            return
+        if force or mtime != self.index_mtime:
+            try:
+                with open(self.index_path) as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                self.entries = {}
+            self.index_mtime = mtime
+            self.update_size()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f'{self.index_path}.{os.getpid()}'
+        with open(temp_path, "w") as file:
+            json.dump(self.entries, file)
+        os.replace(temp_path, self.index_path)
+        self.index_mtime = os.stat(self.index_path).st_mtime_ns
+        self.update_size()
+
+    def update_size(self):
+        self.size = sum(entry["size"] for entry in self.entries.values())
+
+    def get_size(self):
+        ''' Bytes used by the cache as of the last fetch, store or eviction of this process, cheap enough to draw '''
+        if self.size is None:
+            self.load()
+        return self.size
+
+    def fetch(self, key, filepath):
+        ''' Copies the files cached for the key next to filepath, returns False if there are none '''
+        with self.locked():
+            self.load(force=True)
+            entry = self.entries.get(key)
+            if not entry:
+                return False
+
+            entry_dir = os.path.join(self.directory, key)
+            target_dir = os.path.dirname(filepath)
+            try:
+                for name in entry["files"]:
+                    target = os.path.join(target_dir, name)
+                    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+                    # Copied rather than linked, exporting to the same path again would write through a link
+                    shutil.copyfile(os.path.join(entry_dir, name), target)
+            except OSError:
+                self.remove(key)
+                self.save()
+                return False
+
+            entry["used"] = time()
+            self.save()
+            return True
+
+    def store(self, key, filepath):
+        ''' Adds the files just exported to filepath to the cache '''
+        files = get_output_files(filepath)
+        source_dir = os.path.dirname(filepath)
+        os.makedirs(self.directory, exist_ok=True)
+        # Copied outside of the lock, the entry only appears once it's complete
+        temp_dir = tempfile.mkdtemp(prefix="tmp_", dir=self.directory)
+        size = 0
+        try:
+            for name in files:
+                target = os.path.join(temp_dir, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(source_dir, name), target)
+                size += os.path.getsize(target)
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+
+        with self.locked():
+            entry_dir = os.path.join(self.directory, key)
+            try:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(temp_dir, entry_dir)
+            except OSError:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return
+
+            self.load(force=True)
+            self.entries[key] = {"files": files, "size": size, "used": time()}
+            self.evict()
+            self.save()
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+        shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+
+    def evict(self):
+        size = sum(entry["size"] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda key: self.entries[key]["used"]):
+            if size <= self.limit:
+                break
+            size -= self.entries[key]["size"]
+            self.remove(key)
+            _stats["evicted"] += 1
+
+    def clear(self):
+        with self.locked():
+            self.load(force=True)
+            for key in list(self.entries):
+                self.remove(key)
+            self.save()
+
+    def export(self, context, operator, kwargs, exporter):
+        ''' Runs the exporter unless the files for the current state of the objects are cached.
+        Returns whether the export was a hit, a miss or bypassed the cache.'''
+        key = get_cache_key(context, operator, kwargs)
+        if key is None:
+            exporter()
+            result = "bypassed"
+        elif self.fetch(key, kwargs["filepath"]):
+            result = "hits"
+        else:
+            exporter()
+            self.store(key, kwargs["filepath"])
+            result = "misses"
+
+        count_result(result)
+        return result
+
+
+def get_cache_dir(tree):
+    if tree.export_cache_dir:
+        from ..utils import get_abspath
+        return os.path.normpath(get_abspath(tree.export_cache_dir))
+    return os.path.join(tempfile.gettempdir(), "blender_io_workflows_export_cache")
+
+
+def get_export_cache(tree):
+    ''' Export cache configured by the tree, None if the tree doesn't cache its exports '''
+    if not getattr(tree, "export_cache", False):
+        return None
+    directory = get_cache_dir(tree)
+    cache = _caches.get(directory)
+    if not cache:
+        cache = _caches[directory] = ExportCache(directory, 0)
+    cache.limit = tree.export_cache_size * 1024 * 1024
+    return cache
@@ -0,0 +1,178 @@
+import bpy
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from time import perf_counter
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "export_objects.py")
+
+# Output file path -> seconds its last parallel export took, used to balance the next ones
+_costs = {}
+
+# (tree name, node name) -> last parallel export of the node: file entries, worker count and seconds it took
+_results = {}
+
+
+def get_export_results(node):
+    return _results.get((node.id_data.name, node.name))
+
+
+def get_json_value(value):
+    ''' Exporter argument in a form that survives JSON, enum flag sets are tagged to be restored '''
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    elif isinstance(value, (set, frozenset)):
+        return {"set": sorted(value)}
+    try:
+        return [get_json_value(item) for item in value]
+    except TypeError:
+        return str(value)
+
+
+def get_kwargs_value(value):
+    if isinstance(value, dict) and "set" in value:
+        return set(value["set"])
+    return value
+
+
+class ExportWorker():
+    ''' Background Blender process exporting some of the objects from a snapshot of the current file '''
+
+    def __init__(self, snapshot_path, job, dir):
+        self.job = job
+        self.job_path = os.path.join(dir, f"job_{id(self)}.json")
+        self.report_path = os.path.join(dir, f"report_{id(self)}.json")
+        self.log_path = os.path.join(dir, f"log_{id(self)}.txt")
+        with open(self.job_path, "w") as file:
+            json.dump(job, file)
+
+        args = [bpy.app.binary_path, "-b", snapshot_path, "--python", SCRIPT_PATH, "--",
+                "--job", self.job_path, "--report", self.report_path]
+        self.log = open(self.log_path, "w")
+        self.process = subprocess.Popen(args, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def wait(self):
+        self.process.wait()
+        self.log.close()
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.wait()
+
+    def get_files(self):
+        ''' File entries of the job, failing the ones the worker did not report '''
+        try:
+            with open(self.report_path) as file:
+                files = json.load(file)["files"]
+        except (OSError, ValueError, KeyError):
+            files = []
+
+        reported = {entry["object"] for entry in files}
+        error = f'Worker exited with code {self.process.returncode} before exporting it, see "{self.log_path}"'
+        files += [{"object": export["object"], "filepath": export["kwargs"]["filepath"], "status": "error",
+                   "error": error, "duration": 0.0}
+                  for export in self.job["exports"] if export["object"] not in reported]
+        return files
+
+
+def export_parallel(node, context, operator, exports, worker_count, cache=None):
+    ''' Exports every (object, exporter arguments) pair on its own in background Blender processes.
+    The workers open a snapshot of the file as it is now and export the objects the way the serial export does,
+    with only the exported object selected and active. Raises if any of the exports failed.'''
+    from .parallel import split_shards
+    from .executor import record_output_file
+    from .export_cache import count_result
+
+    start = perf_counter()
+    dir = tempfile.mkdtemp(prefix="wf_export_")
+    snapshot_path = os.path.join(dir, "snapshot.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=snapshot_path, copy=True, check_existing=False)
+
+    kwargs_by_name = {ob.name: {key: get_json_value(value) for key, value in kwargs.items()} for ob, kwargs in exports}
+    costs = {name: _costs.get(kwargs["filepath"], 0.0) for name, kwargs in kwargs_by_name.items()}
+
+    workers = []
+    try:
+        for shard in split_shards(costs, worker_count):
+            job = {
+                "scene": context.scene.name,
+                "view_layer": context.view_layer.name,
+                "operator": operator,
+                "cache": {"directory": cache.directory, "limit": cache.limit} if cache else None,
+                "exports": [{"object": name, "kwargs": kwargs_by_name[name]} for name in shard],
+            }
+            workers.append(ExportWorker(snapshot_path, job, dir))
+        for worker in workers:
+            worker.wait()
+    except BaseException:
+        for worker in workers:
+            worker.kill()
+        shutil.rmtree(dir, ignore_errors=True)
+        raise
+
+    order = {ob.name: index for index, (ob, _) in enumerate(exports)}
+    files = sorted((entry for worker in workers for entry in worker.get_files()), key=lambda entry: order[entry["object"]])
+    for entry in files:
+        if entry["status"] == "success":
+            _costs[entry["filepath"]] = entry["duration"]
+            record_output_file(entry["filepath"])
+            if entry.get("cache"):
+                count_result(entry["cache"])
+
+    _results[(node.id_data.name, node.name)] = {"files": files, "workers": len(workers),
+                                                "duration": perf_counter() - start}
+    failed = [entry for entry in files if entry["status"] != "success"]
+
+    # Keep the worker logs around when something failed
+    if failed:
+        os.remove(snapshot_path)
+        errors = "; ".join(f'{entry["object"]}: {entry["error"]}' for entry in failed[:3])
+        raise RuntimeError(f'{len(failed)} of {len(files)} objects failed to export ({errors})')
+    shutil.rmtree(dir, ignore_errors=True)
+
+
+def run_job(job_path, report_path):
+    ''' Exports the objects of a job, called by the worker script in the background process.
+    The report is written after every file so the exports done before a crash are not lost.'''
+    from ..utils import export_scene
+    from .export_cache import ExportCache
+
+    with open(job_path) as file:
+        job = json.load(file)
+
+    scene = bpy.data.scenes[job["scene"]]
+    view_layer = scene.view_layers[job["view_layer"]]
+    cache = ExportCache(job["cache"]["directory"], job["cache"]["limit"]) if job["cache"] else None
+
+    files = []
+    with bpy.context.temp_override(scene=scene, view_layer=view_layer):
+        for ob in view_layer.objects:
+            ob.select_set(False)
+
+        for export in job["exports"]:
+            kwargs = {key: get_kwargs_value(value) for key, value in export["kwargs"].items()}
+            entry = {"object": export["object"], "filepath": kwargs["filepath"], "status": "success"}
+            start = perf_counter()
+            ob = view_layer.objects.get(export["object"])
+            try:
+                if not ob:
+                    raise KeyError(f'Object "{export["object"]}" not found in the snapshot')
+                ob.select_set(True)
+                view_layer.objects.active = ob
+                entry["cache"] = export_scene(bpy.context, job["operator"], kwargs, cache)
+            except Exception as e:
+                entry["status"] = "error"
+                entry["error"] = str(e)
+            finally:
+                if ob:
+                    ob.select_set(False)
+            entry["duration"] = perf_counter() - start
+            files.append(entry)
+
+            with open(report_path, "w") as file:
+                json.dump({"files": files}, file, indent=2)
+
+    return files
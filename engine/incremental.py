@@ -0,0 +1,223 @@
+import bpy
+from itertools import count
+from .objectset import ObjectSet
+from .plan import SLOT, GROUP_INPUT
+
+_versions = count(1)
+
+
+def can_reuse(step, node):
+    ''' Only nodes whose outputs are a function of their inputs and settings can skip running.
+    Input nodes read the scene, and debug and runnable nodes are run for their side effects.'''
+    from ..nodes.mixins import WFInputNode, WFDebugNode, WFRunnableNode
+    return not step.mutates and not step.group and not isinstance(node, (WFInputNode, WFDebugNode, WFRunnableNode))
+
+
+def get_value_key(value):
+    ''' Comparable form of a socket value or setting that doesn't keep references to Blender data '''
+    if isinstance(value, ObjectSet):
+        return tuple(value.handles())
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    elif isinstance(value, bpy.types.ID):
+        return ("ID", value.session_uid)
+    try:
+        return tuple(get_value_key(item) for item in value)
+    except TypeError:
+        return str(value)
+
+
+def get_node_settings(node):
+    ''' Values of the properties defined by the add-on and of the unlinked input sockets of a node '''
+    settings = [node.bl_idname]
+    for prop in node.bl_rna.properties:
+        if prop.is_runtime and prop.type != 'COLLECTION':
+            settings.append(get_value_key(getattr(node, prop.identifier)))
+
+    from ..nodes.mixins import get_socket_value
+    for socket in node.inputs:
+        if not socket.is_linked and hasattr(socket, "default_value"):
+            settings.append(get_value_key(get_socket_value(socket)))
+    return tuple(settings)
+
+
+class Entry():
+    ''' Outputs of a node from a previous run and what they were computed from '''
+
+    __slots__ = ("signature", "version", "outputs", "names")
+
+    def __init__(self, signature, version, outputs, names):
+        self.signature = signature
+        self.version = version
+        # Output identifier -> tuple of object handles or plain value
+        self.outputs = outputs
+        # session_uid -> name of the objects the node received, for the nodes that may be reused
+        self.names = names
+
+
+class ResultCache():
+    ''' Keeps node results between runs to skip nodes whose inputs and settings didn't change.
+    Every result gets a version that changes when the result does. A node is clean if its settings and the
+    versions of its inputs match the ones it last ran with, so a node re-running with an identical result
+    leaves the nodes downstream clean. Objects are kept as session_uid handles to survive undo.'''
+
+    def __init__(self):
+        # Step key (scope + node name) -> Entry
+        self.entries = {}
+        # session_uid -> {step key: name} of the clean nodes that received the object
+        self.watched = {}
+
+    def clear(self):
+        self.entries.clear()
+        self.watched.clear()
+
+    def invalidate(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.unwatch(key, entry)
+
+    def watch(self, key, entry):
+        for handle, name in entry.names.items():
+            self.watched.setdefault(handle, {})[key] = name
+
+    def unwatch(self, key, entry):
+        for handle in entry.names:
+            keys = self.watched.get(handle)
+            if keys:
+                keys.pop(key, None)
+                if not keys:
+                    del self.watched[handle]
+
+    def object_changed(self, ob):
+        ''' Marks dirty the nodes that received the object under a different name '''
+        keys = self.watched.get(ob.session_uid)
+        if not keys:
+            return
+        for key, name in list(keys.items()):
+            if ob.name != name:
+                self.invalidate(key)
+
+    def check_objects(self):
+        ''' Marks dirty the nodes that received objects that are gone or were renamed since '''
+        if not self.watched:
+            return
+        objects = {ob.session_uid: ob for ob in bpy.data.objects}
+        for handle, keys in list(self.watched.items()):
+            ob = objects.get(handle)
+            for key, name in list(keys.items()):
+                if not ob or ob.name != name:
+                    self.invalidate(key)
+
+    def get_source_version(self, run, frame, source):
+        if source[0] == SLOT:
+            return run.versions.get(frame.scope + (source[1],))
+        elif source[0] == GROUP_INPUT:
+            return run.versions.get(frame.scope + (None, source[1]))
+        return None
+
+    def get_signature(self, run, frame, step, node):
+        inputs = tuple((identifier, tuple(self.get_source_version(run, frame, source) for source in sources))
+                       for identifier, sources in step.inputs.items())
+        settings = get_node_settings(node)
+        if step.fused:
+            nodes = frame.tree.nodes
+            settings = tuple(get_node_settings(nodes[name]) for name in step.fused) + (settings,)
+        return (settings, inputs)
+
+    def enter_group(self, run, frame, step, inner):
+        ''' Versions of the values passed to a group instance, as seen by the steps inside it '''
+        for identifier, sources in step.inputs.items():
+            run.versions[inner.scope + (None, identifier)] = tuple(
+                self.get_source_version(run, frame, source) for source in sources)
+
+    def reuse(self, run, frame, step, node):
+        ''' Sets the outputs of a clean node from its last run, returns False if the node has to run '''
+        key = frame.scope + (step.node_name,)
+        entry = self.entries.get(key)
+        if not entry or not can_reuse(step, node):
+            return False
+
+        signature = self.get_signature(run, frame, step, node)
+        if entry.signature != signature:
+            return False
+
+        values = {}
+        for identifier, value in entry.outputs.items():
+            if isinstance(value, tuple) and value and value[0] == "OBJECTS":
+                value = self.resolve(run, value[1])
+                if value is None:
+                    return False
+            values[frame.scope + (step.node_name, identifier)] = value
+
+        run.values.update(values)
+        run.versions[key] = entry.version
+        return True
+
+    def resolve(self, run, handles):
+        ''' Object set for the handles, shared by all the nodes of the run with the same result.
+        Returns None if any of the objects is gone.'''
+        obs = run.resolved.get(handles)
+        if obs is None:
+            objects = run.get_objects_by_handle()
+            try:
+                obs = run.resolved[handles] = ObjectSet.from_handles({handle: objects[handle] for handle in handles})
+            except KeyError:
+                return None
+        return obs
+
+    def record(self, run, frame, step, node):
+        ''' Stores the outputs of a node that just ran and gives them a version '''
+        key = frame.scope + (step.node_name,)
+        outputs = {}
+        for socket in node.outputs:
+            value = run.values.get(frame.scope + (step.node_name, socket.identifier))
+            if isinstance(value, ObjectSet):
+                outputs[socket.identifier] = ("OBJECTS", tuple(value.handles()))
+            elif value is not None:
+                outputs[socket.identifier] = value
+
+        previous = self.entries.get(key)
+        version = previous.version if previous and previous.outputs == outputs else next(_versions)
+        run.versions[key] = version
+
+        names = {}
+        reusable = can_reuse(step, node)
+        if reusable:
+            for sources in step.inputs.values():
+                for source in sources:
+                    value = run.get_source_value(frame, source)
+                    if isinstance(value, ObjectSet):
+                        for ob in value:
+                            names[ob.session_uid] = ob.name
+
+        if previous:
+            self.unwatch(key, previous)
+        entry = self.entries[key] = Entry(self.get_signature(run, frame, step, node), version, outputs, names)
+        if reusable:
+            self.watch(key, entry)
+
+
+# Results kept between the runs of every tree
+_results = ResultCache()
+
+
+def get_results():
+    return _results
+
+
+def clear_results():
+    _results.clear()
+
+
+def on_depsgraph_update(scene, depsgraph):
+    from .executor import get_active_run
+    if not _results.watched or get_active_run():
+        return
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object):
+            _results.object_changed(update.id.original)
+
+
+def on_undo(scene):
+    _results.check_objects()
@@ -0,0 +1,71 @@
+import bpy
+from .objectset import ObjectSet
+
+
+def is_instancer(ob):
+    ''' Whether making the instances of the object real creates objects '''
+    if ob.instance_type != 'NONE' or getattr(ob, "is_instancer", False):
+        return True
+    return any(mod.type == 'NODES' for mod in getattr(ob, "modifiers", ()))
+
+
+def get_instance_count(ob):
+    ''' Estimate of the objects making the instances of the object real creates '''
+    count = 0
+    if ob.instance_type == 'COLLECTION' and ob.instance_collection:
+        count += len(ob.instance_collection.all_objects)
+    elif ob.instance_type in {'VERTS', 'FACES'} and ob.type == 'MESH':
+        elements = ob.data.vertices if ob.instance_type == 'VERTS' else ob.data.polygons
+        count += len(elements) * len(ob.children)
+    for system in getattr(ob, "particle_systems", ()):
+        if system.settings.render_type in {'OBJECT', 'COLLECTION'}:
+            count += system.settings.count
+    return max(count, 1)
+
+
+def split_chunks(instancers, chunk_size):
+    ''' Groups instancers in order so that each group creates at most chunk_size objects, or all in one group if
+    chunk_size is 0. Instancers creating more objects than that get a group of their own.'''
+    if not chunk_size:
+        return [instancers] if instancers else []
+
+    chunks = []
+    chunk = []
+    size = 0
+    for ob in instancers:
+        count = get_instance_count(ob)
+        if chunk and size + count > chunk_size:
+            chunks.append(chunk)
+            chunk = []
+            size = 0
+        chunk.append(ob)
+        size += count
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def realize_instances(context, obs, chunk_size=0):
+    ''' Makes the instances of the instancers in the set real, chunk by chunk, yielding the objects each chunk
+    created. The instancers of a chunk are made single user first, the objects are expected to be in the view layer.
+    Objects created by a chunk are only the ones it made, whatever else was selected.'''
+    instancers = [ob for ob in obs if is_instancer(ob)]
+    for chunk in split_chunks(instancers, chunk_size):
+        bpy.ops.object.select_all(action='DESELECT')
+        for ob in chunk:
+            ob.select_set(True)
+        context.view_layer.objects.active = chunk[0]
+        bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
+
+        existing = {ob.session_uid for ob in context.selected_objects}
+        bpy.ops.object.duplicates_make_real()
+        yield ObjectSet(ob for ob in context.selected_objects if ob.session_uid not in existing)
+
+
+def remove_objects(obs):
+    ''' Deletes the objects along with the data nothing else uses anymore '''
+    data = {ob.data.session_uid: ob.data for ob in obs if ob.data}
+    bpy.data.batch_remove(list(obs))
+    orphans = [id_data for id_data in data.values() if id_data.users == 0]
+    if orphans:
+        bpy.data.batch_remove(orphans)
@@ -0,0 +1,159 @@
+import bpy
+import numpy as np
+from .export_cache import ATTRIBUTE_ARRAYS
+from .meshes import MeshArrays, has_unread_data
+
+# Object types the join operator path converts to meshes first, joins with any of them go through the operators
+CONVERTIBLE_TYPES = {'CURVE', 'SURFACE', 'FONT', 'META', 'CURVES', 'POINTCLOUD', 'GREASEPENCIL'}
+
+# Vertices transformed at once, bounds the memory used by the per vertex matrices
+CHUNK_SIZE = 1 << 18
+
+
+def get_join_order(context, target, obs):
+    ''' Meshes in the order the join operator reads them: the active object, then the view layer order '''
+    handles = {ob.session_uid for ob in obs if ob.type == 'MESH'}
+    handles.discard(target.session_uid)
+    return [target] + [ob for ob in context.view_layer.objects if ob.session_uid in handles]
+
+
+def can_join(meshes, matrices):
+    ''' Whether the array join gives the same result as the operator for these meshes '''
+    for ob in meshes:
+        if has_unread_data(ob) or any(slot.link == 'OBJECT' for slot in ob.material_slots):
+            return False
+    # The operator flips the faces of mirrored objects
+    return not (np.linalg.det(np.array(matrices)[:, :3, :3]) < 0.0).any()
+
+
+def transform_positions(parts, matrices):
+    ''' Positions of all the meshes in the space of the target, one matrix multiply per chunk of vertices '''
+    positions = np.concatenate([part.positions for part in parts]) if parts else np.empty((0, 3))
+    owners = np.repeat(np.arange(len(parts)), [len(part.positions) for part in parts])
+    matrices = np.array(matrices)
+    result = np.empty_like(positions)
+    for start in range(0, len(positions), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        owner_matrices = matrices[owners[start:end]]
+        rotated = np.einsum('nij,nj->ni', owner_matrices[:, :3, :3], positions[start:end])
+        result[start:end] = rotated + owner_matrices[:, :3, 3]
+    return result
+
+
+def merge_materials(parts):
+    ''' Material slots of the joined mesh and the polygon material indices remapped to them.
+    Like the operator, the target keeps its slots and indices, materials of the other meshes go to the first slot
+    holding them or to a new slot at the end.'''
+    materials = list(parts[0].materials)
+    slots = {}
+    for index, material in enumerate(materials):
+        slots.setdefault(material, index)
+
+    # Slot of every material of every mesh, meshes without materials keep their indices
+    remaps = [None] * len(parts)
+    for position, part in enumerate(parts[1:], 1):
+        if not part.materials:
+            continue
+        remap = []
+        for material in part.materials:
+            if material not in slots:
+                slots[material] = len(materials)
+                materials.append(material)
+            remap.append(slots[material])
+        remaps[position] = np.array(remap, dtype=np.int32)
+
+    indices = np.concatenate([part.material_indices for part in parts])
+    remapped = [position for position, remap in enumerate(remaps) if remap is not None]
+    if not remapped:
+        return materials, indices
+
+    # One lookup into the slots of all the remapped meshes, out of range indices go to their last material
+    sizes = np.array([len(remaps[position]) for position in remapped])
+    table = np.concatenate([remaps[position] for position in remapped])
+    table_starts = np.zeros(len(parts), dtype=np.int64)
+    table_starts[remapped] = np.cumsum(sizes) - sizes
+    table_sizes = np.ones(len(parts), dtype=np.int64)
+    table_sizes[remapped] = sizes
+    owners = np.repeat(np.arange(len(parts)), [len(part.material_indices) for part in parts])
+    selected = np.isin(owners, remapped)
+    owners = owners[selected]
+    local = np.clip(indices[selected], 0, table_sizes[owners] - 1)
+    indices[selected] = table[table_starts[owners] + local]
+    return materials, indices
+
+
+def merge_attributes(parts):
+    ''' Attribute values of the joined mesh, zeros where a mesh doesn't have the attribute.
+    Returns None if meshes have attributes with the same name and different types or domains.'''
+    layouts = {}
+    for part in parts:
+        for name, (domain, data_type, _) in part.attributes.items():
+            if layouts.setdefault(name, (domain, data_type)) != (domain, data_type):
+                return None
+
+    merged = {}
+    for name, (domain, data_type) in layouts.items():
+        _, size, dtype = ATTRIBUTE_ARRAYS[data_type]
+        values = []
+        for part in parts:
+            attribute = part.attributes.get(name)
+            values.append(attribute[2] if attribute else np.zeros(part.counts[domain] * size, dtype=dtype))
+        merged[name] = (domain, data_type, np.concatenate(values))
+    return merged
+
+
+def get_offsets(parts, domain):
+    return np.cumsum([0] + [part.counts[domain] for part in parts[:-1]])
+
+
+def join_meshes(context, obs):
+    ''' Joins the meshes of the set into the first one from their arrays, without operators or selection changes.
+    Gives the same result as selecting them and joining them into the first with the join operator.
+    Returns the joined object, or None if the set needs the operator path.'''
+    if any(ob.type in CONVERTIBLE_TYPES for ob in obs):
+        return None
+    meshes = [ob for ob in obs if ob.type == 'MESH']
+    if not meshes:
+        return None
+
+    target = meshes[0]
+    meshes = get_join_order(context, target, meshes)
+    inverse = np.array(target.matrix_world.inverted())
+    matrices = [inverse @ np.array(ob.matrix_world) for ob in meshes]
+    if not can_join(meshes, matrices):
+        return None
+
+    parts = [MeshArrays.from_mesh(ob.data) for ob in meshes]
+    attributes = merge_attributes(parts)
+    if attributes is None:
+        return None
+
+    materials, material_indices = merge_materials(parts)
+    vertex_offsets = get_offsets(parts, 'POINT')
+    edge_offsets = get_offsets(parts, 'EDGE')
+    loop_offsets = get_offsets(parts, 'CORNER')
+    joined = MeshArrays(
+        positions=transform_positions(parts, matrices),
+        edges=np.concatenate([part.edges + offset for part, offset in zip(parts, vertex_offsets)]),
+        seams=np.concatenate([part.seams for part in parts]),
+        loop_vertices=np.concatenate([part.loop_vertices + offset for part, offset in zip(parts, vertex_offsets)]),
+        loop_edges=np.concatenate([part.loop_edges + offset for part, offset in zip(parts, edge_offsets)]),
+        loop_starts=np.concatenate([part.loop_starts + offset for part, offset in zip(parts, loop_offsets)]),
+        material_indices=material_indices,
+        attributes=attributes,
+        uv_names=dict.fromkeys(name for part in parts for name in part.uv_names))
+
+    # The target keeps its mesh data block and settings, only the geometry is replaced
+    mesh = target.data
+    joined.write(mesh)
+    for material in materials[len(mesh.materials):]:
+        mesh.materials.append(material)
+
+    # Like the operator, the joined objects are deleted along with the meshes nothing else uses
+    for ob in meshes[1:]:
+        data = ob.data
+        bpy.data.objects.remove(ob, do_unlink=True)
+        if data.users == 0 and data != mesh:
+            bpy.data.meshes.remove(data)
+
+    return target
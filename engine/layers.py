@@ -0,0 +1,55 @@
+import bpy
+
+
+def get_data_signature():
+    return len(bpy.data.objects), len(bpy.data.collections)
+
+
+class LayerIndex():
+    ''' Layer collections of every object of a view layer, built in one traversal of its layer collection tree.
+    Objects and collections created after the index was built are picked up by building it again when an object
+    is missing and the number of objects or collections changed since.'''
+
+    def __init__(self, view_layer):
+        self.view_layer = view_layer
+        # session_uid -> layer collections linking the object directly, in depth first order
+        self.layer_collections = None
+        self.signature = None
+
+    def build(self):
+        self.layer_collections = {}
+        self.signature = get_data_signature()
+        stack = [self.view_layer.layer_collection]
+        while stack:
+            layer_collection = stack.pop()
+            for ob in layer_collection.collection.objects:
+                self.layer_collections.setdefault(ob.session_uid, []).append(layer_collection)
+            stack.extend(reversed(layer_collection.children))
+
+    def get(self, ob):
+        ''' Layer collections containing the object, empty if it isn't in the view layer '''
+        if self.layer_collections is None:
+            self.build()
+        layer_collections = self.layer_collections.get(ob.session_uid)
+        if layer_collections is None and self.signature != get_data_signature():
+            self.build()
+            layer_collections = self.layer_collections.get(ob.session_uid)
+        return layer_collections or []
+
+    def find(self, ob):
+        ''' First layer collection containing the object, as a depth first search would find it '''
+        layer_collections = self.get(ob)
+        return layer_collections[0] if layer_collections else None
+
+
+def get_layer_index(view_layer):
+    ''' Layer index of the view layer shared by the nodes of the active run, a new one outside of runs '''
+    from .executor import get_active_run
+    run = get_active_run()
+    if not run:
+        return LayerIndex(view_layer)
+
+    index = run.layer_index
+    if not index or index.view_layer != view_layer:
+        index = run.layer_index = LayerIndex(view_layer)
+    return index
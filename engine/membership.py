@@ -0,0 +1,81 @@
+import bpy
+from .objectset import ObjectSet
+
+
+def get_data_signature():
+    return len(bpy.data.objects), len(bpy.data.collections)
+
+
+class MembershipIndex():
+    ''' Objects of collections, including their child collections, and of scenes, kept between runs.
+    An entry is dropped when the depsgraph reports a change to a collection or scene it was built from, and all are
+    dropped when objects or collections were added or removed since they were built. Members are in depth first
+    order, each object once even when several child collections link it.'''
+
+    def __init__(self):
+        # Collection session_uid, or ("SCENE", session_uid) -> (members, session_uids of the IDs they come from)
+        self.entries = {}
+        self.signature = None
+
+    def clear(self):
+        self.entries.clear()
+        self.signature = None
+
+    def check(self):
+        signature = get_data_signature()
+        if signature != self.signature:
+            self.entries.clear()
+            self.signature = signature
+
+    def invalidate(self, handle):
+        for key, (_, sources) in list(self.entries.items()):
+            if handle in sources:
+                del self.entries[key]
+
+    def get_collection_objects(self, collection):
+        self.check()
+        entry = self.entries.get(collection.session_uid)
+        if entry is None:
+            members = ObjectSet()
+            sources = set()
+            stack = [collection]
+            while stack:
+                col = stack.pop()
+                sources.add(col.session_uid)
+                for ob in col.objects:
+                    members.add(ob)
+                stack.extend(reversed(col.children))
+            entry = self.entries[collection.session_uid] = (members, sources)
+        return entry[0].copy()
+
+    def get_scene_objects(self, scene):
+        self.check()
+        key = ("SCENE", scene.session_uid)
+        entry = self.entries.get(key)
+        if entry is None:
+            sources = {scene.session_uid}
+            sources.update(col.session_uid for col in scene.collection.children_recursive)
+            entry = self.entries[key] = (ObjectSet(scene.objects), sources)
+        return entry[0].copy()
+
+
+_membership = MembershipIndex()
+
+
+def get_membership():
+    return _membership
+
+
+def clear_membership():
+    _membership.clear()
+
+
+def on_depsgraph_update(scene, depsgraph):
+    if not _membership.entries:
+        return
+    if not (depsgraph.id_type_updated('COLLECTION') or depsgraph.id_type_updated('SCENE')):
+        return
+
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Collection, bpy.types.Scene)):
+            _membership.invalidate(update.id.original.session_uid)
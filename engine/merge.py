@@ -0,0 +1,204 @@
+import itertools
+import numpy as np
+from .export_cache import ATTRIBUTE_ARRAYS
+from .meshes import MeshArrays, has_unread_data
+
+# Cells per axis of the grid hash at most, larger meshes get cells wider than the merge distance
+GRID_CELLS = 1 << 20
+
+# Neighbour cells checked from every cell, each pair of adjacent cells is visited once
+HALF_NEIGHBOURS = [offset for offset in itertools.product((-1, 0, 1), repeat=3) if offset > (0, 0, 0)]
+
+# Candidate vertex pairs compared at once, bounds the memory used for dense cells
+BATCH_PAIRS = 1 << 22
+
+# Vertices merging into the same vertex above which they are merged with array operations
+GROUP_ARRAY_SIZE = 16
+
+
+def get_cell_keys(cells):
+    return (cells[:, 0] << 42) + (cells[:, 1] << 21) + cells[:, 2]
+
+
+def split_blocks(starts_a, counts_a, starts_b, counts_b, batch_size):
+    ''' Splits the cell pairs into blocks of at most batch_size vertex pairs, cutting the vertices of cell a into runs
+    when there are too many of them '''
+    rows = np.maximum(batch_size // counts_b, 1)
+    pieces = -(-counts_a // rows)
+    owners = np.repeat(np.arange(len(counts_a)), pieces)
+    piece = np.arange(len(owners)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    rows = rows[owners]
+    return (starts_a[owners] + piece * rows, np.minimum(rows, counts_a[owners] - piece * rows),
+            starts_b[owners], counts_b[owners])
+
+
+def get_cell_pairs(starts_a, counts_a, starts_b, counts_b):
+    ''' Pairs taking every vertex of cell a with every vertex of cell b, for all the cell pairs at once.
+    Vertices are given by their position in the vertices sorted by cell.'''
+    sizes = counts_a * counts_b
+    owners = np.repeat(np.arange(len(sizes)), sizes)
+    local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return starts_a[owners] + local // counts_b[owners], starts_b[owners] + local % counts_b[owners]
+
+
+def iter_cell_pairs(starts_a, counts_a, starts_b, counts_b, batch_size=BATCH_PAIRS):
+    ''' Pairs of the cell pairs like get_cell_pairs, in batches of about batch_size pairs at most '''
+    blocks = split_blocks(starts_a, counts_a, starts_b, counts_b, batch_size)
+    sizes = blocks[1] * blocks[3]
+    batches = (np.cumsum(sizes) - sizes) // batch_size
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(batches)) + 1, [len(sizes)]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield get_cell_pairs(*(block[start:end] for block in blocks))
+
+
+def find_close_pairs(positions, distance):
+    ''' Pairs (i, j) with i < j of the vertices at most distance apart, sorted, found with a grid hash.
+    Vertices are put in cells at least distance wide, so close vertices are in the same or adjacent cells. The
+    candidate pairs of the cells are compared in batches, only the close pairs are kept.'''
+    low = positions.min(axis=0)
+    extent = (positions.max(axis=0) - low).max()
+    cell_size = max(distance, extent / (GRID_CELLS - 1))
+    # Cells start at 1 so that neighbour keys never go negative
+    cells = ((positions - low) / cell_size).astype(np.int64) + 1
+    keys = get_cell_keys(cells)
+
+    order = np.argsort(keys, kind='stable')
+    cell_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    cell_coordinates = cells[order[starts]]
+    # Vertices of a cell pair are read next to each other
+    sorted_positions = positions[order]
+
+    # (starts, counts) of cell a and cell b for the cells with themselves and with every neighbour cell
+    cell_pairs = [(starts, counts, starts, counts)]
+    for offset in HALF_NEIGHBOURS:
+        neighbour_keys = get_cell_keys(cell_coordinates + offset)
+        found = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        adjacent = np.flatnonzero(cell_keys[found] == neighbour_keys)
+        if len(adjacent):
+            neighbours = found[adjacent]
+            cell_pairs.append((starts[adjacent], counts[adjacent], starts[neighbours], counts[neighbours]))
+
+    limit = distance * distance
+    firsts = []
+    seconds = []
+    for same_cell, cell_pair in zip(itertools.chain([True], itertools.repeat(False)), cell_pairs):
+        for a, b in iter_cell_pairs(*cell_pair):
+            if same_cell:
+                # Every pair is there both ways, along with the vertices paired with themselves
+                keep = a < b
+                a, b = a[keep], b[keep]
+            offsets = sorted_positions[a] - sorted_positions[b]
+            keep = np.einsum('ij,ij->i', offsets, offsets) <= limit
+            a, b = order[a[keep]], order[b[keep]]
+            firsts.append(np.minimum(a, b).astype(np.int32))
+            seconds.append(np.maximum(a, b).astype(np.int32))
+
+    first = np.concatenate(firsts)
+    second = np.concatenate(seconds)
+    ordered = np.argsort(first.astype(np.int64) * len(positions) + second)
+    return first[ordered], second[ordered]
+
+
+def find_doubles(positions, distance):
+    ''' Vertex every vertex merges into, itself if it stays.
+    Like remove doubles, vertices are visited in index order and each one that wasn't merged yet takes all the
+    vertices within distance that weren't merged or taken either.'''
+    targets = np.arange(len(positions))
+    if len(positions) < 2:
+        return targets
+
+    if distance <= 0.0:
+        _, firsts, inverse = np.unique(positions, axis=0, return_index=True, return_inverse=True)
+        return firsts[inverse.ravel()]
+
+    first, second = find_close_pairs(positions, distance)
+    vertices, starts = np.unique(first, return_index=True)
+    ends = np.append(starts[1:], len(first))
+    merged = np.zeros(len(positions), dtype=np.bool_)
+    # Read and written one vertex at a time without going through numpy scalars
+    flags = memoryview(merged)
+    for i, start, end in zip(vertices.tolist(), starts.tolist(), ends.tolist()):
+        if flags[i]:
+            continue
+        if end - start > GROUP_ARRAY_SIZE:
+            taken = second[start:end]
+            taken = taken[~merged[taken]]
+            merged[taken] = True
+            targets[taken] = i
+        else:
+            for j in second[start:end].tolist():
+                if not flags[j]:
+                    flags[j] = True
+                    targets[j] = i
+    return targets
+
+
+def weld(arrays, targets):
+    ''' Mesh arrays with the vertices merged into their targets.
+    Edges are remapped and the ones collapsing or doubling removed, loops between merged vertices are dropped and
+    faces left with fewer than three corners removed. Merged elements keep the data of the first one.'''
+    kept_vertices = targets == np.arange(len(targets))
+    vertex_map = (np.cumsum(kept_vertices) - 1)[targets]
+
+    # Edges
+    edges = vertex_map[arrays.edges].reshape(-1, 2)
+    edge_keys = np.minimum(edges[:, 0], edges[:, 1]) * len(targets) + np.maximum(edges[:, 0], edges[:, 1])
+    valid = edges[:, 0] != edges[:, 1]
+    _, firsts, inverse = np.unique(edge_keys, return_index=True, return_inverse=True)
+    # Edges keep the order of their first occurrence
+    first_valid = firsts[valid[firsts]]
+    kept_edges = np.zeros(len(edges), dtype=bool)
+    kept_edges[first_valid] = True
+    edge_map = (np.cumsum(kept_edges) - 1)[firsts[inverse.ravel()]]
+
+    # Loops and faces
+    loop_faces = arrays.get_loop_faces()
+    loop_vertices = vertex_map[arrays.loop_vertices]
+    following = np.arange(1, len(loop_vertices) + 1)
+    if len(arrays.loop_starts):
+        following[np.append(arrays.loop_starts[1:], len(loop_vertices)) - 1] = arrays.loop_starts
+    kept_loops = loop_vertices != loop_vertices[following % max(len(loop_vertices), 1)]
+    totals = np.bincount(loop_faces[kept_loops], minlength=len(arrays.loop_starts))
+    kept_faces = totals >= 3
+    kept_loops &= kept_faces[loop_faces]
+    loop_starts = np.cumsum(totals[kept_faces]) - totals[kept_faces]
+
+    masks = {'POINT': kept_vertices, 'EDGE': kept_edges, 'CORNER': kept_loops, 'FACE': kept_faces}
+    attributes = {}
+    for name, (domain, data_type, values) in arrays.attributes.items():
+        size = ATTRIBUTE_ARRAYS[data_type][1]
+        attributes[name] = (domain, data_type, values.reshape(-1, size)[masks[domain]].ravel())
+
+    return MeshArrays(positions=arrays.positions[kept_vertices],
+                      edges=edges[kept_edges].ravel().astype(np.int32),
+                      seams=arrays.seams[kept_edges],
+                      loop_vertices=loop_vertices[kept_loops].astype(np.int32),
+                      loop_edges=edge_map[arrays.loop_edges[kept_loops]].astype(np.int32),
+                      loop_starts=loop_starts.astype(np.int32),
+                      material_indices=arrays.material_indices[kept_faces],
+                      attributes=attributes,
+                      uv_names=arrays.uv_names)
+
+
+def merge_by_distance(ob, distance):
+    ''' Merges the vertices of the object's mesh closer than distance, without edit mode.
+    Returns the number of vertices removed.'''
+    mesh = ob.data
+    if has_unread_data(ob):
+        # Shape keys, vertex groups and custom normals are carried by bmesh
+        import bmesh
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        count = len(bm.verts)
+        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=distance)
+        removed = count - len(bm.verts)
+        bm.to_mesh(mesh)
+        bm.free()
+        return removed
+
+    arrays = MeshArrays.from_mesh(mesh)
+    targets = find_doubles(arrays.positions, distance)
+    removed = len(targets) - int((targets == np.arange(len(targets))).sum())
+    if removed:
+        weld(arrays, targets).write(mesh)
+    return removed
@@ -0,0 +1,111 @@
+import numpy as np
+from .export_cache import ATTRIBUTE_ARRAYS
+
+# Attributes read and written through the vertex, edge, loop and polygon arrays
+BUILTIN_ATTRIBUTES = {"position", "material_index", ".edge_verts", ".corner_vert", ".corner_edge"}
+
+
+def read_array(collection, field, size, dtype):
+    array = np.empty(len(collection) * size, dtype=dtype)
+    collection.foreach_get(field, array)
+    return array
+
+
+def read_vertex_weights(mesh):
+    ''' Vertex group entries of the mesh as (counts, groups, weights) arrays, counts being the number of entries of
+    every vertex. RNA has no accessor for all the entries at once, the entries of every vertex are read into slices
+    of the arrays with foreach_get.'''
+    entries = [vertex.groups for vertex in mesh.vertices]
+    counts = np.fromiter(map(len, entries), np.int32, len(entries))
+    groups = np.empty(int(counts.sum()), np.int32)
+    weights = np.empty(len(groups), np.float32)
+    end = 0
+    for vertex_entries, count in zip(entries, counts.tolist()):
+        if count:
+            start, end = end, end + count
+            vertex_entries.foreach_get("group", groups[start:end])
+            vertex_entries.foreach_get("weight", weights[start:end])
+    return counts, groups, weights
+
+
+def has_unread_data(ob):
+    ''' Whether the object's mesh has data the arrays don't carry, which rewriting the mesh from them would lose '''
+    mesh = ob.data
+    return bool(mesh.shape_keys or ob.vertex_groups or getattr(mesh, "has_custom_normals", False))
+
+
+class MeshArrays():
+    ''' Geometry of a mesh as flat arrays, read with foreach_get and written back with foreach_set.
+    Attributes are name -> (domain, data type, values), selection and hiding aren't kept.'''
+
+    def __init__(self, positions, edges, seams, loop_vertices, loop_edges, loop_starts, material_indices,
+                 attributes=None, uv_names=(), materials=()):
+        self.positions = positions
+        self.edges = edges
+        self.seams = seams
+        self.loop_vertices = loop_vertices
+        self.loop_edges = loop_edges
+        self.loop_starts = loop_starts
+        self.material_indices = material_indices
+        self.attributes = attributes or {}
+        self.uv_names = list(uv_names)
+        self.materials = list(materials)
+        self.counts = {'POINT': len(positions), 'EDGE': len(edges) // 2, 'CORNER': len(loop_vertices),
+                       'FACE': len(loop_starts)}
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        attributes = {}
+        for attribute in mesh.attributes:
+            if attribute.name in BUILTIN_ATTRIBUTES or attribute.name.startswith("."):
+                continue
+            spec = ATTRIBUTE_ARRAYS.get(attribute.data_type)
+            if spec:
+                field, size, dtype = spec
+                attributes[attribute.name] = (attribute.domain, attribute.data_type,
+                                              read_array(attribute.data, field, size, dtype))
+
+        return cls(positions=read_array(mesh.vertices, "co", 3, np.float64).reshape(-1, 3),
+                   edges=read_array(mesh.edges, "vertices", 2, np.int32),
+                   seams=read_array(mesh.edges, "use_seam", 1, np.bool_),
+                   loop_vertices=read_array(mesh.loops, "vertex_index", 1, np.int32),
+                   loop_edges=read_array(mesh.loops, "edge_index", 1, np.int32),
+                   loop_starts=read_array(mesh.polygons, "loop_start", 1, np.int32),
+                   material_indices=read_array(mesh.polygons, "material_index", 1, np.int32),
+                   attributes=attributes,
+                   uv_names=[layer.name for layer in mesh.uv_layers],
+                   materials=mesh.materials)
+
+    def get_loop_faces(self):
+        ''' Face index of every loop, faces own consecutive loops starting at their loop start '''
+        totals = np.diff(np.append(self.loop_starts, len(self.loop_vertices)))
+        return np.repeat(np.arange(len(self.loop_starts)), totals)
+
+    def write(self, mesh):
+        ''' Replaces the geometry of the mesh, which keeps its settings, materials and active UV maps '''
+        active_uv = mesh.uv_layers.active.name if mesh.uv_layers.active else None
+        render_uv = next((layer.name for layer in mesh.uv_layers if layer.active_render), None)
+
+        mesh.clear_geometry()
+        mesh.vertices.add(len(self.positions))
+        mesh.vertices.foreach_set("co", self.positions.astype(np.float32).ravel())
+        mesh.edges.add(len(self.edges) // 2)
+        mesh.edges.foreach_set("vertices", self.edges)
+        mesh.edges.foreach_set("use_seam", self.seams)
+        mesh.loops.add(len(self.loop_vertices))
+        mesh.loops.foreach_set("vertex_index", self.loop_vertices)
+        mesh.loops.foreach_set("edge_index", self.loop_edges)
+        mesh.polygons.add(len(self.loop_starts))
+        mesh.polygons.foreach_set("loop_start", self.loop_starts)
+        mesh.polygons.foreach_set("material_index", self.material_indices)
+
+        for name in self.uv_names:
+            mesh.uv_layers.new(name=name, do_init=False)
+        for name, (domain, data_type, values) in self.attributes.items():
+            attribute = mesh.attributes.get(name) or mesh.attributes.new(name, data_type, domain)
+            attribute.data.foreach_set(ATTRIBUTE_ARRAYS[data_type][0], values)
+        if active_uv in mesh.uv_layers:
+            mesh.uv_layers.active = mesh.uv_layers[active_uv]
+        if render_uv in mesh.uv_layers:
+            mesh.uv_layers[render_uv].active_render = True
+        mesh.update()
@@ -0,0 +1,132 @@
+import bpy
+
+# Modifier properties that don't change what the modifier does
+STACK_SKIP = {"rna_type", "name", "show_expanded", "show_in_editmode", "show_on_cage", "show_render", "show_viewport",
+              "is_active", "is_override_data", "use_pin_to_last", "persistent_uid", "execution_time"}
+
+# Texture coordinate spaces that make the result depend on where the object is
+WORLD_COORDINATES = {'GLOBAL', 'OBJECT'}
+
+
+def get_value_key(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    elif isinstance(value, bpy.types.ID):
+        return ("ID", value.session_uid)
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    try:
+        return tuple(get_value_key(item) for item in value)
+    except TypeError:
+        return None
+
+
+def get_stack_signature(ob, modifiers):
+    ''' Comparable description of what applying the modifiers to the object data gives.
+    Objects sharing their data and signature get the same result. Modifiers reading other objects, world
+    coordinates or running node groups may depend on where the object is, so its transform is part of it then.'''
+    signature = []
+    placed = False
+    for mod in modifiers:
+        settings = [mod.type]
+        for prop in mod.bl_rna.properties:
+            if prop.identifier in STACK_SKIP or prop.type == 'COLLECTION':
+                continue
+            value = getattr(mod, prop.identifier, None)
+            if prop.type == 'POINTER' and not isinstance(value, bpy.types.ID):
+                continue
+            if isinstance(value, bpy.types.Object) or (prop.identifier == "texture_coords" and value in WORLD_COORDINATES):
+                placed = True
+            settings.append((prop.identifier, get_value_key(value)))
+        if mod.type == 'NODES':
+            placed = True
+            settings.append(tuple(sorted((key, get_value_key(value)) for key, value in mod.items())))
+        signature.append(tuple(settings))
+
+    if placed:
+        signature.append(tuple(tuple(row) for row in ob.matrix_world))
+    return tuple(signature)
+
+
+def apply_modifiers(context, obs, predicate):
+    ''' Applies the enabled modifiers for which predicate(modifier) is true on all the objects at once.
+    The result is what applying them one by one from the top of the stack gives: the modifiers left out are skipped
+    and stay in the stack. Meshes are built from one evaluation of the depsgraph with only the applied modifiers
+    enabled, then swapped in and the applied modifiers removed.
+    Objects sharing their mesh and applying the same modifiers are evaluated once and keep sharing the result, so
+    linked duplicates stay linked. Only the objects whose modifiers differ get a mesh of their own.'''
+    # (mesh, stack signature) -> [(object, modifiers to apply)]
+    groups = {}
+    others = []
+    for ob in obs:
+        modifiers = [mod for mod in getattr(ob, "modifiers", ()) if mod.show_viewport and predicate(mod)]
+        if not modifiers:
+            continue
+        if ob.type != 'MESH':
+            others.append((ob, [mod.name for mod in modifiers]))
+            continue
+        if ob.data.shape_keys:
+            raise RuntimeError(f'Modifiers cannot be applied to "{ob.name}", its mesh has shape keys')
+        key = (ob.data.session_uid, get_stack_signature(ob, modifiers))
+        groups.setdefault(key, []).append((ob, modifiers))
+
+    if groups:
+        meshes = evaluate_meshes(context, [members[0] for members in groups.values()])
+        for members, mesh in zip(groups.values(), meshes):
+            for ob, modifiers in members:
+                swap_data(ob, mesh)
+                for mod in modifiers:
+                    ob.modifiers.remove(mod)
+
+    # Other object types go through the operator, it knows which of them can be applied
+    for ob, names in others:
+        ob.select_set(True)
+        context.view_layer.objects.active = ob
+        bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
+        for name in names:
+            bpy.ops.object.modifier_apply(modifier=name)
+
+
+def evaluate_meshes(context, targets):
+    ''' Meshes of the (object, modifiers) targets evaluated with only those modifiers enabled.
+    The objects have to be in the view layer of the context, see include_objects.'''
+    restore = []
+    hidden = []
+    try:
+        for ob, modifiers in targets:
+            applied = {mod.name for mod in modifiers}
+            for mod in ob.modifiers:
+                enabled = mod.name in applied
+                if mod.show_viewport != enabled:
+                    restore.append((mod, mod.show_viewport))
+                    mod.show_viewport = enabled
+            # Objects disabled in viewports are left out of the depsgraph
+            if ob.hide_viewport:
+                hidden.append(ob)
+                ob.hide_viewport = False
+
+        depsgraph = context.evaluated_depsgraph_get()
+        # Objects the depsgraph doesn't evaluate come back as they are, without their modifiers
+        evaluated = {evaluated_ob.original.session_uid for evaluated_ob in depsgraph.objects}
+        for ob, _ in targets:
+            if ob.session_uid not in evaluated:
+                raise RuntimeError(f'Modifiers cannot be applied to "{ob.name}", it isn\'t part of the view layer '
+                                   f'the workflow runs in or its collection is disabled')
+        return [bpy.data.meshes.new_from_object(ob.evaluated_get(depsgraph), preserve_all_data_layers=True,
+                                                depsgraph=depsgraph)
+                for ob, _ in targets]
+    finally:
+        for mod, show_viewport in restore:
+            mod.show_viewport = show_viewport
+        for ob in hidden:
+            ob.hide_viewport = True
+
+
+def swap_data(ob, mesh):
+    ''' Gives the object its new mesh, which takes over the name of the old one once nothing else uses it '''
+    old = ob.data
+    ob.data = mesh
+    if old.users == 0:
+        name = old.name
+        bpy.data.meshes.remove(old)
+        mesh.name = name
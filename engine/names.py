@@ -0,0 +1,85 @@
+import re
+from bisect import bisect_left
+from .objectset import ObjectSet
+
+# Sets smaller than this are filtered directly even when the tree builds name indexes
+NAME_INDEX_MIN_OBJECTS = 1000
+
+
+class NameFilter():
+    ''' Test on object names, compiled once for all the objects it is applied to '''
+
+    __slots__ = ("kind", "value", "match")
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+        if kind == 'PREFIX':
+            self.match = lambda name: name.startswith(value)
+        elif kind == 'SUFFIX':
+            self.match = lambda name: name.endswith(value)
+        elif kind == 'CONTAINS':
+            self.match = lambda name: value in name
+        elif kind == 'REGEX':
+            self.match = re.compile(value).search
+        else:
+            raise ValueError(f'Unknown name filter "{kind}"')
+
+
+class NameIndex():
+    ''' Names of the objects of a set sorted forwards and backwards, to find the objects with a prefix or suffix by
+    bisection. Entries are (key, position in the set, handle, object, name).'''
+
+    def __init__(self, obs):
+        entries = [(ob.name, position, handle, ob) for position, (handle, ob) in enumerate(zip(obs.handles(), obs))]
+        self.prefixes = sorted((name, position, handle, ob, name) for name, position, handle, ob in entries)
+        self.prefix_keys = [entry[0] for entry in self.prefixes]
+        self.suffixes = sorted((name[::-1], position, handle, ob, name) for name, position, handle, ob in entries)
+        self.suffix_keys = [entry[0] for entry in self.suffixes]
+
+    def lookup(self, name_filter):
+        ''' Entries of the objects passing a prefix or suffix filter, in the order of the set '''
+        if name_filter.kind == 'PREFIX':
+            keys, entries, value = self.prefix_keys, self.prefixes, name_filter.value
+        else:
+            keys, entries, value = self.suffix_keys, self.suffixes, name_filter.value[::-1]
+
+        start = end = bisect_left(keys, value)
+        while end < len(keys) and keys[end].startswith(value):
+            end += 1
+        return sorted(entries[start:end], key=lambda entry: entry[1])
+
+
+def get_name_index(obs):
+    ''' Name index of a set shared by the nodes of the active run, None if the run doesn't build them '''
+    from .executor import get_active_run
+    run = get_active_run()
+    if not run or not run.index_names or len(obs) < NAME_INDEX_MIN_OBJECTS:
+        return None
+
+    cached = run.name_indexes.get(id(obs))
+    if cached is None or cached[0] is not obs:
+        # The set is kept along with its index so its id isn't reused while the index is cached
+        cached = run.name_indexes[id(obs)] = (obs, NameIndex(obs))
+    return cached[1]
+
+
+def filter_names(obs, name_filters):
+    ''' Objects of the set whose names pass all the filters, reading every name at most once '''
+    indexed = next((name_filter for name_filter in name_filters if name_filter.kind in {'PREFIX', 'SUFFIX'}), None)
+    index = get_name_index(obs) if indexed else None
+    if index:
+        matches = [name_filter.match for name_filter in name_filters if name_filter is not indexed]
+        return ObjectSet.from_handles({handle: ob for _, _, handle, ob, name in index.lookup(indexed)
+                                       if all(match(name) for match in matches)})
+
+    matches = [name_filter.match for name_filter in name_filters]
+    if len(matches) == 1:
+        match = matches[0]
+        return obs.filter(lambda ob: match(ob.name))
+
+    def passes(ob):
+        name = ob.name
+        return all(match(name) for match in matches)
+
+    return obs.filter(passes)
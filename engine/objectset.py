@@ -0,0 +1,87 @@
+class ObjectSet():
+    ''' Ordered set of objects keyed by their session_uid.
+    Sets stored in a run are shared by every node reading them, so nodes build new sets instead of changing them.'''
+
+    __slots__ = ("_objects",)
+
+    def __init__(self, objects=()):
+        if isinstance(objects, ObjectSet):
+            self._objects = dict(objects._objects)
+        else:
+            self._objects = {ob.session_uid: ob for ob in objects if ob}
+
+    @classmethod
+    def from_handles(cls, objects):
+        ''' Builds a set from a session_uid -> object mapping without reading the objects again '''
+        result = cls()
+        result._objects = objects
+        return result
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects.values())
+
+    def __reversed__(self):
+        return reversed(self._objects.values())
+
+    def __contains__(self, ob):
+        return ob is not None and ob.session_uid in self._objects
+
+    def __getitem__(self, index):
+        if index == 0:
+            return next(iter(self._objects.values()))
+        elif index == -1:
+            return next(reversed(self._objects.values()))
+        return list(self._objects.values())[index]
+
+    def __repr__(self):
+        return f"ObjectSet({[ob.name for ob in self]})"
+
+    def handles(self):
+        return self._objects.keys()
+
+    def copy(self):
+        return ObjectSet.from_handles(dict(self._objects))
+
+    def add(self, ob):
+        self._objects.setdefault(ob.session_uid, ob)
+
+    def discard(self, ob):
+        self._objects.pop(ob.session_uid, None)
+
+    def union(self, *others):
+        objects = dict(self._objects)
+        for other in others:
+            if isinstance(other, ObjectSet):
+                for handle, ob in other._objects.items():
+                    objects.setdefault(handle, ob)
+            else:
+                for ob in other:
+                    if ob:
+                        objects.setdefault(ob.session_uid, ob)
+        return ObjectSet.from_handles(objects)
+
+    def difference(self, *others):
+        excluded = set()
+        for other in others:
+            excluded.update(as_object_set(other)._objects)
+        return ObjectSet.from_handles({handle: ob for handle, ob in self._objects.items() if handle not in excluded})
+
+    def intersection(self, other):
+        included = as_object_set(other)._objects
+        return ObjectSet.from_handles({handle: ob for handle, ob in self._objects.items() if handle in included})
+
+    def filter(self, predicate):
+        return ObjectSet.from_handles({handle: ob for handle, ob in self._objects.items() if predicate(ob)})
+
+    __or__ = union
+    __sub__ = difference
+    __and__ = intersection
+
+
+def as_object_set(objects):
+    if isinstance(objects, ObjectSet):
+        return objects
+    return ObjectSet(objects or ())
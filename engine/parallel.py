@@ -0,0 +1,163 @@
+import bpy
+import glob
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from time import perf_counter
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "run_workflows.py")
+
+# Run in progress or last finished parallel run, shown in the Workflows panel
+_last_run = None
+
+
+def get_last_run():
+    return _last_run
+
+
+def split_shards(costs, count):
+    ''' Splits the sinks into shards of similar total cost, longest first into the least loaded shard.
+    Sinks without a recorded cost are estimated with the average of the known ones.'''
+    known = [cost for cost in costs.values() if cost > 0.0]
+    default = sum(known) / len(known) if known else 1.0
+
+    shards = [[] for _ in range(min(count, len(costs)))]
+    loads = [0.0] * len(shards)
+    for name, cost in sorted(costs.items(), key=lambda item: item[1] or default, reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(name)
+        loads[index] += cost or default
+
+    return [shard for shard in shards if shard]
+
+
+class Worker():
+    ''' Background Blender process running one shard of the sinks of a tree '''
+
+    def __init__(self, snapshot_path, tree_name, node_names, dir, base_dir):
+        self.node_names = node_names
+        self.report_path = os.path.join(dir, f"report_{id(self)}.json")
+        self.log_path = os.path.join(dir, f"log_{id(self)}.txt")
+
+        args = [bpy.app.binary_path, "-b", snapshot_path, "--python", SCRIPT_PATH, "--",
+                "--tree", glob.escape(tree_name), "--report", self.report_path, "--base-dir", base_dir]
+        for node_name in node_names:
+            args += ["--node", glob.escape(node_name)]
+
+        self.log = open(self.log_path, "w")
+        self.process = subprocess.Popen(args, stdout=self.log, stderr=subprocess.STDOUT)
+
+    def poll(self):
+        return self.process.poll() is not None
+
+    def get_sinks(self):
+        ''' Report entries for the sinks of the shard, failing all of them if the worker did not report '''
+        self.log.close()
+        try:
+            with open(self.report_path) as file:
+                report = json.load(file)
+            sinks = [sink for tree in report["trees"] for sink in tree["sinks"]]
+        except (OSError, ValueError, KeyError):
+            sinks = []
+
+        reported = {sink["node"] for sink in sinks}
+        error = f'Worker exited with code {self.process.returncode} without reporting, see "{self.log_path}"'
+        sinks += [{"node": node_name, "status": "error", "error": error}
+                  for node_name in self.node_names if node_name not in reported]
+        return sinks
+
+    def kill(self):
+        if not self.poll():
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+class ParallelRun():
+    ''' Runs the sinks of a tree in background Blender processes working on a snapshot of the current file.
+    The snapshot is saved in a temporary directory, the workers resolve relative output paths against the directory
+    of the current file so they write the same files.'''
+
+    def __init__(self, tree, node_names, worker_count=0):
+        self.tree_name = tree.name
+        self.node_names = node_names
+        self.dir = tempfile.mkdtemp(prefix="wf_parallel_")
+        self.workers = []
+        self.sinks = []
+        self.start = perf_counter()
+        self.duration = None
+
+        # Paths of images and libraries are remapped to stay valid from the snapshot, node paths aren't
+        self.snapshot_path = os.path.join(self.dir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=self.snapshot_path, copy=True, check_existing=False)
+        base_dir = os.path.dirname(bpy.data.filepath) if bpy.data.filepath else self.dir
+
+        costs = {node_name: tree.nodes[node_name].run_cost for node_name in node_names}
+        try:
+            for shard in split_shards(costs, worker_count or os.cpu_count() or 1):
+                self.workers.append(Worker(self.snapshot_path, self.tree_name, shard, self.dir, base_dir))
+        except Exception:
+            self.cancel()
+            raise
+
+    @property
+    def finished(self):
+        return self.duration is not None
+
+    @property
+    def failed(self):
+        return any(sink["status"] != "success" for sink in self.sinks)
+
+    def get_progress(self):
+        return sum(1 for worker in self.workers if worker.poll()), len(self.workers)
+
+    def poll(self):
+        ''' Returns True once every worker finished and their results were gathered '''
+        if self.finished:
+            return True
+        elif not all(worker.poll() for worker in self.workers):
+            return False
+
+        for worker in self.workers:
+            self.sinks += worker.get_sinks()
+        order = {node_name: index for index, node_name in enumerate(self.node_names)}
+        self.sinks.sort(key=lambda sink: order.get(sink["node"], len(order)))
+
+        tree = bpy.data.node_groups.get(self.tree_name)
+        for sink in self.sinks:
+            node = tree.nodes.get(sink["node"]) if tree else None
+            if node and "cost" in sink:
+                node.run_cost = sink["cost"]
+
+        self.cleanup()
+        # Keep the worker logs around when something failed
+        if not self.failed:
+            shutil.rmtree(self.dir, ignore_errors=True)
+        self.duration = perf_counter() - self.start
+        return True
+
+    def cancel(self):
+        for worker in self.workers:
+            worker.kill()
+        self.cleanup()
+        self.duration = perf_counter() - self.start
+
+    def cleanup(self):
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+
+def start_parallel_run(tree, node_names, worker_count=0):
+    global _last_run
+    if _last_run and not _last_run.finished:
+        raise RuntimeError("A parallel run is already in progress")
+
+    _last_run = ParallelRun(tree, node_names, worker_count)
+    return _last_run
+
+
+def cancel_parallel_run():
+    if _last_run and not _last_run.finished:
+        _last_run.cancel()
@@ -0,0 +1,305 @@
+import bpy
+
+# Source kinds for a resolved input socket
+SLOT = 0  # An output socket of another step in the same plan
+GROUP_INPUT = 1  # A value passed in by the node group instance running the plan
+
+
+class Step():
+    ''' A node to execute with its input sockets resolved to the slots feeding them '''
+
+    __slots__ = ("node_name", "inputs", "group", "mutates", "fused")
+
+    def __init__(self, node_name, inputs, group=None, mutates=False):
+        self.node_name = node_name
+        # Input socket identifier -> list of sources linked to that socket
+        self.inputs = inputs
+        # Plan of the inner node tree when the step is a node group
+        self.group = group
+        # Whether running the step changes the scene
+        self.mutates = mutates
+        # Names of the upstream name filter nodes folded into this one, in the order they apply
+        self.fused = ()
+
+    def dependencies(self):
+        for sources in self.inputs.values():
+            for source in sources:
+                if source[0] == SLOT:
+                    yield source[1]
+
+
+class Plan():
+    ''' Topologically sorted list of steps for a node tree '''
+
+    __slots__ = ("tree_name", "steps", "outputs")
+
+    def __init__(self, tree_name, steps, outputs):
+        self.tree_name = tree_name
+        self.steps = steps
+        # Group output socket identifier -> list of sources (only for node group trees)
+        self.outputs = outputs
+
+
+def resolve_source(socket):
+    ''' Follows reroutes from an output socket back to the socket that actually produces the data '''
+    node = socket.node
+    while node.bl_idname == "NodeReroute":
+        reroute_input = node.inputs[0]
+        if not reroute_input.is_linked:
+            return None
+        socket = reroute_input.links[0].from_socket
+        node = socket.node
+
+    if node.bl_idname == "NodeGroupInput":
+        return (GROUP_INPUT, socket.identifier)
+
+    from ..nodes.mixins import WFNode
+    if isinstance(node, WFNode):
+        return (SLOT, node.name, socket.identifier)
+
+    return None
+
+
+def resolve_inputs(sockets):
+    inputs = {}
+    for socket in sockets:
+        if not socket.is_linked:
+            continue
+        sources = []
+        for link in socket.links:
+            source = resolve_source(link.from_socket)
+            if source:
+                sources.append(source)
+        if sources:
+            inputs[socket.identifier] = sources
+
+    return inputs
+
+
+def compile_plan(tree, sink_names=None, fuse=True, _compiling=None):
+    ''' Compiles a workflow tree into a plan that runs the given sinks and everything upstream of them.
+    If no sinks are given the tree is compiled as a node group using its group output node as the sink.
+    With fuse, chains of name filters are folded into single steps.'''
+    compiling = _compiling or set()
+    if tree.name in compiling:
+        raise ValueError(f'Node group "{tree.name}" contains itself')
+    compiling.add(tree.name)
+
+    outputs = {}
+    if sink_names is None:
+        output_node = next((node for node in tree.nodes
+                            if node.bl_idname == "NodeGroupOutput" and node.is_active_output),
+                           None)
+        if output_node:
+            outputs = resolve_inputs(output_node.inputs)
+        roots = [source[1] for sources in outputs.values() for source in sources if source[0] == SLOT]
+    else:
+        roots = list(sink_names)
+
+    nodes = tree.nodes
+    steps = {}
+    order = []
+    visiting = set()
+
+    def new_frame(node_name):
+        node = nodes.get(node_name)
+        if node is None:
+            raise KeyError(f'Node "{node_name}" not found in "{tree.name}"')
+        group = None
+        mutates = getattr(node, "wf_mutates_scene", False)
+        if node.bl_idname == "WFNodeGroup" and node.node_tree:
+            group = compile_plan(node.node_tree, fuse=fuse, _compiling=compiling)
+            mutates = any(group_step.mutates for group_step in group.steps)
+        step = Step(node_name, resolve_inputs(node.inputs), group, mutates)
+        visiting.add(node_name)
+        return (step, step.dependencies())
+
+    for root in roots:
+        if root in steps:
+            continue
+
+        stack = [new_frame(root)]
+        while stack:
+            step, dependencies = stack[-1]
+            dependency = next(dependencies, None)
+            if dependency is None:
+                stack.pop()
+                visiting.discard(step.node_name)
+                steps[step.node_name] = step
+                order.append(step)
+            elif dependency in visiting:
+                raise ValueError(f'Cycle detected in "{tree.name}" at node "{dependency}"')
+            elif dependency not in steps:
+                stack.append(new_frame(dependency))
+
+    compiling.discard(tree.name)
+
+    # Socket previews show the output of every node, fused nodes don't have one
+    if fuse and not tree.persist_socket_previews:
+        order = fuse_name_filters(tree, order, roots, outputs)
+
+    return Plan(tree.name, order, outputs)
+
+
+def fuse_name_filters(tree, order, roots, outputs):
+    ''' Folds every name filter whose output only feeds another name filter into that filter, so chains of them
+    run as one pass over the objects. Filters whose filter input is linked are only kept as the last of a chain.'''
+    from ..nodes.mixins import WFNameFilterNode
+    nodes = tree.nodes
+
+    consumers = {}
+    for step in order:
+        for sources in step.inputs.values():
+            for source in sources:
+                if source[0] == SLOT:
+                    consumers[source[1]] = consumers.get(source[1], 0) + 1
+    for sources in outputs.values():
+        for source in sources:
+            if source[0] == SLOT:
+                consumers[source[1]] = consumers.get(source[1], 0) + 1
+
+    steps = {step.node_name: step for step in order}
+    folded = set()
+    for step in order:
+        if not isinstance(nodes[step.node_name], WFNameFilterNode):
+            continue
+        sources = step.inputs.get("objects")
+        if not sources or len(sources) != 1 or sources[0][0] != SLOT:
+            continue
+        upstream = steps[sources[0][1]]
+        fusable = isinstance(nodes[upstream.node_name], WFNameFilterNode) and set(upstream.inputs) <= {"objects"}
+        if fusable and consumers[upstream.node_name] == 1 and upstream.node_name not in roots:
+            step.fused = upstream.fused + (upstream.node_name,)
+            if "objects" in upstream.inputs:
+                step.inputs["objects"] = upstream.inputs["objects"]
+            else:
+                del step.inputs["objects"]
+            folded.add(upstream.node_name)
+
+    return [step for step in order if step.node_name not in folded]
+
+
+def split_stream(plan, step):
+    ''' Steps after a streaming step in its plan, split into the ones that depend on its output, to run for every
+    chunk it streams, and the later ones those also depend on, to run before the first chunk '''
+    later = plan.steps[plan.steps.index(step) + 1:]
+    streamed = {step.node_name}
+    downstream = []
+    for other in later:
+        if any(dependency in streamed for dependency in other.dependencies()):
+            streamed.add(other.node_name)
+            downstream.append(other)
+
+    steps = {other.node_name: other for other in later}
+    needed = set()
+    pending = [dependency for other in downstream for dependency in other.dependencies()]
+    while pending:
+        name = pending.pop()
+        if name in steps and name not in streamed and name not in needed:
+            needed.add(name)
+            pending.extend(steps[name].dependencies())
+
+    return [other for other in later if other.node_name in needed], downstream
+
+
+def split_sinks(plan, sink_names):
+    ''' Groups the sinks of a plan into batches that can run in a single pass.
+    Sinks only share a pass when they have exactly the same scene mutating steps upstream, so every sink in a batch
+    sees the same scene state it would see if it was run on its own.'''
+    steps = {step.node_name: step for step in plan.steps}
+    batches = {}
+    for sink_name in sink_names:
+        mutations = set()
+        visited = set()
+        pending = [sink_name]
+        while pending:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            step = steps[name]
+            if step.mutates:
+                mutations.add(name)
+            pending.extend(step.dependencies())
+
+        batches.setdefault(frozenset(mutations), []).append(sink_name)
+
+    return list(batches.values())
+
+
+class CachedPlan():
+    ''' Compiled plan along with the structural fingerprints of every tree it was compiled from '''
+
+    __slots__ = ("plan", "fingerprints", "handles", "valid")
+
+    def __init__(self, plan, fingerprints, handles):
+        self.plan = plan
+        self.fingerprints = fingerprints
+        # Tree name -> session_uid of the tree the plan was compiled from under that name
+        self.handles = handles
+        self.valid = True
+
+    def has_same_trees(self, node_groups):
+        ''' Whether every tree the plan refers to by name still is the tree it was compiled from.
+        Renaming a tree doesn't invalidate plans, so another tree could have taken the name since.'''
+        for name, handle in self.handles.items():
+            tree = node_groups.get(name)
+            if not tree or tree.session_uid != handle:
+                return False
+        return True
+
+
+# (tree session_uid, sink names) -> CachedPlan
+_plan_cache = {}
+
+
+def get_tree_fingerprint(tree):
+    ''' Hash of everything in a tree that the plan compiler reads '''
+    nodes = tuple((node.name, node.bl_idname,
+                   node.node_tree.name if node.bl_idname == "WFNodeGroup" and node.node_tree else None,
+                   node.is_active_output if node.bl_idname == "NodeGroupOutput" else None)
+                  for node in tree.nodes)
+    links = tuple((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                  for link in tree.links)
+    return hash((nodes, links, tree.persist_socket_previews))
+
+
+def get_plan_trees(plan):
+    trees = {plan.tree_name}
+    for step in plan.steps:
+        if step.group:
+            trees |= get_plan_trees(step.group)
+    return trees
+
+
+def get_plan(tree, sink_names=None):
+    ''' Returns the cached plan for the given sinks, only looking at the tree again if it was invalidated '''
+    key = (tree.session_uid, tuple(sink_names) if sink_names is not None else None)
+    cached = _plan_cache.get(key)
+    node_groups = bpy.data.node_groups
+    if cached and cached.has_same_trees(node_groups):
+        if cached.valid:
+            return cached.plan
+
+        if all(get_tree_fingerprint(node_groups[name]) == fingerprint
+               for name, fingerprint in cached.fingerprints.items()):
+            cached.valid = True
+            return cached.plan
+
+    plan = compile_plan(tree, sink_names)
+    trees = [node_groups[name] for name in get_plan_trees(plan)]
+    _plan_cache[key] = CachedPlan(plan, {other.name: get_tree_fingerprint(other) for other in trees},
+                                  {other.name: other.session_uid for other in trees})
+
+    return plan
+
+
+def invalidate_plans(tree):
+    ''' Flags the cached plans compiled from the given tree so they are checked again before the next run '''
+    for cached in _plan_cache.values():
+        if tree.name in cached.fingerprints:
+            cached.valid = False
+
+
+def clear_plans():
+    _plan_cache.clear()
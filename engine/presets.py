@@ -0,0 +1,115 @@
+import bpy
+import ast
+import os
+
+# Exporter operators whose presets export nodes can use
+PRESET_OPERATORS = ("export_scene.gltf", "export_scene.fbx", "wm.obj_export")
+
+# Lines every operator preset starts with
+PRESET_HEADER = {"import bpy", "op = bpy.context.active_operator"}
+
+
+class PresetError(ValueError):
+    pass
+
+
+def parse_preset(filepath):
+    ''' Arguments set by an operator preset file, without running it.
+    Only the "op.<property> = <literal>" assignments Blender writes into presets are accepted.'''
+    with open(filepath) as file:
+        source = file.read()
+
+    try:
+        module = ast.parse(source, filepath)
+    except SyntaxError as e:
+        raise PresetError(f'Invalid preset "{filepath}": {e}')
+
+    args = {}
+    lines = source.splitlines()
+    for statement in module.body:
+        if lines[statement.lineno - 1].strip() in PRESET_HEADER:
+            continue
+
+        target = statement.targets[0] if isinstance(statement, ast.Assign) and len(statement.targets) == 1 else None
+        if not (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == "op"):
+            raise PresetError(f'Invalid preset "{filepath}", line {statement.lineno}: only "op.<property> = <value>" '
+                              f'assignments are supported')
+        try:
+            args[target.attr] = ast.literal_eval(statement.value)
+        except ValueError:
+            raise PresetError(f'Invalid preset "{filepath}", line {statement.lineno}: the value of "{target.attr}" '
+                              f'is not a literal')
+    return args
+
+
+class PresetRegistry():
+    ''' Parsed exporter presets, indexed by operator and file name across all the preset directories.
+    Files are parsed once and again only when they change. Invalid presets are reported when they are loaded.'''
+
+    def __init__(self):
+        # (operator, file name without extension) -> path of the preset found first, as bpy.utils.preset_find does
+        self.index = None
+        # Path -> (mtime, arguments, error)
+        self.files = {}
+
+    def scan(self):
+        self.index = {}
+        for operator in PRESET_OPERATORS:
+            for dir in bpy.utils.preset_paths(os.path.join("operator", operator)):
+                for filename in sorted(os.listdir(dir)):
+                    name, ext = os.path.splitext(filename)
+                    if ext.lower() == ".py":
+                        path = os.path.join(dir, filename)
+                        self.index.setdefault((operator, name), path)
+                        self.load(path)
+
+    def load(self, path):
+        ''' Parsed preset file, parsing it again if it changed since it was last loaded '''
+        mtime = os.stat(path).st_mtime_ns
+        entry = self.files.get(path)
+        if entry and entry[0] == mtime:
+            return entry
+
+        try:
+            entry = (mtime, parse_preset(path), None)
+        except (OSError, PresetError) as e:
+            entry = (mtime, None, e)
+            print(e)
+        self.files[path] = entry
+        return entry
+
+    def find(self, operator, name):
+        ''' Path of a preset, scanning the preset directories again if it isn't known or was removed '''
+        path = self.index.get((operator, name)) if self.index is not None else None
+        if path and os.path.exists(path):
+            return path
+        self.scan()
+        return self.index.get((operator, name))
+
+    def get_args(self, operator, name):
+        path = self.find(operator, name)
+        if not path:
+            raise FileNotFoundError(f'Preset not found: "{name}"')
+        _, args, error = self.load(path)
+        if error:
+            raise error
+        return dict(args)
+
+    def get_error(self, operator, name):
+        ''' Why a preset can't be used, None if it can '''
+        try:
+            self.get_args(operator, name)
+        except (OSError, PresetError) as e:
+            return str(e)
+        return None
+
+    def clear(self):
+        self.index = None
+        self.files.clear()
+
+
+_registry = PresetRegistry()
+
+
+def get_presets():
+    return _registry
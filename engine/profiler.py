@@ -0,0 +1,90 @@
+import json
+import os
+from time import perf_counter
+
+# Profile of the last profiled run, shown in the Workflows panel and node headers
+_last_profile = None
+
+
+def get_last_profile():
+    return _last_profile
+
+
+def set_last_profile(profile):
+    global _last_profile
+    _last_profile = profile
+
+
+class Span():
+    ''' Timing of one node execution '''
+
+    __slots__ = ("tree_name", "node_name", "scope", "start", "duration", "inputs", "outputs")
+
+    def __init__(self, tree_name, node_name, scope, start):
+        self.tree_name = tree_name
+        self.node_name = node_name
+        # Path of tree and group node names of the tree instance the node ran in
+        self.scope = scope
+        self.start = start
+        self.duration = 0.0
+        # Number of objects received and produced by the node
+        self.inputs = 0
+        self.outputs = 0
+
+    @property
+    def depth(self):
+        return len(self.scope) - 1
+
+
+class Profile():
+    ''' Node execution spans recorded over one or more runs '''
+
+    def __init__(self):
+        self.origin = perf_counter()
+        self.spans = []
+        # (tree name, node name) -> seconds spent in the node over all its group instances
+        self.node_totals = {}
+
+    def begin(self, tree_name, node_name, scope):
+        span = Span(tree_name, node_name, scope, perf_counter())
+        self.spans.append(span)
+        return span
+
+    def end(self, span, inputs, outputs):
+        span.duration = perf_counter() - span.start
+        span.inputs = inputs
+        span.outputs = outputs
+        key = (span.tree_name, span.node_name)
+        self.node_totals[key] = self.node_totals.get(key, 0.0) + span.duration
+
+    def get_node_time(self, tree_name, node_name):
+        return self.node_totals.get((tree_name, node_name))
+
+    def get_slowest(self, tree_name, count=10):
+        ''' (node name, seconds) pairs of the slowest nodes of a tree '''
+        times = [(node_name, duration) for (name, node_name), duration in self.node_totals.items()
+                 if name == tree_name]
+        return sorted(times, key=lambda item: item[1], reverse=True)[:count]
+
+    def to_chrome_trace(self):
+        ''' Trace events in the Chrome trace event format, viewable in chrome://tracing or Perfetto '''
+        events = [{
+            "name": span.node_name,
+            "cat": span.tree_name,
+            "ph": "X",
+            "ts": (span.start - self.origin) * 1e6,
+            "dur": span.duration * 1e6,
+            "pid": os.getpid(),
+            "tid": 0,
+            "args": {
+                "scope": " > ".join(span.scope),
+                "depth": span.depth,
+                "input_objects": span.inputs,
+                "output_objects": span.outputs,
+            },
+        } for span in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filepath):
+        with open(filepath, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
@@ -0,0 +1,143 @@
+import re
+import bpy
+
+# Longest ID name Blender keeps, in bytes
+MAX_NAME_BYTES = 63
+
+# Numbered names, "Cube.001"
+NUMBERED_NAME = re.compile(r"^(.*)\.(\d+)$")
+
+# Object data ID type -> bpy.data collection
+DATA_COLLECTIONS = {
+    'MESH': "meshes", 'CURVE': "curves", 'CURVES': "hair_curves", 'POINTCLOUD': "pointclouds", 'VOLUME': "volumes",
+    'META': "metaballs", 'ARMATURE': "armatures", 'LATTICE': "lattices", 'LIGHT': "lights", 'CAMERA': "cameras",
+    'SPEAKER': "speakers", 'LIGHT_PROBE': "lightprobes", 'GREASEPENCIL': "grease_pencils",
+    'GREASEPENCIL_V3': "grease_pencils_v3",
+}
+
+
+def clip_name(name, max_bytes=MAX_NAME_BYTES):
+    ''' Name cut to the bytes Blender keeps, without splitting a character '''
+    return name.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+
+
+class NameTable():
+    ''' Names taken in a bpy.data collection, handing out the names Blender would give to new IDs.
+    Names are never given back, so the lowest free number of a name only grows and is remembered: numbering n IDs
+    wanting the same name costs O(n) overall rather than scanning from .001 for every one of them.'''
+
+    def __init__(self, names=()):
+        self.taken = set(names)
+        # Name without its number -> number below which all the numbered names are taken
+        self.numbers = {}
+
+    def __contains__(self, name):
+        return name in self.taken
+
+    def add(self, name):
+        self.taken.add(name)
+
+    def claim(self, name):
+        ''' Takes the name itself if it's free, otherwise the name without its number with the lowest free number '''
+        name = clip_name(name)
+        if name not in self.taken:
+            self.taken.add(name)
+            return name
+
+        match = NUMBERED_NAME.match(name)
+        base = match.group(1) if match else name
+        number = self.numbers.get(base, 1)
+        while True:
+            suffix = f".{number:03d}"
+            candidate = clip_name(base, MAX_NAME_BYTES - len(suffix)) + suffix
+            if candidate not in self.taken:
+                break
+            number += 1
+        self.numbers[base] = number + 1
+        self.taken.add(candidate)
+        return candidate
+
+
+def plan_names(collection, renames):
+    ''' Final names of the (ID, wanted name) renames in a bpy.data collection, as {session_uid: (ID, name)}.
+    Names are resolved against the names the collection will have once all the renames are done, in the order of
+    the renames, so the result doesn't depend on the order they are applied in. IDs renamed more than once get the
+    last name they were given.'''
+    wanted = {}
+    for id_data, name in renames:
+        wanted[id_data.session_uid] = (id_data, clip_name(name))
+
+    taken = NameTable(set(collection.keys()) - {id_data.name for id_data, _ in wanted.values()})
+    # IDs keeping their name keep it whatever comes before them
+    for id_data, name in wanted.values():
+        if name == id_data.name:
+            taken.add(name)
+
+    plan = {}
+    for handle, (id_data, name) in wanted.items():
+        if name != id_data.name:
+            name = taken.claim(name)
+        plan[handle] = (id_data, name)
+    return plan
+
+
+def apply_names(collection, plan):
+    ''' Gives the IDs of the collection their planned names. An ID is renamed once the name it gets is free, IDs
+    waiting on each other in a cycle go through a temporary name first, so no ID gets a numbered name that wasn't
+    planned.'''
+    pending = {handle: (id_data, name) for handle, (id_data, name) in plan.items() if id_data.name != name}
+    # Current name -> session_uid of the pending ID holding it
+    holders = {id_data.name: handle for handle, (id_data, _) in pending.items()}
+
+    waiting = {}
+    ready = []
+    for handle, (_, name) in pending.items():
+        if name in holders:
+            waiting[name] = handle
+        else:
+            ready.append(handle)
+
+    taken = None
+    while ready or waiting:
+        if not ready:
+            # Only cycles are left, one ID moves aside to a name nobody wants
+            if taken is None:
+                taken = NameTable(set(collection.keys()) | {name for _, name in plan.values()})
+            name, handle = next(iter(waiting.items()))
+            id_data = pending[holders.pop(name)][0]
+            id_data.name = taken.claim(name + "~")
+            ready.append(waiting.pop(name))
+            continue
+
+        handle = ready.pop()
+        id_data, name = pending[handle]
+        released = id_data.name
+        id_data.name = name
+        if holders.get(released) == handle:
+            del holders[released]
+            if released in waiting:
+                ready.append(waiting.pop(released))
+
+
+def rename_objects(renames, rename_data=True):
+    ''' Renames the objects of the (object, wanted name) renames and, optionally, their data after them.
+    Names are planned for all the objects at once against the names in the file, collisions get the lowest free
+    number in the order of the renames like Blender would number them. Data shared by several objects is named
+    after the last of them. Returns {object session_uid: name} of the objects.'''
+    renames = list(renames)
+    plan = plan_names(bpy.data.objects, renames)
+    apply_names(bpy.data.objects, plan)
+    if rename_data:
+        # bpy.data collection name -> (data, wanted name)
+        data_renames = {}
+        for ob, name in plan.values():
+            data = getattr(ob, "data", None)
+            collection_name = DATA_COLLECTIONS.get(getattr(data, "id_type", None))
+            if collection_name and not data.library:
+                data_renames.setdefault(collection_name, []).append((data, name))
+
+        for collection_name, renames in data_renames.items():
+            collection = getattr(bpy.data, collection_name)
+            apply_names(collection, plan_names(collection, renames))
+
+    return {handle: name for handle, (_, name) in plan.items()}
@@ -0,0 +1,197 @@
+import bpy
+from .objectset import ObjectSet
+
+# ID type -> bpy.data collection of the object data blocks the staging copies
+DATA_COLLECTIONS = {
+    'MESH': "meshes",
+    'CURVE': "curves",
+    'META': "metaballs",
+    'CURVES': "hair_curves",
+    'POINTCLOUD': "pointclouds",
+    'VOLUME': "volumes",
+    'GREASEPENCIL': "grease_pencils",
+    'LATTICE': "lattices",
+    'ARMATURE': "armatures",
+    'LIGHT': "lights",
+    'CAMERA': "cameras",
+    'SPEAKER': "speakers",
+    'LIGHT_PROBE': "lightprobes",
+}
+
+
+class Staging():
+    ''' Isolates a run from the user's data without the undo system.
+    The run happens in a scratch scene: objects coming from input nodes are linked into it and every object reaching a
+    node that changes the scene is first replaced by a copy that takes over its name. Only those copies and whatever the
+    run creates from them are discarded afterwards, so the cost scales with the objects the workflow touches.
+    Note: the scratch scene has a flat collection hierarchy, use the undo isolation mode if an exporter depends on it.'''
+
+    def __init__(self, context):
+        self.context = context
+        self.scene = None
+        self.override = None
+        # Original session_uid -> original object linked into the scratch scene
+        self.linked = {}
+        # Original session_uid -> staged copy
+        self.copies = {}
+        # session_uids of the staged copies
+        self.staged = set()
+        # Original data session_uid -> staged copy of the data, shared by all the staged users of the data
+        self.data_copies = {}
+        # (ID, name) pairs for originals renamed so their copies can take over the name
+        self.renamed = []
+
+    def __enter__(self):
+        source = self.context.scene
+        scene = self.scene = bpy.data.scenes.new("WF Staging")
+        scene.unit_settings.system = source.unit_settings.system
+        scene.unit_settings.scale_length = source.unit_settings.scale_length
+        scene.unit_settings.length_unit = source.unit_settings.length_unit
+        scene.frame_start = source.frame_start
+        scene.frame_end = source.frame_end
+        scene.frame_current = source.frame_current
+        scene.render.fps = source.render.fps
+        scene.render.fps_base = source.render.fps_base
+        scene.world = source.world
+
+        self.override = self.context.temp_override(scene=scene, view_layer=scene.view_layers[0])
+        self.override.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.override.__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.discard()
+
+    def link(self, obs):
+        ''' Makes the objects available in the scratch scene '''
+        objects = self.scene.collection.objects
+        for ob in obs:
+            handle = ob.session_uid
+            if handle not in self.linked and handle not in self.copies and handle not in self.staged:
+                objects.link(ob)
+                self.linked[handle] = ob
+
+    def stage(self, ob):
+        ''' Returns the copy of an object, creating it the first time the object is about to be changed '''
+        handle = ob.session_uid
+        if handle in self.staged:
+            return ob
+        copy = self.copies.get(handle)
+        if copy:
+            return copy
+
+        name = ob.name
+        copy = ob.copy()
+        ob.name = f"WF_STAGED_{handle}"
+        self.renamed.append((ob, name))
+        copy.name = name
+
+        data = ob.data
+        if data and data.id_type in DATA_COLLECTIONS:
+            data_copy = self.data_copies.get(data.session_uid)
+            if not data_copy:
+                data_name = data.name
+                data_copy = data.copy()
+                data.name = f"WF_STAGED_{data.session_uid}"
+                self.renamed.append((data, data_name))
+                data_copy.name = data_name
+                self.data_copies[data.session_uid] = data_copy
+            copy.data = data_copy
+
+        objects = self.scene.collection.objects
+        if self.linked.pop(handle, None):
+            objects.unlink(ob)
+        objects.link(copy)
+        self.copies[handle] = copy
+        self.staged.add(copy.session_uid)
+
+        return copy
+
+    def get_objects(self, obs, stage=False):
+        ''' Maps a set of original objects to the objects the run should work on.
+        When staging, every object gets a copy, otherwise only the objects already copied are swapped.'''
+        if stage:
+            return ObjectSet(self.stage(ob) for ob in obs)
+        elif not self.copies or not any(handle in self.copies for handle in obs.handles()):
+            return obs
+
+        copies = self.copies
+        return ObjectSet(copies.get(ob.session_uid, ob) for ob in obs)
+
+    def release(self, obs):
+        ''' Removes the copies of objects the run is done with, e.g. a streamed chunk, and gives the objects back their
+        names. The data copies go too once no other copy uses them.'''
+        handles = {ob.session_uid for ob in obs}
+        released = [self.copies.pop(handle) for handle in handles if handle in self.copies]
+        if not released:
+            return
+
+        data_blocks = {}
+        for copy in released:
+            if is_removed(copy):
+                continue
+            self.staged.discard(copy.session_uid)
+            if copy.data:
+                data_blocks.setdefault(copy.data.session_uid, copy.data)
+            bpy.data.objects.remove(copy, do_unlink=True)
+
+        for data in data_blocks.values():
+            if data.users == 0 and data.id_type in DATA_COLLECTIONS:
+                getattr(bpy.data, DATA_COLLECTIONS[data.id_type]).remove(data)
+        for handle, data_copy in list(self.data_copies.items()):
+            if is_removed(data_copy):
+                del self.data_copies[handle]
+                handles.add(handle)
+
+        renamed = []
+        for id, name in reversed(self.renamed):
+            if is_removed(id):
+                continue
+            if id.session_uid in handles:
+                id.name = name
+            else:
+                renamed.append((id, name))
+        self.renamed = renamed[::-1]
+
+    def discard(self):
+        ''' Removes everything the run created and gives the originals their names back '''
+        scene = self.scene
+        originals = set(self.linked)
+
+        # Copies and anything the run created from them, some copies may already be gone (e.g. joined)
+        removed = {ob.session_uid: ob for ob in scene.collection.all_objects if ob.session_uid not in originals}
+        for copy in self.copies.values():
+            if not is_removed(copy):
+                removed.setdefault(copy.session_uid, copy)
+
+        data_blocks = {data.session_uid: data for data in self.data_copies.values() if not is_removed(data)}
+        for ob in removed.values():
+            if ob.data:
+                data_blocks.setdefault(ob.data.session_uid, ob.data)
+            bpy.data.objects.remove(ob, do_unlink=True)
+
+        for data in data_blocks.values():
+            if not is_removed(data) and data.users == 0 and data.id_type in DATA_COLLECTIONS:
+                getattr(bpy.data, DATA_COLLECTIONS[data.id_type]).remove(data)
+
+        for id, name in reversed(self.renamed):
+            if not is_removed(id):
+                id.name = name
+
+        bpy.data.scenes.remove(scene)
+
+        self.linked.clear()
+        self.copies.clear()
+        self.staged.clear()
+        self.data_copies.clear()
+        self.renamed.clear()
+
+
+def is_removed(id):
+    try:
+        id.name
+        return False
+    except ReferenceError:
+        return True
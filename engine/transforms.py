@@ -0,0 +1,345 @@
+import bpy
+import itertools
+import numpy as np
+from .meshes import read_array
+
+# Euler order -> (axes i, j, k, parity), as Blender orders the rotations
+EULER_ORDERS = {
+    'XYZ': ((0, 1, 2), False),
+    'XZY': ((0, 2, 1), True),
+    'YXZ': ((1, 0, 2), True),
+    'YZX': ((1, 2, 0), False),
+    'ZXY': ((2, 0, 1), False),
+    'ZYX': ((2, 1, 0), True),
+}
+
+# Channel -> values per object
+CHANNEL_SIZES = {
+    "location": 3, "rotation_euler": 3, "rotation_quaternion": 4, "rotation_axis_angle": 4, "scale": 3,
+    "delta_location": 3, "delta_rotation_euler": 3, "delta_rotation_quaternion": 4, "delta_scale": 3,
+    "matrix_world": 16, "matrix_basis": 16,
+}
+
+# Sets holding at least 1 / BULK_FRACTION of the objects of the file read the channels of every object at once
+BULK_FRACTION = 4
+
+
+def euler_to_matrix(eulers, order):
+    (i, j, k), parity = EULER_ORDERS[order]
+    angles = -eulers if parity else eulers
+    ci, cj, ch = np.cos(angles[:, i]), np.cos(angles[:, j]), np.cos(angles[:, k])
+    si, sj, sh = np.sin(angles[:, i]), np.sin(angles[:, j]), np.sin(angles[:, k])
+    cc, cs, sc, ss = ci * ch, ci * sh, si * ch, si * sh
+
+    matrices = np.empty((len(eulers), 3, 3))
+    matrices[:, i, i] = cj * ch
+    matrices[:, i, j] = sj * sc - cs
+    matrices[:, i, k] = sj * cc + ss
+    matrices[:, j, i] = cj * sh
+    matrices[:, j, j] = sj * ss + cc
+    matrices[:, j, k] = sj * cs - sc
+    matrices[:, k, i] = -sj
+    matrices[:, k, j] = cj * si
+    matrices[:, k, k] = cj * ci
+    return matrices
+
+
+def matrix_to_euler(matrices, order):
+    ''' Eulers of rotation matrices, the solution with the smallest angles like Matrix.to_euler() '''
+    (i, j, k), parity = EULER_ORDERS[order]
+    cy = np.hypot(matrices[:, i, i], matrices[:, j, i])
+    regular = cy > 16 * np.finfo(np.float32).eps
+
+    first = np.empty((len(matrices), 3))
+    second = np.empty((len(matrices), 3))
+    first[:, i] = np.where(regular, np.arctan2(matrices[:, k, j], matrices[:, k, k]),
+                           np.arctan2(-matrices[:, j, k], matrices[:, j, j]))
+    first[:, j] = np.arctan2(-matrices[:, k, i], cy)
+    first[:, k] = np.where(regular, np.arctan2(matrices[:, j, i], matrices[:, i, i]), 0.0)
+    second[:, i] = np.where(regular, np.arctan2(-matrices[:, k, j], -matrices[:, k, k]), first[:, i])
+    second[:, j] = np.where(regular, np.arctan2(-matrices[:, k, i], -cy), first[:, j])
+    second[:, k] = np.where(regular, np.arctan2(-matrices[:, j, i], -matrices[:, i, i]), first[:, k])
+    if parity:
+        first, second = -first, -second
+
+    use_second = np.abs(first).sum(axis=1) > np.abs(second).sum(axis=1)
+    return np.where(use_second[:, None], second, first)
+
+
+def quaternion_to_matrix(quaternions):
+    norms = np.linalg.norm(quaternions, axis=1, keepdims=True)
+    w, x, y, z = (quaternions / np.where(norms > 0.0, norms, 1.0)).T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+    ], axis=1)
+
+
+def matrix_to_quaternion(matrices):
+    ''' Quaternions of rotation matrices, with a positive w like Matrix.to_quaternion() '''
+    m = matrices
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    candidates = np.stack([
+        np.stack([1 + trace, m[:, 2, 1] - m[:, 1, 2], m[:, 0, 2] - m[:, 2, 0], m[:, 1, 0] - m[:, 0, 1]], axis=1),
+        np.stack([m[:, 2, 1] - m[:, 1, 2], 1 + m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2], m[:, 0, 1] + m[:, 1, 0],
+                  m[:, 0, 2] + m[:, 2, 0]], axis=1),
+        np.stack([m[:, 0, 2] - m[:, 2, 0], m[:, 0, 1] + m[:, 1, 0], 1 - m[:, 0, 0] + m[:, 1, 1] - m[:, 2, 2],
+                  m[:, 1, 2] + m[:, 2, 1]], axis=1),
+        np.stack([m[:, 1, 0] - m[:, 0, 1], m[:, 0, 2] + m[:, 2, 0], m[:, 1, 2] + m[:, 2, 1],
+                  1 - m[:, 0, 0] - m[:, 1, 1] + m[:, 2, 2]], axis=1),
+    ], axis=1)
+    # The candidate with the largest diagonal term is the most accurate one
+    pivots = np.argmax(np.stack([trace, m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]], axis=1), axis=1)
+    quaternions = candidates[np.arange(len(m)), pivots]
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return np.where(quaternions[:, :1] < 0.0, -quaternions, quaternions)
+
+
+def axis_angle_to_quaternion(axis_angles):
+    angles = axis_angles[:, 0]
+    axes = axis_angles[:, 1:]
+    norms = np.linalg.norm(axes, axis=1, keepdims=True)
+    axes = np.where(norms > 0.0, axes / np.where(norms > 0.0, norms, 1.0), [0.0, 1.0, 0.0])
+    return np.concatenate([np.cos(angles / 2)[:, None], axes * np.sin(angles / 2)[:, None]], axis=1)
+
+
+def quaternion_to_axis_angle(quaternions):
+    angles = 2 * np.arccos(np.clip(quaternions[:, 0], -1.0, 1.0))
+    sines = np.sqrt(np.maximum(1.0 - quaternions[:, 0] ** 2, 0.0))
+    axes = np.where(sines[:, None] > 1e-8, quaternions[:, 1:] / np.maximum(sines, 1e-8)[:, None], [0.0, 1.0, 0.0])
+    return np.concatenate([angles[:, None], axes], axis=1)
+
+
+def invert_matrices(matrices):
+    ''' Inverses of the matrices, the identity for the ones that can't be inverted '''
+    singular = np.abs(np.linalg.det(matrices)) < 1e-12
+    safe = np.where(singular[:, None, None], np.eye(matrices.shape[-1]), matrices)
+    return np.linalg.inv(safe)
+
+
+class ObjectTransforms():
+    ''' Transform channels of the objects of a set as arrays.
+    Sets holding a good part of the file read their channels for all the objects of the file at once with foreach_get,
+    smaller sets read them object by object. Changes are only written to the objects of the set, with foreach_set when
+    the set holds every object of the file. Nothing is selected or made active, moved objects are tagged for the
+    depsgraph to update them.
+    World space changes are solved one hierarchy level at a time, so objects parented to other objects of the set are
+    placed once the changes of their parents are evaluated.'''
+
+    def __init__(self, context, obs, world=False):
+        self.context = context
+        # Matrices are only up to date after the changes of previous nodes are evaluated
+        if world:
+            context.view_layer.update()
+        self.obs = list(obs)
+        self.modes = [ob.rotation_mode for ob in self.obs]
+        objects = bpy.data.objects
+        self.rows = None
+        self.whole_file = len(self.obs) == len(objects)
+        if len(self.obs) * BULK_FRACTION >= len(objects):
+            handles = read_array(objects, "session_uid", 1, np.int32).astype(np.int64)
+            sorter = np.argsort(handles)
+            wanted = np.fromiter((ob.session_uid for ob in self.obs), dtype=np.int64, count=len(self.obs))
+            self.rows = sorter[np.searchsorted(handles, wanted, sorter=sorter)]
+        # channel -> values of the objects of the set, matrices row by row
+        self.channels = {}
+        # channel -> positions in the set of the objects whose channel changed since it was last written
+        self.changed = {}
+
+    def __len__(self):
+        return len(self.obs)
+
+    def get_channel(self, name):
+        values = self.channels.get(name)
+        if values is None:
+            size = CHANNEL_SIZES[name]
+            if self.rows is not None:
+                values = read_array(bpy.data.objects, name, size, np.float32).reshape(-1, size)[self.rows]
+                if name.startswith("matrix_"):
+                    # Matrices are stored column by column
+                    values = values.reshape(-1, 4, 4).transpose(0, 2, 1).reshape(-1, size)
+            elif name.startswith("matrix_"):
+                values = np.fromiter((value for ob in self.obs for row in getattr(ob, name) for value in row),
+                                     dtype=np.float64, count=len(self.obs) * size)
+            else:
+                values = np.fromiter(itertools.chain.from_iterable(getattr(ob, name) for ob in self.obs),
+                                     dtype=np.float64, count=len(self.obs) * size)
+            values = self.channels[name] = values.astype(np.float64).reshape(-1, size)
+        return values
+
+    def read(self, name, positions=None):
+        ''' Values of the channel for the objects of the set, or for the objects at the positions given '''
+        values = self.get_channel(name)
+        values = values.copy() if positions is None else values[positions]
+        if name.startswith("matrix_"):
+            return values.reshape(-1, 4, 4)
+        return values
+
+    def write(self, name, values, positions=None):
+        ''' Sets the channel of the objects of the set, or of the objects at the positions given.
+        Values are kept until flush writes them to the objects.'''
+        self.get_channel(name)[slice(None) if positions is None else positions] = values
+        self.changed.setdefault(name, []).append(np.arange(len(self)) if positions is None else positions)
+
+    def flush(self):
+        ''' Writes the changed channels to the objects '''
+        for name, changes in self.changed.items():
+            values = self.channels[name]
+            if self.whole_file:
+                channel = np.empty_like(values, dtype=np.float32)
+                channel[self.rows] = values
+                bpy.data.objects.foreach_set(name, channel.ravel())
+                continue
+            positions = np.unique(np.concatenate(changes))
+            for ob, value in zip((self.obs[position] for position in positions.tolist()), values[positions].tolist()):
+                setattr(ob, name, value)
+        self.changed.clear()
+
+    def get_levels(self):
+        ''' Positions of the objects in the set by the number of their ancestors in the set, parents first '''
+        handles = {ob.session_uid for ob in self.obs}
+        levels = {}
+        for position, ob in enumerate(self.obs):
+            depth = 0
+            parent = ob.parent
+            while parent:
+                depth += parent.session_uid in handles
+                parent = parent.parent
+            levels.setdefault(depth, []).append(position)
+        return [np.array(levels[depth]) for depth in sorted(levels)]
+
+    def iter_levels(self):
+        ''' Goes through the hierarchy levels of the set, evaluating the changes made to a level before the next one
+        so that the matrices read for it are up to date '''
+        levels = self.get_levels()
+        for index, positions in enumerate(levels):
+            if index:
+                self.flush()
+                for position in levels[index - 1].tolist():
+                    self.obs[position].update_tag(refresh={'OBJECT'})
+                self.context.view_layer.update()
+                self.channels.pop("matrix_world", None)
+                self.channels.pop("matrix_basis", None)
+            yield positions
+
+    def get_mode_groups(self, positions=None):
+        ''' Positions of the objects in the set by rotation mode, only among the positions given if any '''
+        if positions is None:
+            positions = range(len(self))
+        groups = {}
+        for position in positions:
+            groups.setdefault(self.modes[position], []).append(position)
+        return {mode: np.array(group) for mode, group in groups.items()}
+
+    def get_rotations(self, delta=False, positions=None):
+        ''' Rotation matrices of the rotation channels, or of the delta rotations '''
+        prefix = "delta_" if delta else ""
+        rotations = np.empty((len(self), 3, 3))
+        for mode, group in self.get_mode_groups(positions).items():
+            if mode in EULER_ORDERS:
+                rotations[group] = euler_to_matrix(self.read(prefix + "rotation_euler", group), mode)
+            elif mode == 'QUATERNION':
+                rotations[group] = quaternion_to_matrix(self.read(prefix + "rotation_quaternion", group))
+            elif delta:
+                # Axis angle delta rotations aren't exposed to Python
+                rotations[group] = np.eye(3)
+            else:
+                quaternions = axis_angle_to_quaternion(self.read("rotation_axis_angle", group))
+                rotations[group] = quaternion_to_matrix(quaternions)
+        return rotations if positions is None else rotations[positions]
+
+    def set_rotations(self, rotations, positions=None):
+        ''' Sets the rotation channels from rotation matrices, in the rotation mode of each object.
+        With positions, the rotations are the ones of the objects at those positions.'''
+        if positions is not None:
+            # Rotations indexed by position in the set
+            placed = np.empty((len(self), 3, 3))
+            placed[positions] = rotations
+            rotations = placed
+        for mode, group in self.get_mode_groups(positions).items():
+            if mode in EULER_ORDERS:
+                self.write("rotation_euler", matrix_to_euler(rotations[group], mode), group)
+            elif mode == 'QUATERNION':
+                self.write("rotation_quaternion", matrix_to_quaternion(rotations[group]), group)
+            else:
+                axis_angles = quaternion_to_axis_angle(matrix_to_quaternion(rotations[group]))
+                self.write("rotation_axis_angle", axis_angles, group)
+
+    def get_parent_matrices(self, positions=None):
+        ''' Matrices taking the transform channels to world space: parent, parent inverse and constraints '''
+        return self.read("matrix_world", positions) @ invert_matrices(self.read("matrix_basis", positions))
+
+    def get_frames(self, positions=None):
+        ''' Rotations of the spaces the rotation channels are in, in world space '''
+        parents = self.get_parent_matrices(positions)[:, :3, :3]
+        norms = np.linalg.norm(parents, axis=1, keepdims=True)
+        parents = parents / np.where(norms > 0.0, norms, 1.0)
+        return parents @ self.get_rotations(delta=True, positions=positions)
+
+    def move_level(self, positions, targets):
+        ''' Moves the origins of the objects at the positions to world positions, given the matrices read now '''
+        offsets = targets - self.read("matrix_world", positions)[:, :3, 3]
+        offsets = np.einsum('nij,nj->ni', invert_matrices(self.get_parent_matrices(positions)[:, :3, :3]), offsets)
+        self.write("location", self.read("location", positions) + offsets, positions)
+
+    def translate(self, offsets, world=False):
+        ''' Moves the objects by the offsets, in world space or in the space of their parents '''
+        offsets = np.broadcast_to(np.asarray(offsets, dtype=np.float64), (len(self), 3))
+        if world:
+            self.move_to(self.read("matrix_world")[:, :3, 3] + offsets)
+        else:
+            self.write("location", self.read("location") + offsets)
+
+    def move_to(self, positions):
+        ''' Moves the origins of the objects to world positions '''
+        targets = np.broadcast_to(np.asarray(positions, dtype=np.float64), (len(self), 3))
+        for level in self.iter_levels():
+            self.move_level(level, targets[level])
+
+    def snap_to_grid(self, grid_size):
+        ''' Moves the origins of the objects to the closest points of a world grid '''
+        positions = self.read("matrix_world")[:, :3, 3]
+        self.move_to(np.round(positions / grid_size) * grid_size)
+
+    def rotate(self, rotation, world=False):
+        ''' Rotates the objects around their origins by a rotation matrix, along the world axes or their own '''
+        rotation = np.asarray(rotation, dtype=np.float64)
+        rotations = self.get_rotations()
+        if not world:
+            self.set_rotations(rotations @ rotation)
+            return
+
+        # World rotations of the objects before any of them turns
+        frames = self.get_frames()
+        targets = rotation @ frames @ rotations
+        origins = self.read("matrix_world")[:, :3, 3]
+        for index, level in enumerate(self.iter_levels()):
+            if index:
+                # Turning their parents carried the origins along
+                self.move_level(level, origins[level])
+            self.set_rotations(self.get_frames(level).transpose(0, 2, 1) @ targets[level], level)
+
+    def scale(self, factors):
+        self.write("scale", self.read("scale") * np.asarray(factors, dtype=np.float64))
+
+    def set_world_matrices(self, matrices):
+        ''' Sets the transform channels so that the objects end up with these world matrices '''
+        matrices = np.broadcast_to(np.asarray(matrices, dtype=np.float64), (len(self), 4, 4))
+        for level in self.iter_levels():
+            basis = invert_matrices(self.get_parent_matrices(level)) @ matrices[level]
+            scales = np.linalg.norm(basis[:, :3, :3], axis=1)
+            scales[np.linalg.det(basis[:, :3, :3]) < 0.0] *= -1.0
+            rotations = basis[:, :3, :3] / np.where(scales != 0.0, scales, 1.0)[:, None, :]
+
+            delta_rotations = self.get_rotations(delta=True, positions=level)
+            delta_scales = self.read("delta_scale", level)
+            self.write("location", basis[:, :3, 3] - self.read("delta_location", level), level)
+            self.set_rotations(delta_rotations.transpose(0, 2, 1) @ rotations, level)
+            self.write("scale", scales / np.where(delta_scales != 0.0, delta_scales, 1.0), level)
+
+    def update(self):
+        ''' Writes the changes and tags the objects for the depsgraph, foreach_set doesn't '''
+        self.flush()
+        for ob in self.obs:
+            ob.update_tag(refresh={'OBJECT'})
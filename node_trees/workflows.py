@@ -7,6 +7,11 @@ INPUT_NODES = ["WFNodeSceneInput", "WFNodeObjectInput", "WFNodeCollectionInput"]
 last_exec_error = None
 
 
+def invalidate_plans_update(self, context):
+    from ..engine.plan import invalidate_plans
+    invalidate_plans(self)
+
+
 class WFNodeTree(NodeTree):
     bl_idname = "WFNodeTree"
     bl_label = "Workflows Graph"
@@ -15,12 +20,93 @@ class WFNodeTree(NodeTree):
     # TODO HACK to stop log spam when editing group inputs
     type: bpy.props.StringProperty("WFTREE")
 
+    persist_socket_previews: bpy.props.BoolProperty(
+        name="Persist Socket Previews",
+        description="Also write the objects computed for each socket into the .blend file so they can be inspected",
+        default=False,
+        update=invalidate_plans_update
+    )
+
+    run_all_mode: bpy.props.EnumProperty(
+        name="Run All Mode",
+        description="How \"Run All Workflows\" executes the runnable nodes of this tree",
+        items=[
+            ('SINGLE_PASS', "Single Pass",
+             "Run workflows that do not conflict on scene changes together, sharing their upstream results"),
+            ('SEPARATE', "Separate", "Run every workflow on its own, recomputing everything upstream of it"),
+            ('PARALLEL', "Parallel",
+             "Run the workflows in background Blender processes working on a snapshot of the file"),
+        ],
+        default='SINGLE_PASS'
+    )
+
+    parallel_workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of background Blender processes used by parallel runs, 0 uses one per CPU core",
+        default=0,
+        min=0
+    )
+
+    isolation_mode: bpy.props.EnumProperty(
+        name="Isolation",
+        description="How the changes a workflow makes to the scene are reverted after running it",
+        items=[
+            ('STAGING', "Staging",
+             "Run in a scratch scene on copies of the objects the workflow changes and delete them afterwards"),
+            ('UNDO', "Undo", "Run in the current scene and revert it using the undo system"),
+        ],
+        default='STAGING'
+    )
+
+    reuse_results: bpy.props.BoolProperty(
+        name="Reuse Results",
+        description="Skip nodes whose inputs and settings didn't change since the last run and reuse their results",
+        default=True
+    )
+
+    index_names: bpy.props.BoolProperty(
+        name="Index Names",
+        description="Sort the names of large object sets once per run so Starts With and Ends With filters only "
+                    "look at the matching objects. Helps when many filters read the same large set",
+        default=False
+    )
+
+    profile: bpy.props.BoolProperty(
+        name="Profile",
+        description="Record how long every node takes when running workflows of this tree",
+        default=False
+    )
+
+    export_cache: bpy.props.BoolProperty(
+        name="Export Cache",
+        description="Copy the files of a previous export instead of exporting again when the exported objects, "
+                    "their materials, modifiers and the exporter settings didn't change",
+        default=False
+    )
+
+    export_cache_dir: bpy.props.StringProperty(
+        name="Cache Directory",
+        description="Directory where exported files are cached, the system temporary directory if empty",
+        default="",
+        subtype='DIR_PATH'
+    )
+
+    export_cache_size: bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Size over which the least recently used cached exports are deleted",
+        default=1024,
+        min=1
+    )
+
     def mark_invalid_links(self):
         for link in self.links:
             if type(link.from_socket) is not type(link.to_socket):
                 link.is_valid = False
 
     def update(self):
+        from ..engine.plan import invalidate_plans
+        invalidate_plans(self)
+
         for link in self.links:
             if type(link.from_socket) is not type(link.to_socket):
                 if isinstance(link.from_socket.node, NodeReroute):
@@ -43,6 +129,39 @@ class WFNodeTree(NodeTree):
                     self.links.remove(link)
 
 
+def run_workflows(context, tree, node_names, message, profile=None):
+    ''' Runs the given runnable nodes of a tree in a single pass and reverts the scene afterwards '''
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    from ..engine.plan import get_plan
+    from ..engine.executor import execute_plan
+    plan = get_plan(tree, node_names)
+
+    if tree.isolation_mode == 'STAGING':
+        from ..engine.staging import Staging
+        with Staging(context) as staging:
+            execute_plan(plan, bpy.context, staging, profile)
+        return
+
+    original_undo_steps = bpy.context.preferences.edit.undo_steps
+    bpy.context.preferences.edit.undo_steps = 1000
+    prev_global_undo = bpy.context.preferences.edit.use_global_undo
+    bpy.context.preferences.edit.use_global_undo = True
+    bpy.ops.ed.undo_push(message='Run Workflow')
+
+    try:
+        execute_plan(plan, context, profile=profile)
+
+    finally:
+        bpy.ops.ed.undo_push(message='Run Workflow')
+        bpy.ops.ed.undo()
+        bpy.ops.ed.undo()
+        bpy.ops.ed.undo_push(message=message)
+        bpy.context.preferences.edit.undo_steps = original_undo_steps
+        bpy.context.preferences.edit.use_global_undo = prev_global_undo
+
+
 class RunWorkflowOperator(bpy.types.Operator):
     bl_idname = "wf.run_workflow"
     bl_label = "Run Workflow"
@@ -50,16 +169,10 @@ class RunWorkflowOperator(bpy.types.Operator):
 
     node_name: bpy.props.StringProperty(default="")
 
-    def execute(self, context):
-        if bpy.context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-        original_undo_steps = bpy.context.preferences.edit.undo_steps
-        bpy.context.preferences.edit.undo_steps = 1000
-        prev_global_undo = bpy.context.preferences.edit.use_global_undo
-        bpy.context.preferences.edit.use_global_undo = True
-        bpy.ops.ed.undo_push(message='Run Workflow')
+    # Adds the timings to the last profile instead of starting a new one
+    keep_profile: bpy.props.BoolProperty(default=False, options={'HIDDEN', 'SKIP_SAVE'})
 
+    def execute(self, context):
         try:
             global last_exec_error
             last_exec_error = False
@@ -71,9 +184,16 @@ class RunWorkflowOperator(bpy.types.Operator):
                     break
 
             if not node:
-                result = {'CANCELLED'}
-            else:
-                node.execute(context)
+                return {'CANCELLED'}
+
+            from ..engine.profiler import Profile, get_last_profile, set_last_profile
+            profile = None
+            if tree.profile:
+                profile = get_last_profile() if self.keep_profile else None
+                profile = profile or Profile()
+                set_last_profile(profile)
+
+            run_workflows(context, tree, [node.name], f'Run Workflow "{self.node_name}"', profile)
 
             self.report({'INFO'}, f'"Run Workflow" execution for node "{self.node_name}" finished successful')
             result = {'FINISHED'}
@@ -86,14 +206,6 @@ class RunWorkflowOperator(bpy.types.Operator):
 
             result = {'CANCELLED'}
 
-        finally:
-            bpy.ops.ed.undo_push(message='Run Workflow')
-            bpy.ops.ed.undo()
-            bpy.ops.ed.undo()
-            bpy.ops.ed.undo_push(message=f'Run Workflow "{self.node_name}"')
-            bpy.context.preferences.edit.undo_steps = original_undo_steps
-            bpy.context.preferences.edit.use_global_undo = prev_global_undo
-
         return result
 
 
@@ -131,12 +243,45 @@ class RunAllWorkflowsOperator(bpy.types.Operator):
                 if isinstance(node, WFRunnableNode):
                     node_names.append(node.name)
 
-            for node_name in node_names:
-                bpy.ops.wf.run_workflow(node_name=node_name)
+            if node_tree.run_all_mode == 'PARALLEL':
+                from ..engine.parallel import start_parallel_run
+                run = start_parallel_run(node_tree, node_names, node_tree.parallel_workers)
+                bpy.app.timers.register(poll_parallel_run, first_interval=0.5)
+                self.report({'INFO'}, f'"Run All Workflows" started in {len(run.workers)} background processes')
+                return {'FINISHED'}
+
+            # Every undo isolated run leaves one undo step behind
+            use_undo = node_tree.isolation_mode == 'UNDO'
+            if node_tree.run_all_mode == 'SINGLE_PASS':
+                from ..engine.plan import get_plan, split_sinks
+                from ..engine.profiler import Profile, set_last_profile
+                profile = Profile() if node_tree.profile else None
+                if profile:
+                    set_last_profile(profile)
+
+                passes = 0
+                try:
+                    for batch in split_sinks(get_plan(node_tree, node_names), node_names):
+                        run_workflows(context, node_tree, batch, 'Run All Workflows', profile)
+                        passes += 1
+                finally:
+                    if use_undo:
+                        for _ in range(passes):
+                            bpy.ops.ed.undo()
+                        bpy.ops.ed.undo_push(message='Run All Workflows')
 
-            for node_name in node_names:
-                bpy.ops.ed.undo()
-            bpy.ops.ed.undo_push(message='Run All Workflows')
+            else:
+                if node_tree.profile:
+                    from ..engine.profiler import Profile, set_last_profile
+                    set_last_profile(Profile())
+
+                for node_name in node_names:
+                    bpy.ops.wf.run_workflow(node_name=node_name, keep_profile=True)
+
+                if use_undo:
+                    for node_name in node_names:
+                        bpy.ops.ed.undo()
+                    bpy.ops.ed.undo_push(message='Run All Workflows')
 
             self.report({'INFO'}, f'"Run All Workflows" execution successful')
             result = {'FINISHED'}
@@ -152,6 +297,84 @@ class RunAllWorkflowsOperator(bpy.types.Operator):
         return result
 
 
+def poll_parallel_run():
+    ''' Timer gathering the results of the parallel run once its workers are done '''
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                area.tag_redraw()
+
+    from ..engine.parallel import get_last_run
+    run = get_last_run()
+    if not run or run.finished:
+        return None
+    elif not run.poll():
+        return 0.5
+
+    global last_exec_error
+    last_exec_error = run.failed
+    for sink in run.sinks:
+        if sink["status"] != "success":
+            print(f'"Run All Workflows" execution for node "{sink["node"]}" failed: {sink["error"]}')
+            if "traceback" in sink:
+                print(sink["traceback"])
+
+    return None
+
+
+class CancelParallelRunOperator(bpy.types.Operator):
+    bl_idname = "wf.cancel_parallel_run"
+    bl_label = "Cancel"
+    bl_description = "Stops the background processes of the parallel run in progress"
+
+    def execute(self, context):
+        from ..engine.parallel import cancel_parallel_run
+        cancel_parallel_run()
+        return {'FINISHED'}
+
+
+class ExportProfileTraceOperator(bpy.types.Operator):
+    bl_idname = "wf.export_profile_trace"
+    bl_label = "Export Trace"
+    bl_description = "Saves the node timings of the last profiled run as a Chrome trace file (chrome://tracing, Perfetto)"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+
+    filename_ext = ".json"
+
+    @classmethod
+    def poll(cls, context):
+        from ..engine.profiler import get_last_profile
+        return get_last_profile() is not None
+
+    def execute(self, context):
+        from ..engine.profiler import get_last_profile
+        get_last_profile().export_chrome_trace(bpy.path.abspath(self.filepath))
+        self.report({'INFO'}, f'Trace saved to "{self.filepath}"')
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "workflows_trace.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+
+class ClearExportCacheOperator(bpy.types.Operator):
+    bl_idname = "wf.clear_export_cache"
+    bl_label = "Clear Cache"
+    bl_description = "Deletes the exported files cached for this tree"
+
+    @classmethod
+    def poll(cls, context):
+        return context.space_data.node_tree and context.space_data.node_tree.export_cache
+
+    def execute(self, context):
+        from ..engine.export_cache import get_export_cache
+        get_export_cache(context.space_data.node_tree).clear()
+        return {'FINISHED'}
+
+
 class ShowInfoLogOperator(bpy.types.Operator):
     bl_idname = "wf.last_exec_error"
     bl_label = "Show Info Log"
@@ -175,6 +398,16 @@ class WF_PT_GraphPanel(bpy.types.Panel):
         layout = self.layout
         main = layout.column()
         main.row().operator(RunAllWorkflowsOperator.bl_idname)
+        if context.space_data.node_tree:
+            main.row().prop(context.space_data.node_tree, "run_all_mode", text="")
+            if context.space_data.node_tree.run_all_mode == 'PARALLEL':
+                main.row().prop(context.space_data.node_tree, "parallel_workers")
+            main.row().prop(context.space_data.node_tree, "isolation_mode", text="")
+            main.row().prop(context.space_data.node_tree, "reuse_results")
+            main.row().prop(context.space_data.node_tree, "persist_socket_previews")
+            main.row().prop(context.space_data.node_tree, "index_names")
+            main.row().prop(context.space_data.node_tree, "profile")
+            main.row().prop(context.space_data.node_tree, "export_cache")
         show_info_row = main.row()
         show_info_row.operator(ShowInfoLogOperator.bl_idname)
         result_row = main.row()
@@ -186,11 +419,51 @@ class WF_PT_GraphPanel(bpy.types.Panel):
             show_info_row.enabled = False
             result_row.enabled = False
 
+        from ..engine.parallel import get_last_run
+        run = get_last_run()
+        if run and not run.finished:
+            done, total = run.get_progress()
+            row = main.row()
+            row.label(text=f'Parallel run: {done}/{total} workers done', icon='SORTTIME')
+            row.operator(CancelParallelRunOperator.bl_idname, text="", icon='CANCEL')
+        elif run and run.sinks:
+            succeeded = sum(1 for sink in run.sinks if sink["status"] == "success")
+            main.row().label(text=f'Parallel run: {succeeded}/{len(run.sinks)} succeeded in {run.duration:.1f}s')
+            for sink in run.sinks:
+                if sink["status"] != "success":
+                    main.row().label(text=f'{sink["node"]}: {sink["error"]}', icon='ERROR')
+
+        from ..engine.profiler import get_last_profile
+        profile = get_last_profile()
+        node_tree = context.space_data.node_tree
+        if profile and node_tree and node_tree.profile:
+            box = main.box()
+            box.label(text="Slowest nodes:")
+            for node_name, duration in profile.get_slowest(node_tree.name):
+                row = box.row()
+                row.label(text=node_name)
+                row.label(text=f'{duration * 1000:.1f} ms')
+            box.operator(ExportProfileTraceOperator.bl_idname)
+
+        if node_tree and node_tree.export_cache:
+            from ..engine.export_cache import get_export_cache, get_stats
+            stats = get_stats()
+            box = main.box()
+            box.prop(node_tree, "export_cache_dir")
+            box.prop(node_tree, "export_cache_size")
+            box.label(text=f'Hits: {stats["hits"]}  Misses: {stats["misses"]}  Not cacheable: {stats["bypassed"]}')
+            row = box.row()
+            row.label(text=f'Size: {get_export_cache(node_tree).get_size() / (1024 * 1024):.1f} MB')
+            row.operator(ClearExportCacheOperator.bl_idname)
+
 
 CLASSES = [
     WFNodeTree,
     RunWorkflowOperator,
     RunAllWorkflowsOperator,
+    CancelParallelRunOperator,
+    ExportProfileTraceOperator,
+    ClearExportCacheOperator,
     ShowInfoLogOperator,
     WF_PT_GraphPanel
 ]
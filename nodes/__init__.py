@@ -28,12 +28,18 @@ WF_CATEGORIES = [
     WFCategory("WORKFLOWS_Transforms", "Transforms", items=[
         NodeItem("WFNodeTranslateToPosition"),
         NodeItem("WFNodeTranslateToObjectPosition"),
+        NodeItem("WFNodeTranslate"),
+        NodeItem("WFNodeRotate"),
+        NodeItem("WFNodeScale"),
+        NodeItem("WFNodeSetTransform"),
+        NodeItem("WFNodeSnapToGrid"),
     ]),
     WFCategory("WORKFLOWS_Object", "Object", items=[
         NodeItem("WFNodeInstancesMakeReal"),
     ]),
     WFCategory("WORKFLOWS_Geometry", "Geometry", items=[
         NodeItem("WFNodeJoinObjects"),
+        NodeItem("WFNodeMergeByDistance"),
     ]),
     WFCategory("WORKFLOWS_Modifiers", "Modifiers", items=[
         NodeItem("WFNodeApplyModifierType"),
@@ -61,6 +67,7 @@ WF_CATEGORIES = [
     WFCategory("WORKFLOWS_Misc", "Misc", items=[
         NodeItem("WFNodeAddPrefixToName"),
         NodeItem("WFNodeAddSuffixToName"),
+        NodeItem("WFNodeNameFromTemplate"),
     ]),
 ]
 
@@ -77,9 +84,16 @@ CLASSES = [
     modifiers.WFRemoveAllModifiers,
     misc.WFNodeAddPrefixToName,
     misc.WFNodeAddSuffixToName,
+    misc.WFNodeNameFromTemplate,
     geometry.WFNodeJoinObjects,
+    geometry.WFNodeMergeByDistance,
     transforms.WFNodeTranslateToPosition,
     transforms.WFNodeTranslateToObjectPosition,
+    transforms.WFNodeTranslate,
+    transforms.WFNodeRotate,
+    transforms.WFNodeScale,
+    transforms.WFNodeSetTransform,
+    transforms.WFNodeSnapToGrid,
     uv.WFNodeSetActiveUVMap,
     filters.WFNodeFilterStartsWith,
     filters.WFNodeFilterEndsWith,
@@ -2,13 +2,60 @@ import bpy
 from .mixins import WFExportNode
 
 
-class WFNodeExportGLTF(WFExportNode):
+def get_preset_error(operator, preset):
+    ''' Why the preset of an export node can't be used, empty if it can or there is no preset '''
+    if not preset:
+        return ""
+    from ..engine.presets import get_presets
+    return get_presets().get_error(operator, "_".join(s for s in preset.split())) or ""
+
+
+def preset_update(self, context):
+    self.refresh(context)
+
+
+class WFPresetExportNode(WFExportNode):
+    ''' Export node using an exporter preset. The preset is looked up when it changes, when the file is loaded and
+    when the presets are refreshed, drawing the node only shows the error found then.'''
+
+    # Exporter operator the presets are for
+    wf_preset_operator = None
+
+    preset: bpy.props.StringProperty(
+        name="Preset",
+        description="Exporter preset used for the export, the last used exporter settings if empty",
+        default="",
+        update=preset_update
+    )
+
+    preset_error: bpy.props.StringProperty(
+        name="Preset Error",
+        description="Why the preset can't be used",
+        default=""
+    )
+
+    def refresh(self, context):
+        error = get_preset_error(self.wf_preset_operator, self.preset)
+        if error != self.preset_error:
+            self.preset_error = error
+
+    def draw_buttons(self, context, layout):
+        super().draw_buttons(context, layout)
+
+        row = layout.row(align=True)
+        row.prop(self, "preset")
+        row.operator("wf.refresh_export_presets", text="", icon='FILE_REFRESH')
+        if self.preset_error:
+            layout.label(text=self.preset_error, icon='ERROR')
+
+
+class WFNodeExportGLTF(WFPresetExportNode):
     bl_label = "Export glTF"
     bl_description = """Exports the input objects to a glTF file. The file path extension (.gltf or .glb) will be used to choose the output type.
     - in: One or more objects sets"""
     bl_width_default = 300
 
-    preset: bpy.props.StringProperty(default="")
+    wf_preset_operator = "export_scene.gltf"
 
     def execute(self, context):
         from .mixins import get_input_socket_data
@@ -16,15 +63,13 @@ class WFNodeExportGLTF(WFExportNode):
 
         bpy.ops.object.select_all(action='DESELECT')
 
-        import os
-        from ..utils import export_scene_gltf
+        from ..utils import export_scene_gltf, get_export_kwargs
+        from ..engine.export_cache import get_export_cache
+        cache = get_export_cache(self.id_data)
         if self.all_objects:
-            for ob in obs:
-                ob.select_set(True)
-                context.view_layer.objects.active = ob
-                dir = os.path.dirname(self.filepath)
-                export_scene_gltf(context, os.path.join(dir, ob.name + ".gltf"), self.preset)
-                ob.select_set(False)
+            self.export_objects(context, "export_scene.gltf", [
+                (ob, get_export_kwargs(context, "export_scene.gltf", self.get_export_path(ob, ".gltf"), self.preset))
+                for ob in obs], cache)
         else:
             for ob in obs:
                 ob.select_set(True)
@@ -33,21 +78,16 @@ class WFNodeExportGLTF(WFExportNode):
                 last_ob = obs[-1]
                 context.view_layer.objects.active = last_ob
 
-            export_scene_gltf(context, self.filepath, self.preset)
-
-    def draw_buttons(self, context, layout):
-        super().draw_buttons(context, layout)
-
-        layout.prop(self, "preset")
+            export_scene_gltf(context, self.get_export_path(), self.preset, cache)
 
 
-class WFNodeExportFBX(WFExportNode):
+class WFNodeExportFBX(WFPresetExportNode):
     bl_label = "Export FBX"
     bl_description = """Exports the input objects to a FBX file.
     - in: One or more objects sets"""
     bl_width_default = 300
 
-    preset: bpy.props.StringProperty(default="")
+    wf_preset_operator = "export_scene.fbx"
 
     def execute(self, context):
         from .mixins import get_input_socket_data
@@ -55,15 +95,13 @@ class WFNodeExportFBX(WFExportNode):
 
         bpy.ops.object.select_all(action='DESELECT')
 
-        import os
-        from ..utils import export_scene_fbx
+        from ..utils import export_scene_fbx, get_export_kwargs
+        from ..engine.export_cache import get_export_cache
+        cache = get_export_cache(self.id_data)
         if self.all_objects:
-            for ob in obs:
-                ob.select_set(True)
-                context.view_layer.objects.active = ob
-                dir = os.path.dirname(self.filepath)
-                export_scene_fbx(context, os.path.join(dir, ob.name + ".fbx"), self.preset)
-                ob.select_set(False)
+            self.export_objects(context, "export_scene.fbx", [
+                (ob, get_export_kwargs(context, "export_scene.fbx", self.get_export_path(ob, ".fbx"), self.preset))
+                for ob in obs], cache)
         else:
             for ob in obs:
                 ob.select_set(True)
@@ -72,21 +110,16 @@ class WFNodeExportFBX(WFExportNode):
                 last_ob = obs[-1]
                 context.view_layer.objects.active = last_ob
 
-            export_scene_fbx(context, self.filepath, self.preset)
-
-    def draw_buttons(self, context, layout):
-        super().draw_buttons(context, layout)
-
-        layout.prop(self, "preset")
+            export_scene_fbx(context, self.get_export_path(), self.preset, cache)
 
 
-class WFNodeExportOBJ(WFExportNode):
+class WFNodeExportOBJ(WFPresetExportNode):
     bl_label = "Export OBJ"
     bl_description = """Exports the input objects to a OBJ file.
     - in: One or more objects sets"""
     bl_width_default = 300
 
-    preset: bpy.props.StringProperty(default="")
+    wf_preset_operator = "wm.obj_export"
 
     def execute(self, context):
         from .mixins import get_input_socket_data
@@ -94,15 +127,13 @@ class WFNodeExportOBJ(WFExportNode):
 
         bpy.ops.object.select_all(action='DESELECT')
 
-        import os
-        from ..utils import export_scene_obj
+        from ..utils import export_scene_obj, get_export_kwargs
+        from ..engine.export_cache import get_export_cache
+        cache = get_export_cache(self.id_data)
         if self.all_objects:
-            for ob in obs:
-                ob.select_set(True)
-                context.view_layer.objects.active = ob
-                dir = os.path.dirname(self.filepath)
-                export_scene_obj(context, os.path.join(dir, ob.name + ".obj"), self.preset)
-                ob.select_set(False)
+            self.export_objects(context, "wm.obj_export", [
+                (ob, get_export_kwargs(context, "wm.obj_export", self.get_export_path(ob, ".obj"), self.preset))
+                for ob in obs], cache)
         else:
             for ob in obs:
                 ob.select_set(True)
@@ -111,9 +142,4 @@ class WFNodeExportOBJ(WFExportNode):
                 last_ob = obs[-1]
                 context.view_layer.objects.active = last_ob
 
-            export_scene_obj(context, self.filepath, self.preset)
-
-    def draw_buttons(self, context, layout):
-        super().draw_buttons(context, layout)
-
-        layout.prop(self, "preset")
+            export_scene_obj(context, self.get_export_path(), self.preset, cache)
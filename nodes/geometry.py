@@ -9,50 +9,106 @@ class WFNodeJoinObjects(WFTransformNode):
     - in: One or more objects sets
     - out: The resulting object set
 Note: Only meshes are joined all other objects are ignore.
-note: This applies all modifiers"""
+note: This applies all modifiers
+      The Arrays backend joins the meshes without operators or selection changes"""
     bl_width_default = 160
 
+    backend: bpy.props.EnumProperty(
+        name="",
+        description="How the meshes are joined",
+        items=[
+            ('OPERATOR', "Operators", "Select the objects and join them with Blender's convert and join operators"),
+            ('NUMPY', "Arrays", "Join the mesh arrays with NumPy without changing the selection. Falls back to the "
+                                "operators for curves, texts and other geometry they convert, shape keys, vertex "
+                                "groups, custom normals and mirrored objects"),
+        ],
+        default='OPERATOR'
+    )
+
     def init(self, context):
         super().init(context)
         self.inputs.new("NodeSocketString", "name")
 
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "backend")
+
     def execute(self, context):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
 
-        bpy.ops.object.select_all(action='DESELECT')
+        from .mixins import include_objects
+        include_objects(obs, context)
+
+        last_ob = None
+        if self.backend == 'NUMPY':
+            from ..engine.join import join_meshes
+            others = obs.filter(lambda ob: ob.type != 'MESH')
+            last_ob = join_meshes(context, obs)
+
+        if last_ob is None:
+            last_ob, others = self.join_operator(context, obs)
+
+        name = get_input_socket_data(self.inputs["name"], context)
+        if name and last_ob:
+            last_ob.name = name
+            last_ob.data.name = name
+
+        obs = others
+        if last_ob:
+            obs.add(last_ob)
 
-        vlc = bpy.context.view_layer.layer_collection
-        from ..utils import find_object_layer_collection
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+    def join_operator(self, context, obs):
+        bpy.ops.object.select_all(action='DESELECT')
         for ob in obs:
-            lc = find_object_layer_collection(vlc, ob)
-            if lc:
-                lc.exclude = False
-            else:
-                print(f"Error: object {ob.name} doesn't have an active layer collection")
             ob.select_set(True)
 
-        if obs:
-            for ob in obs:
-                if ob.type != 'MESH' and ob.type != 'EMPTY':
-                    context.view_layer.objects.active = ob
-                    bpy.ops.object.convert(target='MESH')
+        for ob in obs:
+            if ob.type != 'MESH' and ob.type != 'EMPTY':
+                context.view_layer.objects.active = ob
+                bpy.ops.object.convert(target='MESH')
 
-            meshes = [ob for ob in obs if ob.type == 'MESH']
-            if meshes:
-                last_ob = meshes[0]
+        # Handles are taken before the join removes the objects
+        others = obs.filter(lambda ob: ob.type != 'MESH')
+        meshes = [ob for ob in obs if ob.type == 'MESH']
+        if not meshes:
+            return None, others
 
+        last_ob = meshes[0]
         context.view_layer.objects.active = last_ob
         bpy.ops.object.join()
+        return last_ob, others
 
-        name = get_input_socket_data(self.inputs["name"], context)
-        if name:
-            last_ob.name = name
-            if hasattr(ob, "data") and ob.data:
-                last_ob.data.name = name
 
-        for mesh in meshes:
-            obs.remove(mesh)
-        obs.append(last_ob)
+class WFNodeMergeByDistance(WFTransformNode):
+    bl_label = "Merge By Distance"
+    bl_description = """Merges the vertices of meshes closer than a distance, like Merge By Distance in edit mode
+    - in: One or more objects sets
+    - out: All input objects
+Note: Objects sharing a mesh are merged once, other objects are ignored"""
+    bl_width_default = 160
+
+    distance: bpy.props.FloatProperty(
+        name="Distance",
+        description="Vertices closer than this are merged",
+        default=0.0001,
+        min=0.0,
+        max=10.0
+    )
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "distance")
+
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
+
+        from ..engine.merge import merge_by_distance
+        merged = set()
+        for ob in obs:
+            if ob.type == 'MESH' and ob.data.session_uid not in merged:
+                merged.add(ob.data.session_uid)
+                merge_by_distance(ob, self.distance)
 
-        set_output_socket_data(self.outputs["objects"], list(obs), context)
+        set_output_socket_data(self.outputs["objects"], obs, context)
@@ -1,5 +1,5 @@
 import bpy
-from bpy.types import NodeCustomGroup, NodeGroupInput
+from bpy.types import NodeCustomGroup
 from bpy.types import Operator
 from mathutils import Vector
 from ..consts import GROUP_COLOR
@@ -78,6 +78,9 @@ class WFNodeGroup(NodeCustomGroup, WFNode):
         # self.node_tree.unregister_all_objects()
 
     def update(self):
+        from ..engine.plan import invalidate_plans
+        invalidate_plans(self.id_data)
+
         if not self.node_tree:
             return
 
@@ -87,25 +90,6 @@ class WFNodeGroup(NodeCustomGroup, WFNode):
             elif node.bl_idname == "NodeGroupOutput":
                 update_sockets(self.outputs, node.inputs)
 
-    def execute(self, context):
-        for node in self.node_tree.nodes:
-            for output in node.outputs:
-                output.wf_has_cache = False
-
-        input_node = next((tree_node for tree_node in self.node_tree.nodes
-                           if isinstance(tree_node, NodeGroupInput)),
-                          None)
-
-        from .mixins import get_input_socket_data, set_output_socket_data
-        for input_socket in self.inputs:
-            data = get_input_socket_data(input_socket, context)
-            input_node_socket = next(
-                (output_socket for output_socket in input_node.outputs
-                    if output_socket.identifier == input_socket.identifier),
-                None)
-            if input_node_socket:
-                set_output_socket_data(input_node_socket, data, context)
-
 
 class WFGroupNodesOperator(Operator):
     """Create a node group from the selected nodes"""
@@ -1,12 +1,14 @@
 import bpy
 from .mixins import WFInputNode
+from ..engine.objectset import ObjectSet
 
 
 def on_scene_update(self, context):
     if self.target:
-        self.cached_objects = self.target.objects.values()
+        from ..engine.membership import get_membership
+        self.cached_objects = get_membership().get_scene_objects(self.target)
     else:
-        self.cached_objects = []
+        self.cached_objects = ObjectSet()
 
 
 class WFNodeSceneInput(WFInputNode):
@@ -25,14 +27,10 @@ class WFNodeSceneInput(WFInputNode):
         on_scene_update(self, context)
 
     def execute(self, context):
-        vlc = bpy.context.view_layer.layer_collection
-        from ..utils import find_object_layer_collection
         on_scene_update(self, context)
-        for ob in self.cached_objects:
-            lc = find_object_layer_collection(vlc, ob)
-            lc.exclude = False
 
-        from .mixins import set_output_socket_data
+        from .mixins import include_objects, set_output_socket_data
+        include_objects(self.cached_objects, context)
         set_output_socket_data(self.outputs["objects"], self.cached_objects, context)
 
     def refresh(self, context):
@@ -40,19 +38,16 @@ class WFNodeSceneInput(WFInputNode):
 
 
 def get_collection_objects(col):
-    obs = []
-    obs.extend(col.objects.values())
-    for child in col.children:
-        obs.extend(get_collection_objects(child))
-
-    return obs
+    ''' Objects of the collection and its children, each once '''
+    from ..engine.membership import get_membership
+    return get_membership().get_collection_objects(col)
 
 
 def on_collection_update(self, context):
     if self.target:
         self.cached_objects = get_collection_objects(self.target)
     else:
-        self.cached_objects = []
+        self.cached_objects = ObjectSet()
 
 
 class WFNodeCollectionInput(WFInputNode):
@@ -68,18 +63,14 @@ class WFNodeCollectionInput(WFInputNode):
 
     def init(self, context):
         super().init(context)
-        self.cached_objects = []
+        self.cached_objects = ObjectSet()
         on_collection_update(self, context)
 
     def execute(self, context):
-        vlc = bpy.context.view_layer.layer_collection
-        from ..utils import find_object_layer_collection
         on_collection_update(self, context)
-        for ob in self.cached_objects:
-            lc = find_object_layer_collection(vlc, ob)
-            lc.exclude = False
 
-        from .mixins import set_output_socket_data
+        from .mixins import include_objects, set_output_socket_data
+        include_objects(self.cached_objects, context)
         set_output_socket_data(self.outputs["objects"], self.cached_objects, context)
 
     def refresh(self, context):
@@ -88,12 +79,11 @@ class WFNodeCollectionInput(WFInputNode):
 
 def on_object_update(self, context):
     if self.target:
-        self.cached_objects = [self.target]
+        self.cached_objects = ObjectSet([self.target])
         if self.children:
-            for child in self.target.children:
-                self.cached_objects.append(child)
+            self.cached_objects = self.cached_objects.union(self.target.children)
     else:
-        self.cached_objects = []
+        self.cached_objects = ObjectSet()
 
 
 def object_filter(self, ob):
@@ -126,17 +116,10 @@ class WFNodeObjectInput(WFInputNode):
             self.color = ERROR_COLOR
 
     def execute(self, context):
-        vlc = bpy.context.view_layer.layer_collection
-        from ..utils import find_object_layer_collection
         on_object_update(self, context)
-        for ob in self.cached_objects:
-            lc = find_object_layer_collection(vlc, ob)
-            if lc:
-                lc.exclude = False
-            else:
-                print(f"Error: object {ob.name} doesn't have an active layer collection")
-
-        from .mixins import set_output_socket_data
+
+        from .mixins import include_objects, set_output_socket_data
+        include_objects(self.cached_objects, context)
         set_output_socket_data(self.outputs["objects"], self.cached_objects, context)
 
     def refresh(self, context):
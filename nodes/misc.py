@@ -17,10 +17,9 @@ class WFNodeAddPrefixToName(WFTransformNode):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
         prefix = get_input_socket_data(self.inputs["prefix"], context)
-        for ob in obs:
-            ob.name = prefix + ob.name
-            if hasattr(ob, "data") and ob.data:
-                ob.data.name = ob.name
+
+        from ..engine.rename import rename_objects
+        rename_objects((ob, prefix + ob.name) for ob in obs)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
@@ -40,32 +39,43 @@ class WFNodeAddSuffixToName(WFTransformNode):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
         suffix = get_input_socket_data(self.inputs["suffix"], context)
-        for ob in obs:
-            ob.name = ob.name + suffix
-            if hasattr(ob, "data") and ob.data:
-                ob.data.name = ob.name
+
+        from ..engine.rename import rename_objects
+        rename_objects((ob, ob.name + suffix) for ob in obs)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
 
-class WFNodeAddSuffixToName(WFTransformNode):
-    bl_label = "Add Suffix"
-    bl_description = """Adds a suffix to the end of an object's name
+class WFNodeNameFromTemplate(WFTransformNode):
+    bl_label = "Name From Template"
+    bl_description = """Renames objects and their data from a template
+    - template: Python format string with the fields {name}, {index}, {type}, {data} and {collection}
     - in: One or more objects sets
-    - out: All input objects"""
+    - out: All input objects
+Note: index is the position of the object in the set, {index:03d} pads it with zeros.
+      Objects ending up with the same name are numbered in the order of the set"""
     bl_width_default = 200
 
     def init(self, context):
         super().init(context)
-        self.inputs.new("NodeSocketString", "suffix")
+        self.inputs.new("NodeSocketString", "template").default_value = "{name}"
 
     def execute(self, context):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
-        suffix = get_input_socket_data(self.inputs["suffix"], context)
-        for ob in obs:
-            ob.name = ob.name + suffix
-            if hasattr(ob, "data") and ob.data:
-                ob.data.name = ob.name
+        template = get_input_socket_data(self.inputs["template"], context)
+
+        renames = []
+        for index, ob in enumerate(obs):
+            collection = ob.users_collection[0].name if ob.users_collection else ""
+            fields = {"name": ob.name, "index": index, "type": ob.type, "data": ob.data.name if ob.data else "",
+                      "collection": collection}
+            try:
+                renames.append((ob, template.format_map(fields)))
+            except (KeyError, IndexError, ValueError) as error:
+                raise ValueError(f'Invalid name template "{template}": {error}') from error
+
+        from ..engine.rename import rename_objects
+        rename_objects(renames)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
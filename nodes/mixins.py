@@ -1,90 +1,80 @@
 import bpy
-from bpy.types import Node, NodeReroute, NodeGroupInput, NodeGroupOutput
+from bpy.types import Node
 from ..consts import IO_COLOR, FILTER_COLOR, ERROR_COLOR, DEBUG_COLOR, TRANSFORM_COLOR, RUNNABLE_COLOR
 
 
-def set_output_socket_data(socket, data, context):
+def get_socket_value(socket):
     from ..sockets.objects_socket import WFObjectsSocket
     if isinstance(socket, WFObjectsSocket):
-        socket.default_value.clear()
-        for ob in data:
-            socket.default_value.add().value = ob
-    else:
-        socket.default_value = data
-
-    socket.wf_has_cache = True
-
-
-def get_all_input_socket_data(socket, context):
-    result = []
-
-    for link in socket.links:
-        result.extend(get_input_socket_link_data(link, context))
-
-    return result
-
-
-def get_input_socket_data(socket, context):
-    if socket and socket.is_linked:
-        return get_input_socket_link_data(socket.links[0], context)
-    return socket.default_value if socket else None
+        from ..engine.objectset import ObjectSet
+        return ObjectSet(item.value for item in socket.default_value)
+    return socket.default_value
 
 
-def get_input_socket_link_data(link, context):
-    from .group import WFNodeGroup
-    socket = link.to_socket
-    from_socket = link.from_socket
-    from_node = from_socket.node
-
+def set_output_socket_data(socket, data, context):
     from ..sockets.objects_socket import WFObjectsSocket
-    if isinstance(from_node, WFNode):
-        if not from_socket.wf_has_cache:
-            from_node.execute(context)
-
-        if isinstance(from_node, WFNodeGroup):
-            from_node.execute(context)
-
-            output_node = next((tree_node for tree_node in from_node.node_tree.nodes
-                                if isinstance(tree_node, NodeGroupOutput)),
-                               None)
-
-            if output_node:
-                output_node_socket = next(
-                    (output_socket for output_socket in output_node.inputs if output_socket.name == socket.name),
-                    None)
-                if output_node_socket:
-                    return get_input_socket_data(output_node_socket, context)
-
+    if isinstance(socket, WFObjectsSocket):
+        from ..engine.objectset import as_object_set
+        data = as_object_set(data)
+
+    from ..engine.executor import store_socket_value
+    store_socket_value(socket, data)
+
+    # Socket values only live in memory during the run unless the user asked to keep them in the .blend
+    if socket.id_data.persist_socket_previews:
+        if isinstance(socket, WFObjectsSocket):
+            socket.default_value.clear()
+            for ob in data:
+                socket.default_value.add().value = ob
+        else:
+            socket.default_value = data
+
+
+def include_objects(obs, context):
+    ''' Makes sure the objects are part of the view layer the workflow runs in '''
+    from ..engine.executor import get_active_run
+    run = get_active_run()
+    if run and run.staging:
+        run.staging.link(obs)
+        return
+
+    from ..engine.layers import get_layer_index
+    index = get_layer_index(bpy.context.view_layer)
+    for ob in obs:
+        lc = index.find(ob)
+        if lc:
+            lc.exclude = False
         else:
-            if isinstance(from_socket, WFObjectsSocket):
-                return [item.value for item in from_socket.default_value]
-            else:
-                return from_socket.default_value
+            print(f"Error: object {ob.name} doesn't have an active layer collection")
 
-    elif isinstance(from_node, NodeReroute):
-        return get_input_socket_data(from_node.inputs[0], context)
 
-    elif isinstance(from_node, NodeGroupInput):
-        if isinstance(from_socket, WFObjectsSocket):
-            return [item.value for item in from_socket.default_value]
-        else:
-            return from_socket.default_value
+def get_all_input_socket_data(socket, context):
+    ''' Objects of all the links into the socket. Inputs are only resolved during a plan run, outside of one this is
+    the socket's own value.'''
+    from ..engine.executor import get_active_run
+    run = get_active_run()
+    if run:
+        return run.get_all_inputs(socket)
+    return get_socket_value(socket)
 
-    elif isinstance(from_node, NodeGroupOutput):
-        input_socket = next(
-            (input_socket for input_socket in from_node.inputs if from_node.name == socket.name),
-            None)
-        if input_socket and input_socket.is_linked:
-            link = input_socket.links[0]
-            return get_input_socket_data(link.from_socket, context)
 
-    return None
+def get_input_socket_data(socket, context):
+    ''' Value of the first link into the socket. Inputs are only resolved during a plan run, outside of one this is
+    the socket's own value.'''
+    from ..engine.executor import get_active_run
+    run = get_active_run()
+    if run and socket:
+        return run.get_input(socket)
+    return get_socket_value(socket) if socket else None
 
 
 class WFNode():
     bl_label = "Workflows Graph Node"
     bl_icon = "NODE"
 
+    # Nodes that change the scene can't share a run with workflows that don't expect those changes
+    wf_mutates_scene = False
+
     @classmethod
     def poll(cls, ntree):
         return ntree.bl_idname == 'WFNodeTree'
@@ -95,6 +85,18 @@ class WFNode():
     def draw_buttons(self, context, layout):
         pass
 
+    def draw_label(self):
+        label = self.label or (self.node_tree.name if getattr(self, "node_tree", None) else self.bl_label)
+        if not self.id_data.profile:
+            return label
+
+        from ..engine.profiler import get_last_profile
+        profile = get_last_profile()
+        duration = profile.get_node_time(self.id_data.name, self.name) if profile else None
+        if duration is None:
+            return label
+        return f'{label} ({duration * 1000:.1f} ms)'
+
     def execute(self, context):
         for socket in self.inputs:
             get_input_socket_data(socket, context)
@@ -144,8 +146,39 @@ class WFFilterNode(WFInOutFunctionNode):
         self.color = FILTER_COLOR
 
 
+class WFNameFilterNode(WFFilterNode):
+    ''' Filter keeping the objects whose name passes a test on the "filter" input.
+    Chains of these nodes are fused by the planner and run as one pass over the objects.'''
+
+    # Kind of engine.names.NameFilter the node applies
+    wf_name_filter = None
+
+    def init(self, context):
+        super().init(context)
+        self.inputs.new("NodeSocketString", "filter")
+
+    def get_name_filter(self, filter):
+        from ..engine.names import NameFilter
+        return NameFilter(self.wf_name_filter, filter)
+
+    def execute(self, context):
+        self.execute_chain(context, [])
+
+    def execute_chain(self, context, upstream):
+        ''' Runs the filters of the upstream nodes folded into this one and its own in one pass.
+        The objects input of this node is resolved to the input of the first node of the chain.'''
+        obs = get_input_socket_data(self.inputs["objects"], context)
+        name_filters = [node.get_name_filter(get_socket_value(node.inputs["filter"])) for node in upstream]
+        name_filters.append(self.get_name_filter(get_input_socket_data(self.inputs["filter"], context)))
+
+        from ..engine.names import filter_names
+        set_output_socket_data(self.outputs["objects"], filter_names(obs, name_filters), context)
+
+
 class WFTransformNode(WFInOutFunctionNode):
 
+    wf_mutates_scene = True
+
     all_objects: bpy.props.BoolProperty(
         name="All Objects",
         description="Export all input objects using the object name as output file",
@@ -182,6 +215,13 @@ class WFDebugNode():
 class WFRunnableNode():
     ''' Node that can be run by the workflow executor'''
 
+    run_cost: bpy.props.FloatProperty(
+        name="Run Cost",
+        description="Seconds the node took in the last parallel run, used to balance the work between workers",
+        default=0.0,
+        min=0.0
+    )
+
 
 def filepath_update(self, filepath):
     if filepath:
@@ -205,6 +245,14 @@ class WFExportNode(WFOutputNode, WFRunnableNode):
         default=False
     )
 
+    export_workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Background Blender processes exporting the objects in parallel when exporting all objects "
+                    "individually, 1 exports them one by one in this process and 0 uses one per CPU core",
+        default=1,
+        min=0
+    )
+
     def init(self, context):
         super().init(context)
         self.color = ERROR_COLOR
@@ -219,6 +267,44 @@ class WFExportNode(WFOutputNode, WFRunnableNode):
         op.node_name = self.name
         row.enabled = bool(self.filepath)
         layout.prop(self, "all_objects")
+        if self.all_objects:
+            layout.prop(self, "export_workers")
+
+            from ..engine.export_workers import get_export_results
+            results = get_export_results(self)
+            if results:
+                files = results["files"]
+                succeeded = sum(1 for entry in files if entry["status"] == "success")
+                layout.label(text=f'Last parallel export: {succeeded}/{len(files)} files, {results["workers"]} workers, '
+                                  f'{results["duration"]:.1f}s',
+                             icon='CHECKMARK' if succeeded == len(files) else 'ERROR')
+
+    def get_export_path(self, ob=None, extension=""):
+        ''' File the node exports to, or the file of the object when exporting all objects individually.
+        Nodes run once per chunk of a streaming node write files of their own for every chunk.'''
+        path = self.filepath
+        if ob is not None:
+            import os
+            path = os.path.join(os.path.dirname(path), ob.name + extension)
+
+        from ..engine.executor import get_chunk_filepath
+        return get_chunk_filepath(path)
+
+    def export_objects(self, context, operator, exports, cache=None):
+        ''' Exports every (object, exporter arguments) pair on its own, with only that object selected and active '''
+        import os
+        workers = self.export_workers or os.cpu_count() or 1
+        if workers > 1 and len(exports) > 1:
+            from ..engine.export_workers import export_parallel
+            export_parallel(self, context, operator, exports, workers, cache)
+            return
+
+        from ..utils import export_scene
+        for ob, kwargs in exports:
+            ob.select_set(True)
+            context.view_layer.objects.active = ob
+            export_scene(context, operator, kwargs, cache)
+            ob.select_set(False)
 
     def update(self):
         if self.filepath:
@@ -12,7 +12,8 @@ class WFNodeApplyModifierType(WFTransformNode):
     bl_description = """Applies the selected modifier to an object
     - in: One or more objects sets
     - out: All input objects
-Note: "Make single user" is applied on the object data before applying the modifier
+Note: Meshes are evaluated once for all the objects sharing them and applying the same modifier with the same
+      settings, those objects keep sharing the result. Other objects get a mesh of their own
       This node won't work correctly with upstream nodes that change the object set like filter nodes"""
     bl_width_default = 200
 
@@ -27,17 +28,12 @@ Note: "Make single user" is applied on the object data before applying the modif
         layout.prop(self, "modifier")
 
     def execute(self, context):
-        from .mixins import get_input_socket_data, set_output_socket_data
+        from .mixins import get_input_socket_data, set_output_socket_data, include_objects
         obs = get_input_socket_data(self.inputs["objects"], context)
+        include_objects(obs, context)
 
-        for ob in obs:
-            if hasattr(ob, "modifiers") and ob.modifiers:
-                for mod in ob.modifiers:
-                    if mod.type in self.modifier:
-                        ob.select_set(True)
-                        context.view_layer.objects.active = ob
-                        bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
-                        bpy.ops.object.modifier_apply(modifier=mod.name)
+        from ..engine.modifiers import apply_modifiers
+        apply_modifiers(context, obs, lambda mod: mod.type == self.modifier)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
@@ -47,7 +43,8 @@ class WFNodeApplyModifierName(WFTransformNode):
     bl_description = """Applies the selected modifier to an object
     - in: One or more objects sets
     - out: All input objects
-Note: "Make single user" is applied on the object data before applying the modifier
+Note: Meshes are evaluated once for all the objects sharing them and applying the same modifier with the same
+      settings, those objects keep sharing the result. Other objects get a mesh of their own
 This node won't work correctly with upstream nodes that change the object set like filter nodes"""
 
     def init(self, context):
@@ -55,18 +52,13 @@ This node won't work correctly with upstream nodes that change the object set li
         self.inputs.new("NodeSocketString", "name")
 
     def execute(self, context):
-        from .mixins import get_input_socket_data, set_output_socket_data
+        from .mixins import get_input_socket_data, set_output_socket_data, include_objects
         obs = get_input_socket_data(self.inputs["objects"], context)
+        include_objects(obs, context)
 
-        for ob in obs:
-            if hasattr(ob, "modifiers") and ob.modifiers:
-                for mod in ob.modifiers:
-                    name = get_input_socket_data(self.inputs["name"], context)
-                    if mod.name == name:
-                        ob.select_set(True)
-                        context.view_layer.objects.active = ob
-                        bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
-                        bpy.ops.object.modifier_apply(modifier=mod.name)
+        name = get_input_socket_data(self.inputs["name"], context)
+        from ..engine.modifiers import apply_modifiers
+        apply_modifiers(context, obs, lambda mod: mod.name == name)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
@@ -76,22 +68,19 @@ class WFNodeApplyAllModifiers(WFTransformNode):
     bl_description = """Applies all modifiers to an object
     - in: One or more objects sets
     - out: All input objects
-Note: "Make single user" is applied on the object data before applying the modifier"""
+Note: Meshes are evaluated once for all the objects sharing them and applying the same modifiers with the same
+      settings, those objects keep sharing the result. Other objects get a mesh of their own"""
 
     def init(self, context):
         super().init(context)
 
     def execute(self, context):
-        from .mixins import get_input_socket_data, set_output_socket_data
+        from .mixins import get_input_socket_data, set_output_socket_data, include_objects
         obs = get_input_socket_data(self.inputs["objects"], context)
+        include_objects(obs, context)
 
-        for ob in obs:
-            if hasattr(ob, "modifiers") and ob.modifiers:
-                for mod in ob.modifiers:
-                    ob.select_set(True)
-                    context.view_layer.objects.active = ob
-                    bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
-                    bpy.ops.object.modifier_apply(modifier=mod.name)
+        from ..engine.modifiers import apply_modifiers
+        apply_modifiers(context, obs, lambda mod: True)
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
@@ -6,21 +6,71 @@ class WFNodeInstancesMakeReal(WFTransformNode):
     bl_label = "Instances Make Real"
     bl_description = """Make instances real
     - in: One or more objects sets
-    - out: All input objects and the created instances
+    - out: The created instances, and the input objects with "Include Inputs"
 Note: "Make single user" is applied on the object data before applying the modifier
+      With a chunk size, instancers are made real in groups creating at most that many objects.
+      When streaming, the nodes after this one run once per chunk with only the objects it created,
+      which are deleted before the next chunk. Streaming isn't available inside node groups
       This node won't work correctly with upstream nodes that change the object set like filter nodes"""
     bl_width_default = 200
 
+    # Can run the nodes depending on it once per chunk, see Run.execute_stream
+    wf_streams = True
+
+    chunk_size: bpy.props.IntProperty(
+        name="Chunk Size",
+        description="Objects to create at most before moving to the next chunk of instancers, 0 makes all the "
+                    "instances real at once",
+        default=0,
+        min=0
+    )
+
+    stream: bpy.props.BoolProperty(
+        name="Stream",
+        description="Run the nodes after this one for every chunk and delete its objects before making the next one "
+                    "real, so only one chunk is in memory at a time",
+        default=False
+    )
+
+    include_inputs: bpy.props.BoolProperty(
+        name="Include Inputs",
+        description="Output the input objects along with the created instances. When streaming, they are output "
+                    "once all the chunks are done",
+        default=False
+    )
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "include_inputs")
+        layout.prop(self, "chunk_size")
+        layout.prop(self, "stream")
+
     def execute(self, context):
-        from .mixins import get_input_socket_data, set_output_socket_data
+        from .mixins import get_input_socket_data, set_output_socket_data, include_objects
         obs = get_input_socket_data(self.inputs["objects"], context)
+        include_objects(obs, context)
+
+        from ..engine.instances import realize_instances
+        created = {}
+        for chunk in realize_instances(context, obs, self.chunk_size):
+            created.update(zip(chunk.handles(), chunk))
 
-        for ob in obs:
-            ob.select_set(True)
-            context.view_layer.objects.active = ob
-            bpy.ops.object.make_single_user(type='SELECTED_OBJECTS', object=True, obdata=True)
+        from ..engine.objectset import ObjectSet
+        created = ObjectSet.from_handles(created)
+        set_output_socket_data(self.outputs["objects"], obs.union(created) if self.include_inputs else created, context)
+
+    def execute_chunks(self, context):
+        ''' Makes the instances real chunk by chunk, with the output holding the objects of the chunk while the nodes
+        after this one run. Once all the chunks are done, the output holds the input objects with include_inputs and
+        is empty otherwise.'''
+        from .mixins import get_input_socket_data, set_output_socket_data, include_objects
+        obs = get_input_socket_data(self.inputs["objects"], context)
+        include_objects(obs, context)
 
-        bpy.ops.object.duplicates_make_real()
+        from ..engine.instances import realize_instances, remove_objects
+        for chunk in realize_instances(context, obs, self.chunk_size):
+            set_output_socket_data(self.outputs["objects"], chunk, context)
+            yield chunk
+            remove_objects(chunk)
 
-        obs.extend(context.selected_objects)
-        set_output_socket_data(self.outputs["objects"], obs, context)
+        from ..engine.objectset import ObjectSet
+        set_output_socket_data(self.outputs["objects"], obs if self.include_inputs else ObjectSet(), context)
@@ -2,6 +2,12 @@ import bpy
 from .mixins import WFTransformNode
 
 
+SPACE_ITEMS = [
+    ('LOCAL', "Local", "Along the axes of each object's own space"),
+    ('WORLD', "World", "Along the world axes")
+]
+
+
 class WFNodeTranslateToPosition(WFTransformNode):
     bl_label = "Translate To Position"
     bl_description = """Translates an object to a new position. The position can be in world or local space
@@ -29,30 +35,15 @@ class WFNodeTranslateToPosition(WFTransformNode):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
 
-        bpy.ops.object.select_all(action='DESELECT')
-
-        if self.all_objects:
-            for ob in obs:
-                ob.select_set(True)
-                context.view_layer.objects.active = ob
-                if self.relative:
-                    ob.location += self.position
-                else:
-                    ob.matrix_world.translation = self.position
-                ob.select_set(False)
-        else:
-            for ob in obs:
-                ob.select_set(True)
-
-            if obs:
-                last_ob = obs[-1]
-
-            context.view_layer.objects.active = last_ob
-
+        targets = obs if self.all_objects else obs[-1:]
+        if targets:
+            from ..engine.transforms import ObjectTransforms
+            transforms = ObjectTransforms(context, targets, world=not self.relative)
             if self.relative:
-                last_ob.location += self.position
+                transforms.translate(self.position)
             else:
-                last_ob.matrix_world.translation = self.position
+                transforms.move_to(self.position)
+            transforms.update()
 
         set_output_socket_data(self.outputs["objects"], obs, context)
 
@@ -77,23 +68,175 @@ class WFNodeTranslateToObjectPosition(WFTransformNode):
         from .mixins import get_input_socket_data, set_output_socket_data
         obs = get_input_socket_data(self.inputs["objects"], context)
 
-        bpy.ops.object.select_all(action='DESELECT')
+        targets = obs if self.all_objects else obs[-1:]
+        if targets:
+            from ..engine.transforms import ObjectTransforms
+            transforms = ObjectTransforms(context, targets, world=True)
+            transforms.move_to(self.target.matrix_world.translation)
+            transforms.update()
+
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+
+class WFNodeTranslate(WFTransformNode):
+    bl_label = "Translate"
+    bl_description = """Moves all the objects by an offset
+    - in: One or more objects sets
+    - out: All input objects
+Note: Local offsets are added to the objects location, in the space of their parents"""
+
+    space: bpy.props.EnumProperty(name="", description="Space of the offset", items=SPACE_ITEMS, default='WORLD')
 
-        if self.all_objects:
-            for ob in obs:
-                ob.select_set(True)
-                context.view_layer.objects.active = ob
-                ob.matrix_world.translation = self.target.matrix_world.translation
-                ob.select_set(False)
-        else:
-            for ob in obs:
-                ob.select_set(True)
+    offset: bpy.props.FloatVectorProperty(
+        name="Offset", description="Distance to move the objects",
+        unit='LENGTH',
+        subtype="XYZ",
+        default=(0.0, 0.0, 0.0))
 
-            if obs:
-                last_ob = obs[-1]
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "space")
+        layout.column().prop(self, "offset")
 
-            context.view_layer.objects.active = last_ob
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
+
+        if obs:
+            from ..engine.transforms import ObjectTransforms
+            world = self.space == 'WORLD'
+            transforms = ObjectTransforms(context, obs, world=world)
+            transforms.translate(self.offset, world=world)
+            transforms.update()
+
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+
+class WFNodeRotate(WFTransformNode):
+    bl_label = "Rotate"
+    bl_description = """Rotates all the objects around their origins
+    - in: One or more objects sets
+    - out: All input objects
+Note: The objects keep their rotation mode"""
+
+    space: bpy.props.EnumProperty(name="", description="Axes to rotate around", items=SPACE_ITEMS, default='WORLD')
+
+    rotation: bpy.props.FloatVectorProperty(
+        name="Rotation", description="Rotation to add to the objects",
+        subtype="EULER",
+        default=(0.0, 0.0, 0.0))
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "space")
+        layout.column().prop(self, "rotation")
+
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
+
+        if obs:
+            from ..engine.transforms import ObjectTransforms
+            world = self.space == 'WORLD'
+            transforms = ObjectTransforms(context, obs, world=world)
+            transforms.rotate(self.rotation.to_matrix(), world=world)
+            transforms.update()
+
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+
+class WFNodeScale(WFTransformNode):
+    bl_label = "Scale"
+    bl_description = """Multiplies the scale of all the objects
+    - in: One or more objects sets
+    - out: All input objects"""
+
+    factor: bpy.props.FloatVectorProperty(
+        name="Factor", description="Factor to multiply the objects scale with",
+        subtype="XYZ",
+        default=(1.0, 1.0, 1.0))
+
+    def draw_buttons(self, context, layout):
+        layout.column().prop(self, "factor")
+
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
+
+        if obs:
+            from ..engine.transforms import ObjectTransforms
+            transforms = ObjectTransforms(context, obs)
+            transforms.scale(self.factor)
+            transforms.update()
+
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+
+class WFNodeSetTransform(WFTransformNode):
+    bl_label = "Set Transform"
+    bl_description = """Places all the objects with the same world transform
+    - in: One or more objects sets
+    - out: All input objects
+Note: Parented objects get the local transform that gives them this world transform"""
+
+    location: bpy.props.FloatVectorProperty(
+        name="Location", description="World location of the objects",
+        unit='LENGTH',
+        subtype="XYZ",
+        default=(0.0, 0.0, 0.0))
+
+    rotation: bpy.props.FloatVectorProperty(
+        name="Rotation", description="World rotation of the objects",
+        subtype="EULER",
+        default=(0.0, 0.0, 0.0))
+
+    scale: bpy.props.FloatVectorProperty(
+        name="Scale", description="World scale of the objects",
+        subtype="XYZ",
+        default=(1.0, 1.0, 1.0))
+
+    def draw_buttons(self, context, layout):
+        col = layout.column()
+        col.prop(self, "location")
+        col.prop(self, "rotation")
+        col.prop(self, "scale")
+
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
+
+        if obs:
+            from mathutils import Matrix
+            from ..engine.transforms import ObjectTransforms
+            matrix = Matrix.LocRotScale(self.location, self.rotation, self.scale)
+            transforms = ObjectTransforms(context, obs, world=True)
+            transforms.set_world_matrices(matrix)
+            transforms.update()
+
+        set_output_socket_data(self.outputs["objects"], obs, context)
+
+
+class WFNodeSnapToGrid(WFTransformNode):
+    bl_label = "Snap To Grid"
+    bl_description = """Moves the origin of all the objects to the closest point of a world grid
+    - in: One or more objects sets
+    - out: All input objects"""
+
+    grid_size: bpy.props.FloatProperty(
+        name="Grid Size", description="Distance between the grid points",
+        unit='LENGTH',
+        default=1.0,
+        min=0.0001)
+
+    def draw_buttons(self, context, layout):
+        layout.prop(self, "grid_size")
+
+    def execute(self, context):
+        from .mixins import get_input_socket_data, set_output_socket_data
+        obs = get_input_socket_data(self.inputs["objects"], context)
 
-            last_ob.matrix_world.translation = self.target.matrix_world.translation
+        if obs:
+            from ..engine.transforms import ObjectTransforms
+            transforms = ObjectTransforms(context, obs, world=True)
+            transforms.snap_to_grid(self.grid_size)
+            transforms.update()
 
         set_output_socket_data(self.outputs["objects"], obs, context)
@@ -1,5 +1,4 @@
 import bpy
-import bmesh
 
 
 class OBJECT_OT_deep_merge_operator(bpy.types.Operator):
@@ -57,14 +56,9 @@ class OBJECT_OT_deep_merge_operator(bpy.types.Operator):
 
         # Remove doubles
         if self.merge:
-            bpy.ops.object.editmode_toggle()
+            from .engine.merge import merge_by_distance
             for ob in bpy.context.selected_objects:
-                mesh = bmesh.from_edit_mesh(ob.data)
-                for vert in mesh.verts:
-                    vert.select = True
-            bpy.ops.mesh.remove_doubles(threshold=self.merge_distance, use_unselected=False,
-                                        use_sharp_edge_from_normals=False)
-            bpy.ops.object.editmode_toggle()
+                merge_by_distance(ob, self.merge_distance)
 
         bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
         bpy.ops.object.origin_set(type=self.new_origin)
@@ -116,15 +110,35 @@ class WF_OT_SelectExportPath(bpy.types.Operator):
         return {'RUNNING_MODAL'}
 
 
+class WF_OT_RefreshExportPresets(bpy.types.Operator):
+    """Look for the exporter presets again and check the presets of all the export nodes"""
+    bl_idname = "wf.refresh_export_presets"
+    bl_label = "Refresh Export Presets"
+
+    def execute(self, context):
+        from .engine.presets import get_presets
+        get_presets().scan()
+
+        from .nodes.export import WFPresetExportNode
+        for tree in bpy.data.node_groups:
+            if tree.bl_idname == "WFNodeTree":
+                for node in tree.nodes:
+                    if isinstance(node, WFPresetExportNode):
+                        node.refresh(context)
+        return {'FINISHED'}
+
+
 def register():
     bpy.utils.register_class(OBJECT_OT_deep_merge_operator)
     bpy.utils.register_class(VIEW3D_MT_workflows_tools_object_submenu)
     bpy.utils.register_class(WF_OT_SelectExportPath)
+    bpy.utils.register_class(WF_OT_RefreshExportPresets)
     bpy.types.VIEW3D_MT_object.append(menu_func)
 
 
 def unregister():
     bpy.types.VIEW3D_MT_object.remove(menu_func)
+    bpy.utils.unregister_class(WF_OT_RefreshExportPresets)
     bpy.utils.unregister_class(WF_OT_SelectExportPath)
     bpy.utils.unregister_class(VIEW3D_MT_workflows_tools_object_submenu)
     bpy.utils.unregister_class(OBJECT_OT_deep_merge_operator)
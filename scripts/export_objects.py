@@ -0,0 +1,42 @@
+''' Background worker of the parallel export of export nodes exporting all their objects individually:
+
+    blender -b snapshot.blend --python scripts/export_objects.py -- --job job.json --report report.json
+
+The job lists the scene, the exporter and the arguments of every object to export, see engine/export_workers.py.
+Exits with a non-zero code if any of the exports fails.'''
+
+import argparse
+import importlib
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from run_workflows import enable_addon  # noqa: E402
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="export_objects.py", description="Exports objects of the open file")
+    parser.add_argument("--job", required=True, help="Path of the JSON export job")
+    parser.add_argument("--report", required=True, help="Path of the JSON report to write")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    addon = enable_addon()
+
+    export_workers = importlib.import_module(".engine.export_workers", addon.__name__)
+    files = export_workers.run_job(args.job, args.report)
+
+    for entry in files:
+        if entry["status"] == "success":
+            print(f'{entry["object"]}: {entry["filepath"]} in {entry["duration"]:.3f}s')
+        else:
+            print(f'{entry["object"]}: failed: {entry["error"]}')
+
+    sys.exit(0 if all(entry["status"] == "success" for entry in files) else 1)
+
+
+if __name__ == "__main__":
+    main()
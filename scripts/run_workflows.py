@@ -0,0 +1,64 @@
+''' Runs workflows without UI, e.g. in a build farm:
+
+    blender -b scene.blend --python scripts/run_workflows.py -- --tree "Export*" --node "*LOD0*" --report report.json
+
+--tree and --node can be given several times and accept names or glob patterns, everything runs by default.
+The add-on is enabled from the directory containing this script unless it is already enabled.
+Exits with a non-zero code if any of the workflows fails.'''
+
+import argparse
+import importlib
+import os
+import sys
+
+import addon_utils
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="run_workflows.py", description="Runs the workflows in the open file")
+    parser.add_argument("--tree", action="append", dest="trees",
+                        help="Name or glob pattern of the workflow trees to run")
+    parser.add_argument("--node", action="append", dest="nodes",
+                        help="Name or glob pattern of the runnable nodes to run")
+    parser.add_argument("--report", help="Path of the JSON run report to write")
+    parser.add_argument("--base-dir", help="Directory relative output paths resolve against, the directory of the "
+                                           "open file by default")
+    return parser.parse_args(argv)
+
+
+def enable_addon():
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    module_name = os.path.basename(package_dir)
+
+    _, loaded = addon_utils.check(module_name)
+    if not loaded:
+        parent_dir = os.path.dirname(package_dir)
+        if parent_dir not in sys.path:
+            sys.path.append(parent_dir)
+        addon_utils.enable(module_name, default_set=False)
+
+    return importlib.import_module(module_name)
+
+
+def main():
+    args = parse_args()
+    addon = enable_addon()
+
+    batch = importlib.import_module(".engine.batch", addon.__name__)
+    report = batch.run_batch(args.trees or ["*"], args.nodes or ["*"], args.report, base_dir=args.base_dir)
+
+    for tree in report["trees"]:
+        for sink in tree["sinks"]:
+            if sink["status"] == "success":
+                print(f'{tree["name"]} / {sink["node"]}: {sink["objects"]} objects in {sink["duration"]:.3f}s')
+            else:
+                print(f'{tree["name"]} / {sink["node"]}: failed: {sink["error"]}')
+    if "error" in report:
+        print(report["error"])
+
+    sys.exit(0 if report["status"] == "success" else 1)
+
+
+if __name__ == "__main__":
+    main()
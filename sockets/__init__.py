@@ -9,8 +9,19 @@ CLASSES = [
 ]
 
 
+def get_has_cache(self):
+    from ..engine.executor import has_socket_value
+    return has_socket_value(self)
+
+
+def set_has_cache(self, value):
+    if not value:
+        from ..engine.executor import clear_socket_value
+        clear_socket_value(self)
+
+
 def register():
-    bpy.types.NodeSocket.wf_has_cache = bpy.props.BoolProperty(default=False)
+    bpy.types.NodeSocket.wf_has_cache = bpy.props.BoolProperty(default=False, get=get_has_cache, set=set_has_cache)
 
     for cls in CLASSES:
         bpy.utils.register_class(cls)
@@ -3,6 +3,20 @@ import pathlib
 import types
 import bpy
 
+# Directory "//" paths are relative to instead of the directory of the open file, see set_base_dir
+_base_dir = None
+
+
+def set_base_dir(dir):
+    ''' Makes relative paths resolve against dir, for background processes working on a snapshot of a file saved
+    somewhere else. None goes back to the directory of the open file.'''
+    global _base_dir
+    _base_dir = dir
+
+
+def get_abspath(path):
+    return bpy.path.abspath(path, start=_base_dir)
+
 
 def get_package_dependencies(package):
     assert (hasattr(package, "__package__"))
@@ -63,84 +77,58 @@ def get_prefs():
 
 
 def get_preset_args(preset_filename, preset_path):
-    preset_filepath = bpy.utils.preset_find(preset_filename, preset_path)
-    if preset_filepath:
-        class Container(object):
-            __slots__ = ('__dict__',)
-
-        op = Container()
-        file = open(preset_filepath, 'r')
-
-        # storing the values from the preset on the class
-        for line in file.readlines()[3::]:
-            exec(line, globals(), locals())
-
-        # pass class dictionary to the operator
-        return op.__dict__
-
-    else:
-        raise FileNotFoundError(f'Preset not found: "{preset_filename}"')
-
+    ''' Arguments of an exporter preset, preset_path being "operator/<exporter operator>" '''
+    from .engine.presets import get_presets
+    return get_presets().get_args(os.path.basename(preset_path), preset_filename)
 
-def export_scene_gltf(context, path, preset):
-    kwargs = {}
 
+def get_export_kwargs(context, operator, path, preset):
+    ''' Exporter arguments from the preset, or the last used ones if there is no preset '''
     if preset:
         preset_filename = "_".join(s for s in preset.split())
-        preset_path = os.path.join("operator", "export_scene.gltf")
+        preset_path = os.path.join("operator", operator)
         kwargs = get_preset_args(preset_filename, preset_path)
 
     else:
-        kwargs = {**dict(context.window_manager.operator_properties_last("export_scene.gltf"))}
+        kwargs = {**dict(context.window_manager.operator_properties_last(operator))}
 
-    kwargs['filepath'] = bpy.path.abspath(path)
+    kwargs['filepath'] = get_abspath(path)
 
-    if bpy.app.version >= (3, 2, 0):
+    if operator == "export_scene.gltf" and bpy.app.version >= (3, 2, 0):
         kwargs['use_active_scene'] = True
 
-    bpy.ops.export_scene.gltf(**kwargs)
+    return kwargs
 
 
-def export_scene_fbx(context, path, preset):
-    kwargs = {}
+def export_scene(context, operator, kwargs, cache=None):
+    ''' Runs the exporter operator, through the export cache if there is one.
+    Returns the export cache result, None without cache.'''
+    module, name = operator.split(".")
 
-    if preset:
-        preset_filename = "_".join(s for s in preset.split())
-        preset_path = os.path.join("operator", "export_scene.fbx")
-        kwargs = get_preset_args(preset_filename, preset_path)
+    def exporter():
+        getattr(getattr(bpy.ops, module), name)(**kwargs)
 
+    result = None
+    if cache:
+        result = cache.export(context, operator, kwargs, exporter)
     else:
-        kwargs = {**dict(context.window_manager.operator_properties_last("export_scene.fbx"))}
-
-    kwargs['filepath'] = bpy.path.abspath(path)
-
-    bpy.ops.export_scene.fbx(**kwargs)
+        exporter()
 
+    from .engine.executor import record_output_file
+    record_output_file(kwargs['filepath'])
+    return result
 
-def export_scene_obj(context, path, preset):
-    kwargs = {}
 
-    if preset:
-        preset_filename = "_".join(s for s in preset.split())
-        preset_path = os.path.join("operator", "wm.obj_export")
-        kwargs = get_preset_args(preset_filename, preset_path)
-
-    else:
-        kwargs = {**dict(context.window_manager.operator_properties_last("wm.obj_export"))}
+def export_scene_gltf(context, path, preset, cache=None):
+    kwargs = get_export_kwargs(context, "export_scene.gltf", path, preset)
+    export_scene(context, "export_scene.gltf", kwargs, cache)
 
-    kwargs['filepath'] = bpy.path.abspath(path)
 
-    bpy.ops.wm.obj_export(**kwargs)
+def export_scene_fbx(context, path, preset, cache=None):
+    kwargs = get_export_kwargs(context, "export_scene.fbx", path, preset)
+    export_scene(context, "export_scene.fbx", kwargs, cache)
 
 
-# Function to recursively search for the LayerCollection containing the object
-def find_object_layer_collection(layer_collection, obj):
-    # Check if the object is in this collection
-    if obj.name in layer_collection.collection.objects:
-        return layer_collection
-    # Recursively search in child LayerCollections
-    for child in layer_collection.children:
-        found = find_object_layer_collection(child, obj)
-        if found:
-            return found
-    return None
+def export_scene_obj(context, path, preset, cache=None):
+    kwargs = get_export_kwargs(context, "wm.obj_export", path, preset)
+    export_scene(context, "wm.obj_export", kwargs, cache)